@@ -0,0 +1,154 @@
+from typing import Any, Iterable, Iterator, Sequence
+
+from sqlalchemy import and_, bindparam, insert, select, text, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+# SQL Server caps a statement at 2100 parameters and a table value constructor at 1000 rows
+MSSQL_MAX_PARAMETERS = 2100
+MSSQL_MAX_VALUES_ROWS = 1000
+# Below SQLite's historical 999-variable limit, so the same chunking works on every other dialect
+PORTABLE_MAX_PARAMETERS = 999
+PORTABLE_MAX_ROWS = 500
+
+
+def rows_per_chunk(column_count: int, max_parameters: int, max_rows: int) -> int:
+    return max(1, min(max_rows, (max_parameters - 1) // column_count))
+
+
+def chunked(rows: Sequence[dict], size: int) -> Iterator[Sequence[dict]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def _quote_mssql(name: str) -> str:
+    return "[" + name.replace("]", "]]") + "]"
+
+
+def build_merge_statement(
+    table: str,
+    schema: str | None,
+    columns: Sequence[str],
+    key_columns: Sequence[str],
+    update_columns: Sequence[str],
+    row_count: int,
+) -> str:
+    """
+    SQL Server MERGE upserting `row_count` rows passed as parameters `p{row}_{column index}`.
+    HOLDLOCK keeps concurrent MERGEs of the same keys from racing into duplicate inserts.
+    """
+    q = _quote_mssql
+    target = f"{q(schema)}.{q(table)}" if schema else q(table)
+    values = ", ".join(
+        "(" + ", ".join(f":p{row}_{index}" for index in range(len(columns))) + ")"
+        for row in range(row_count)
+    )
+    column_list = ", ".join(q(column) for column in columns)
+    match = " AND ".join(f"target.{q(column)} = source.{q(column)}" for column in key_columns)
+
+    statement = (
+        f"MERGE INTO {target} WITH (HOLDLOCK) AS target "
+        f"USING (VALUES {values}) AS source ({column_list}) "
+        f"ON {match} "
+    )
+    if update_columns:
+        assignments = ", ".join(f"target.{q(column)} = source.{q(column)}" for column in update_columns)
+        statement += f"WHEN MATCHED THEN UPDATE SET {assignments} "
+    source_values = ", ".join(f"source.{q(column)}" for column in columns)
+    statement += f"WHEN NOT MATCHED BY TARGET THEN INSERT ({column_list}) VALUES ({source_values});"
+    return statement
+
+
+def _dedupe(rows: Iterable[dict], key_columns: Sequence[str]) -> list[dict]:
+    # MERGE rejects a source that matches one target row twice; the last version of a key wins
+    unique = {tuple(row[column] for column in key_columns): row for row in rows}
+    return list(unique.values())
+
+
+async def _merge_mssql(db: AsyncSession, table: Any, rows, columns, key_columns, update_columns) -> None:
+    size = rows_per_chunk(len(columns), MSSQL_MAX_PARAMETERS, MSSQL_MAX_VALUES_ROWS)
+    for chunk in chunked(rows, size):
+        statement = build_merge_statement(table.name, table.schema, columns, key_columns, update_columns, len(chunk))
+        params = {
+            f"p{row_index}_{column_index}": row.get(column)
+            for row_index, row in enumerate(chunk)
+            for column_index, column in enumerate(columns)
+        }
+        await db.execute(text(statement), params)
+
+
+async def _insert_on_conflict(db: AsyncSession, table: Any, rows, columns, key_columns, update_columns, dialect: str) -> None:
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+    for chunk in chunked(rows, rows_per_chunk(len(columns), PORTABLE_MAX_PARAMETERS, PORTABLE_MAX_ROWS)):
+        statement = dialect_insert(table).values([{column: row.get(column) for column in columns} for row in chunk])
+        if update_columns:
+            statement = statement.on_conflict_do_update(
+                index_elements=list(key_columns),
+                set_={column: statement.excluded[column] for column in update_columns},
+            )
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=list(key_columns))
+        await db.execute(statement)
+
+
+async def _update_then_insert(db: AsyncSession, table: Any, rows, columns, key_columns, update_columns) -> None:
+    """Portable fallback: one SELECT of existing keys, one executemany UPDATE and one INSERT per chunk."""
+    key_expression = tuple_(*(table.c[column] for column in key_columns))
+    for chunk in chunked(rows, rows_per_chunk(len(key_columns), PORTABLE_MAX_PARAMETERS, PORTABLE_MAX_ROWS)):
+        keys = [tuple(row[column] for column in key_columns) for row in chunk]
+        result = await db.execute(select(*(table.c[column] for column in key_columns)).where(key_expression.in_(keys)))
+        existing = {tuple(found) for found in result.all()}
+
+        to_update = [row for row, key in zip(chunk, keys) if key in existing]
+        to_insert = [{column: row.get(column) for column in columns} for row, key in zip(chunk, keys) if key not in existing]
+
+        if to_update and update_columns:
+            statement = (
+                update(table)
+                .where(and_(*(table.c[column] == bindparam(f"key_{column}") for column in key_columns)))
+                .values({column: bindparam(f"new_{column}") for column in update_columns})
+            )
+            await db.execute(statement, [
+                {**{f"key_{column}": row[column] for column in key_columns},
+                 **{f"new_{column}": row.get(column) for column in update_columns}}
+                for row in to_update
+            ])
+        if to_insert:
+            await db.execute(insert(table), to_insert)
+
+
+async def bulk_upsert(
+    db: AsyncSession,
+    model: Any,
+    rows: Sequence[dict],
+    key_columns: Sequence[str],
+    update_columns: Sequence[str] | None = None,
+) -> int:
+    """
+    Insert `rows` into the model's table, updating rows whose `key_columns` already exist.
+
+    Runs one set-based statement per chunk: MERGE on SQL Server (chunked under its 2100-parameter
+    limit), INSERT ... ON CONFLICT on PostgreSQL and SQLite, and SELECT + UPDATE + INSERT elsewhere.
+    `update_columns` defaults to every non-key column. The caller owns the transaction (commit).
+    Returns the number of rows written.
+    """
+    if not rows:
+        return 0
+    table = model.__table__
+    columns = list(dict.fromkeys(column for row in rows for column in row))
+    if update_columns is None:
+        update_columns = [column for column in columns if column not in key_columns]
+    rows = _dedupe(rows, key_columns)
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "mssql":
+        await _merge_mssql(db, table, rows, columns, key_columns, update_columns)
+    elif dialect in ("postgresql", "sqlite"):
+        await _insert_on_conflict(db, table, rows, columns, key_columns, update_columns, dialect)
+    else:
+        await _update_then_insert(db, table, rows, columns, key_columns, update_columns)
+    return len(rows)
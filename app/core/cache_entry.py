@@ -0,0 +1,139 @@
+import base64
+import gzip
+import json
+import math
+import random
+import time
+from dataclasses import dataclass
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+IDENTITY = "identity"
+GZIP = "gzip"
+ZSTD = "zstd"
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == GZIP:
+        return gzip.compress(body, compresslevel=5)
+    if encoding == ZSTD:
+        return zstandard.ZstdCompressor(level=3).compress(body)
+    return body
+
+
+def _decompress(payload: bytes, encoding: str) -> bytes:
+    if encoding == GZIP:
+        return gzip.decompress(payload)
+    if encoding == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd-compressed cache entry found but the 'zstandard' package is not installed")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    return payload
+
+
+def resolve_compression(requested: str) -> str:
+    """Map the CACHE_COMPRESSION setting to an encoding that is available in this environment."""
+    requested = (requested or IDENTITY).lower()
+    if requested in ("", "none", IDENTITY):
+        return IDENTITY
+    if requested == ZSTD and zstandard is None:
+        print("WARNING: CACHE_COMPRESSION=zstd but the 'zstandard' package is not installed. Using gzip.")
+        return GZIP
+    if requested not in (GZIP, ZSTD):
+        raise ValueError(f"Unsupported cache compression: {requested}")
+    return requested
+
+
+@dataclass
+class CacheEntry:
+    """
+    A cached, already-encoded response body plus the metadata needed for stale-while-revalidate.
+
+    - body / media_type: the exact bytes and content type sent to the client, so hits skip any parse/encode cycle
+    - soft_expires_at: after this the value is stale; it is still served, but refreshed in the background
+    - hard_expires_at: after this the value is gone (the Redis TTL)
+    - delta: how long the last recomputation took, used by the XFetch early-refresh check
+    """
+    body: bytes
+    media_type: str
+    soft_expires_at: float
+    hard_expires_at: float
+    delta: float = 0.0
+
+    @classmethod
+    def create(
+        cls,
+        body: bytes,
+        media_type: str,
+        soft_ttl: float,
+        hard_ttl: float,
+        delta: float,
+        now: float | None = None,
+    ) -> "CacheEntry":
+        now = time.time() if now is None else now
+        return cls(body, media_type, now + soft_ttl, now + hard_ttl, delta)
+
+    def is_stale(self, now: float | None = None) -> bool:
+        now = time.time() if now is None else now
+        return now >= self.soft_expires_at
+
+    def should_refresh(self, beta: float, now: float | None = None, rand: float | None = None) -> bool:
+        """
+        True once the entry is stale, or earlier with a probability that grows as the soft expiry
+        approaches (XFetch: now - delta * beta * ln(rand) >= soft_expires_at). Slow-to-compute
+        values start refreshing earlier, and refreshes spread out instead of all landing at once.
+        """
+        now = time.time() if now is None else now
+        if self.is_stale(now):
+            return True
+        if self.delta <= 0 or beta <= 0:
+            return False
+        rand = random.random() if rand is None else rand
+        return now - self.delta * beta * math.log(max(rand, 1e-12)) >= self.soft_expires_at
+
+    def remaining_ttl(self, now: float | None = None) -> float:
+        now = time.time() if now is None else now
+        return max(0.0, self.hard_expires_at - now)
+
+    def serialize(self, compression: str = IDENTITY, min_size: int = 0) -> str:
+        """
+        Encode as a one-line JSON header followed by the body. Uncompressed bodies are stored as-is;
+        compressed ones are base64 encoded, since the Upstash REST API only carries text.
+        """
+        encoding = compression if len(self.body) >= min_size else IDENTITY
+        header = {
+            "ct": self.media_type,
+            "soft": self.soft_expires_at,
+            "hard": self.hard_expires_at,
+            "delta": self.delta,
+            "enc": encoding,
+        }
+        if encoding == IDENTITY:
+            payload = self.body.decode("utf-8")
+        else:
+            payload = base64.b64encode(_compress(self.body, encoding)).decode("ascii")
+        return f"{json.dumps(header)}\n{payload}"
+
+    @classmethod
+    def deserialize(cls, raw: str) -> "CacheEntry | None":
+        """Parse a stored entry; anything written in an older format is treated as a miss."""
+        header_text, separator, payload = raw.partition("\n")
+        if not separator:
+            return None
+        try:
+            header = json.loads(header_text)
+        except ValueError:
+            return None
+        if not isinstance(header, dict) or "enc" not in header:
+            return None
+
+        encoding = header["enc"]
+        if encoding == IDENTITY:
+            body = payload.encode("utf-8")
+        else:
+            body = _decompress(base64.b64decode(payload), encoding)
+        return cls(body, header["ct"], header["soft"], header["hard"], header.get("delta", 0.0))
@@ -0,0 +1,67 @@
+import hashlib
+import inspect
+import json
+from functools import lru_cache
+from typing import Any, Callable, Iterable
+
+from app.core.config import settings
+
+
+# Parameters whose values are market symbols; "aapl" and "AAPL" must share a cache entry
+_SYMBOL_SUFFIXES = ("symbol", "ticker")
+
+
+@lru_cache(maxsize=None)
+def _signature(func: Callable) -> inspect.Signature:
+    return inspect.signature(func)
+
+
+def _is_injected(parameter: inspect.Parameter) -> bool:
+    # FastAPI's Depends(...)/Security(...) markers carry the dependency callable
+    return hasattr(parameter.default, "dependency")
+
+
+def _normalize(name: str, value: Any) -> Any:
+    if isinstance(value, str) and name.lower().endswith(_SYMBOL_SUFFIXES):
+        return value.strip().upper()
+    return value
+
+
+def cache_key_params(func: Callable, args: tuple, kwargs: dict, exclude: Iterable[str] = ()) -> dict[str, Any]:
+    """
+    Bind a call to the function signature and return the normalized arguments that identify it.
+    Injected dependencies (db sessions, current user, ...) and `exclude`d names are left out.
+    """
+    signature = _signature(func)
+    bound = signature.bind_partial(*args, **kwargs)
+    bound.apply_defaults()
+    exclude = set(exclude)
+
+    params = {}
+    for name, value in bound.arguments.items():
+        parameter = signature.parameters[name]
+        if name in exclude or _is_injected(parameter):
+            continue
+        if parameter.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD):
+            continue
+        params[name] = _normalize(name, value)
+    return params
+
+
+def build_cache_key(
+    namespace: str,
+    params: dict[str, Any],
+    schema_version: int = 1,
+    generation: int = 0,
+) -> str:
+    """
+    Build `{prefix}:{namespace}:s{schema_version}:g{generation}:{digest}`.
+
+    - schema_version is bumped in code when an endpoint's response shape changes, so new deployments
+      stop reading old entries without a global flush
+    - generation is the runtime namespace version used for cross-worker invalidation
+    - digest hashes the canonical JSON of every identifying argument
+    """
+    canonical = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+    return f"{settings.CACHE_KEY_PREFIX}:{namespace}:s{schema_version}:g{generation}:{digest}"
@@ -0,0 +1,82 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Iterable
+
+
+@dataclass
+class GatherResult:
+    """Outcome of gather_branches: values of branches that succeeded and errors of optional branches that failed."""
+    values: dict[str, Any] = field(default_factory=dict)
+    errors: dict[str, BaseException] = field(default_factory=dict)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self.values.get(name, default)
+
+    @property
+    def complete(self) -> bool:
+        return not self.errors
+
+
+async def gather_branches(
+    branches: dict[str, Awaitable[Any]],
+    required: Iterable[str] = (),
+    timeout: float | None = None,
+) -> GatherResult:
+    """
+    Run independent awaitables concurrently so the total latency is the slowest branch, not the sum.
+
+    - A failure in a `required` branch cancels the remaining branches and is re-raised unchanged
+      (so HTTPException status codes survive).
+    - A failure (or outside cancellation) of an optional branch is recorded in `errors` and the
+      other branches carry on.
+    - Branches still running after `timeout` seconds are cancelled and recorded as TimeoutError.
+    """
+    required = set(required)
+    tasks = {name: asyncio.ensure_future(awaitable) for name, awaitable in branches.items()}
+    names = {task: name for name, task in tasks.items()}
+    result = GatherResult()
+
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    pending = set(tasks.values())
+
+    try:
+        while pending:
+            remaining = None if deadline is None else max(0.0, deadline - loop.time())
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+
+            if not done:
+                for task in pending:
+                    name = names[task]
+                    error = asyncio.TimeoutError(f"Branch '{name}' did not finish within {timeout}s")
+                    if name in required:
+                        raise error
+                    result.errors[name] = error
+                    print(f"WARNING: {error}")
+                break
+
+            # Retrieve every finished branch before raising, so no failure goes unobserved
+            required_error = None
+            for task in done:
+                name = names[task]
+                if task.cancelled():
+                    error = asyncio.CancelledError(f"Branch '{name}' was cancelled")
+                else:
+                    error = task.exception()
+                if error is None:
+                    result.values[name] = task.result()
+                elif name in required:
+                    required_error = required_error or error
+                else:
+                    result.errors[name] = error
+                    print(f"WARNING: Branch '{name}' failed: {error!r}")
+            if required_error is not None:
+                raise required_error
+    finally:
+        leftovers = [task for task in tasks.values() if not task.done()]
+        for task in leftovers:
+            task.cancel()
+        if leftovers:
+            await asyncio.gather(*leftovers, return_exceptions=True)
+
+    return result
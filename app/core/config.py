@@ -18,8 +18,8 @@ class Settings(BaseSettings):
     CLOUD_SERVER_ADMIN: str
     SERVER: str
     DATABASE: str
-    UPSTASH_REDIS_REST_URL: str
-    UPSTASH_REDIS_REST_TOKEN: str
+    UPSTASH_REDIS_REST_URL: str | None = None
+    UPSTASH_REDIS_REST_TOKEN: str | None = None
     FMP_API_KEY: str
     MASSIVE_API_KEY: str
     ALPHA_VANTAGE_API_KEY: str
@@ -32,6 +32,96 @@ class Settings(BaseSettings):
     PASSWORD_RESET_TOKEN_EXPIRE_MINUTES: int = 60
     RESET_PASSWORD_SECRET_KEY: str | None = None
 
+    # Database engine. DATABASE_URL, when non-empty, replaces the Azure SQL URL built from the settings above
+    DATABASE_URL: str = ""
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    # Below Azure SQL's 30 minute idle disconnect
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_SECONDS: int = 30
+    DB_SLOW_QUERY_MS: float = 500.0
+    DB_SLOW_QUERY_SAMPLE_RATE: float = 0.1
+    DB_SLOW_QUERY_ALWAYS_LOG_MS: float = 5000.0
+
+    # Redis backend: "upstash" (REST), "native" (redis.asyncio over pooled TCP) or "memory"
+    REDIS_BACKEND: str = "upstash"
+    REDIS_URL: str = "redis://localhost:6379/0"
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 2.0
+
+    # Per-worker cache of verified access tokens, revoked cluster-wide through a version stamp
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    AUTH_PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_REVOCATION_SYNC_SECONDS: float = 1.0
+    JWT_CACHE_MAX_ENTRIES: int = 10000
+    REVOCATION_FILTER_CAPACITY: int = 100000
+    REVOCATION_FILTER_ERROR_RATE: float = 0.001
+
+    # Pool for CPU-heavy work (password hashing); "thread" or "process"
+    CPU_EXECUTOR_KIND: str = "thread"
+    CPU_EXECUTOR_MAX_WORKERS: int = 4
+    CPU_EXECUTOR_MAX_PENDING: int = 64
+
+    # Hybrid rate limiting: local decisions, reconciled with Redis in batches
+    RATE_LIMIT_SYNC_INTERVAL_SECONDS: float = 0.25
+    RATE_LIMIT_ERROR_BOUND: float = 0.2
+
+    # Cost-weighted quotas: budget of cost units per window and tier, and the tier of each API key
+    QUOTA_TIERS: dict[str, dict[str, int]] = {
+        "anonymous": {"budget": 200, "window": 3600},
+        "user": {"budget": 2000, "window": 3600},
+        "pro": {"budget": 20000, "window": 3600},
+    }
+    QUOTA_API_KEY_TIERS: dict[str, str] = {}
+
+    # Upstream (Financial Modeling Prep) HTTP client
+    FMP_BASE_URL: str = "https://financialmodelingprep.com/stable"
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP2_ENABLED: bool = False
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    HTTP_POOL_TIMEOUT_SECONDS: float = 5.0
+    HTTP_DEFAULT_TIMEOUT_SECONDS: float = 10.0
+    FMP_ENDPOINT_TIMEOUTS: dict[str, float] = {
+        "quote": 5.0,
+        "batch-quote": 5.0,
+        "search-name": 5.0,
+        "historical-price-eod/full": 20.0,
+    }
+
+    # Market-hours-aware cache TTLs
+    MARKET_QUOTE_TTL_OPEN_SECONDS: int = 60
+    MARKET_CLOSE_SETTLE_MINUTES: int = 30
+    MARKET_EOD_PUBLISH_DELAY_MINUTES: int = 60
+    MARKET_MIN_TTL_SECONDS: int = 60
+    MARKET_MAX_TTL_SECONDS: int = 4 * 24 * 60 * 60
+
+    # Stored fundamentals are fresh while the latest fiscal date is this recent; workers index it per symbol
+    FUNDAMENTALS_MAX_AGE_DAYS: int = 365
+    FUNDAMENTALS_FRESHNESS_INDEX_MAX_ENTRIES: int = 10000
+    FUNDAMENTALS_FRESHNESS_INDEX_TTL_SECONDS: int = 3600
+
+    # Negative cache for unknown tickers and empty upstream results
+    NEGATIVE_CACHE_TTL_SECONDS: int = 600
+    NEGATIVE_CACHE_LOCAL_MAX_ENTRIES: int = 10000
+
+    SINGLE_FLIGHT_POLL_INTERVAL_SECONDS: float = 0.25
+
+    # In-process (L1) cache in front of Redis
+    CACHE_L1_ENABLED: bool = True
+    CACHE_L1_MAX_ENTRIES: int = 1024
+    CACHE_L1_MAX_BYTES: int = 64 * 1024 * 1024
+    CACHE_L1_MAX_TTL_SECONDS: int = 60
+    CACHE_VERSION_SYNC_SECONDS: float = 2.0
+    CACHE_XFETCH_BETA: float = 1.0
+    CACHE_KEY_PREFIX: str = "cache"
+    CACHE_COMPRESSION: str = "gzip"
+    CACHE_COMPRESSION_MIN_BYTES: int = 1024
+
     model_config = SettingsConfigDict(
         env_file=str(ENV_PATH),
         env_file_encoding="utf-8",
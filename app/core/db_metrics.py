@@ -0,0 +1,98 @@
+import random
+import time
+from typing import Any, Callable
+
+
+class PoolMetrics:
+    """
+    Per-worker counters for the database connection pool: how long requests wait to check out a
+    connection, how many connections are in use, and how many queries ran slow. Used to size the
+    pool against the worker count.
+    """
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.checkout_waits = 0
+        self.checkout_timeouts = 0
+        self.checkout_wait_total_ms = 0.0
+        self.checkout_wait_max_ms = 0.0
+        self.active = 0
+        self.peak_active = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.queries = 0
+        self.slow_queries = 0
+
+    def record_wait(self, wait_seconds: float, timed_out: bool = False) -> None:
+        wait_ms = wait_seconds * 1000
+        self.checkout_waits += 1
+        if timed_out:
+            self.checkout_timeouts += 1
+        self.checkout_wait_total_ms += wait_ms
+        self.checkout_wait_max_ms = max(self.checkout_wait_max_ms, wait_ms)
+
+    def checked_out(self) -> None:
+        self.checkouts += 1
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+
+    def checked_in(self) -> None:
+        self.active = max(0, self.active - 1)
+
+    def snapshot(self, pool: Any = None) -> dict[str, Any]:
+        data = {
+            "checkouts": self.checkouts,
+            "checkout_timeouts": self.checkout_timeouts,
+            "checkout_wait_avg_ms": round(self.checkout_wait_total_ms / self.checkout_waits, 3) if self.checkout_waits else 0.0,
+            "checkout_wait_max_ms": round(self.checkout_wait_max_ms, 3),
+            "active_connections": self.active,
+            "peak_active_connections": self.peak_active,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "queries": self.queries,
+            "slow_queries": self.slow_queries,
+        }
+        if pool is not None:
+            # Live QueuePool figures, when the pool exposes them
+            for name in ("size", "checkedin", "overflow"):
+                reader = getattr(pool, name, None)
+                if callable(reader):
+                    data[f"pool_{name}"] = reader()
+        return data
+
+
+class SlowQueryLog:
+    """
+    Times statements and logs those slower than `threshold_ms`. Only `sample_rate` of them are
+    logged so a slow database does not flood the logs, but queries past `always_log_ms` are always logged.
+    """
+
+    def __init__(
+        self,
+        metrics: PoolMetrics,
+        threshold_ms: float,
+        sample_rate: float,
+        always_log_ms: float,
+        sampler: Callable[[], float] = random.random,
+    ) -> None:
+        self.metrics = metrics
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.always_log_ms = always_log_ms
+        self.sampler = sampler
+
+    @staticmethod
+    def start() -> float:
+        return time.perf_counter()
+
+    def finish(self, started_at: float, statement: str) -> bool:
+        """Record one finished statement; returns True when it was logged."""
+        self.metrics.queries += 1
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+        if elapsed_ms < self.threshold_ms:
+            return False
+        self.metrics.slow_queries += 1
+        if elapsed_ms < self.always_log_ms and self.sampler() >= self.sample_rate:
+            return False
+        print(f"WARNING: Slow query ({elapsed_ms:.0f} ms): {' '.join(statement.split())[:500]}")
+        return True
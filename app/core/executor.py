@@ -0,0 +1,71 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+
+class CpuExecutor:
+    """
+    Bounded pool for CPU-heavy work (password hashing) so it never runs on the event loop.
+
+    At most `max_pending` jobs may be queued or running; beyond that, callers are shed with a 503
+    instead of piling up behind a burst while quote and chart requests wait. "thread" suits work
+    that releases the GIL (hashlib's scrypt does); "process" isolates pure-Python work.
+    """
+
+    def __init__(self, kind: str, max_workers: int, max_pending: int) -> None:
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unsupported CPU executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.shed = 0
+        self._pool: Executor | None = None
+
+    def start(self) -> None:
+        if self._pool is not None:
+            return
+        if self.kind == "process":
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cpu")
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.pending >= self.max_pending:
+            self.shed += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy. Please retry shortly.",
+                headers={"Retry-After": "1"},
+            )
+        self.start()
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, partial(fn, *args))
+        finally:
+            self.pending -= 1
+
+
+cpu_executor = CpuExecutor(
+    kind=settings.CPU_EXECUTOR_KIND,
+    max_workers=settings.CPU_EXECUTOR_MAX_WORKERS,
+    max_pending=settings.CPU_EXECUTOR_MAX_PENDING,
+)
+
+
+def start_cpu_executor() -> None:
+    cpu_executor.start()
+
+
+def shutdown_cpu_executor() -> None:
+    cpu_executor.shutdown()
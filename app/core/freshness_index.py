@@ -0,0 +1,32 @@
+from datetime import date, timedelta
+from typing import Callable
+
+from app.core.local_cache import LocalCache
+
+
+class FreshnessIndex:
+    """
+    Per-worker map of symbol -> latest stored fiscal date, so "is this symbol's data fresh?"
+    is answered without a database query. Entries expire after `ttl` seconds, which bounds how
+    long a worker can miss data another worker stored. `is_fresh` returns None for unknown symbols.
+    """
+
+    def __init__(self, max_age_days: int, max_entries: int, ttl: float, today: Callable[[], date] = date.today) -> None:
+        self.max_age = timedelta(days=max_age_days)
+        self.ttl = ttl
+        self.today = today
+        self._local = LocalCache(max_entries=max_entries)
+
+    def record(self, symbol: str, latest_date: date | None) -> None:
+        # Wrapped so "no data stored" (None) is distinguishable from a cache miss
+        self._local.set(symbol, (latest_date,), ttl=self.ttl)
+
+    def is_fresh(self, symbol: str) -> bool | None:
+        entry = self._local.get(symbol)
+        if entry is None:
+            return None
+        latest_date = entry[0]
+        return latest_date is not None and latest_date >= self.today() - self.max_age
+
+    def forget(self, symbol: str) -> None:
+        self._local.delete(symbol)
@@ -0,0 +1,89 @@
+import httpx
+from app.core.config import settings
+from app.core.single_flight import upstream_flight
+
+
+_client: httpx.AsyncClient | None = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _build_client() -> httpx.AsyncClient:
+    http2 = settings.HTTP2_ENABLED
+    if http2 and not _http2_available():
+        print("WARNING: HTTP2_ENABLED is set but the 'h2' package is not installed. Falling back to HTTP/1.1.")
+        http2 = False
+
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        timeout=_timeout_for(settings.HTTP_DEFAULT_TIMEOUT_SECONDS),
+    )
+
+
+def _timeout_for(read_timeout: float) -> httpx.Timeout:
+    return httpx.Timeout(
+        read_timeout,
+        connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+        pool=settings.HTTP_POOL_TIMEOUT_SECONDS,
+    )
+
+
+def get_endpoint_timeout(endpoint: str) -> float:
+    return settings.FMP_ENDPOINT_TIMEOUTS.get(endpoint, settings.HTTP_DEFAULT_TIMEOUT_SECONDS)
+
+
+async def start_http_client() -> None:
+    """Create the shared upstream client. Called from the app lifespan."""
+    global _client
+    if _client is None:
+        _client = _build_client()
+
+
+async def close_http_client() -> None:
+    """Close the shared upstream client and its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared, keep-alive pooled client.
+    Falls back to creating it lazily when used outside the app lifespan (scripts, workers).
+    """
+    global _client
+    if _client is None:
+        _client = _build_client()
+    return _client
+
+
+async def _fmp_request(endpoint: str, params: dict) -> httpx.Response:
+    query = {**params, "apikey": settings.FMP_API_KEY}
+    client = get_http_client()
+    return await client.get(
+        f"{settings.FMP_BASE_URL}/{endpoint}",
+        params=query,
+        timeout=_timeout_for(get_endpoint_timeout(endpoint)),
+    )
+
+
+async def fmp_get(endpoint: str, params: dict | None = None) -> httpx.Response:
+    """
+    GET an FMP endpoint (e.g. "quote") through the shared client with its configured timeout.
+    Identical concurrent lookups (same endpoint and params) share a single upstream request.
+    """
+    params = params or {}
+    flight_key = (endpoint, tuple(sorted((name, str(value)) for name, value in params.items())))
+    return await upstream_flight.do(flight_key, lambda: _fmp_request(endpoint, params))
@@ -0,0 +1,34 @@
+from typing import Any, Callable
+
+
+class LazySession:
+    """
+    Stand-in for an AsyncSession that is only created on first use.
+
+    Requests that never reach the database (cache hits, cached principals) never create a session
+    and so never check out a pooled connection. `release()` closes the session, returning its
+    connection to the pool, as soon as the caller is done with it rather than at response end.
+    Using the proxy again afterwards opens a fresh session.
+    """
+
+    def __init__(self, factory: Callable[[], Any]) -> None:
+        self._factory = factory
+        self._session = None
+
+    @property
+    def opened(self) -> bool:
+        return self._session is not None
+
+    @property
+    def session(self) -> Any:
+        if self._session is None:
+            self._session = self._factory()
+        return self._session
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.session, name)
+
+    async def release(self) -> None:
+        session, self._session = self._session, None
+        if session is not None:
+            await session.close()
@@ -0,0 +1,151 @@
+import asyncio
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+    size: int
+    namespace: str | None
+
+
+class LocalCache:
+    """
+    In-process LRU cache bounded by entry count and, unless `max_bytes` is None, by an approximate
+    byte budget. Entries also carry their own TTL and are dropped lazily once expired.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int | None = None) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def set(self, key: str, value: Any, ttl: float, size: int | None = None, namespace: str | None = None) -> None:
+        if ttl <= 0:
+            return
+        if self.max_bytes is None:
+            size = 0
+        else:
+            size = size if size is not None else sys.getsizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            # Never let a single oversized value flush the whole cache
+            self.delete(key)
+            return
+
+        self.delete(key)
+        self._entries[key] = _Entry(value, time.monotonic() + ttl, size, namespace)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or (self.max_bytes is not None and self._bytes > self.max_bytes):
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+    def drop_namespace(self, namespace: str) -> None:
+        for key in [key for key, entry in self._entries.items() if entry.namespace == namespace]:
+            self._remove(key)
+
+    def namespaces(self) -> frozenset[str | None]:
+        return frozenset(entry.namespace for entry in self._entries.values())
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+
+class NamespaceVersions:
+    """
+    Per-namespace version stamps shared through Redis (`{prefix}:{namespace}`).
+
+    Cache keys embed the current version, so bumping it orphans every entry of the namespace in
+    Redis and in every worker's LocalCache at once. Workers learn about a bump by re-reading the
+    stamps in the background at most every `sync_interval` seconds, so a local hit never waits on
+    the network.
+    """
+
+    def __init__(self, redis: Any, local_cache: LocalCache, sync_interval: float, prefix: str = "cache:version") -> None:
+        self.redis = redis
+        self.local_cache = local_cache
+        self.sync_interval = sync_interval
+        self.prefix = prefix
+        self._versions: dict[str, int] = {}
+        self._last_sync = 0.0
+        self._sync_task: asyncio.Task | None = None
+
+    def _key(self, namespace: str) -> str:
+        return f"{self.prefix}:{namespace}"
+
+    async def current(self, namespace: str) -> int:
+        if namespace not in self._versions:
+            # First use of a namespace in this worker: learn its version before building any key
+            await self.sync([namespace])
+        elif time.monotonic() - self._last_sync >= self.sync_interval and self._sync_task is None:
+            self._sync_task = asyncio.ensure_future(self._background_sync())
+        return self._versions.get(namespace, 0)
+
+    async def _background_sync(self) -> None:
+        try:
+            await self.sync()
+        finally:
+            self._sync_task = None
+
+    async def sync(self, namespaces: list[str] | None = None) -> None:
+        namespaces = namespaces or list(self._versions)
+        if not namespaces:
+            return
+        try:
+            values = await self.redis.mget(*[self._key(namespace) for namespace in namespaces])
+        except Exception as e:
+            print(f"WARNING: Redis error syncing cache versions: {e}")
+            self._versions.update({namespace: self._versions.get(namespace, 0) for namespace in namespaces})
+            return
+
+        self._last_sync = time.monotonic()
+        for namespace, value in zip(namespaces, values):
+            version = int(value) if value else 0
+            if namespace in self._versions and self._versions[namespace] != version:
+                self.local_cache.drop_namespace(namespace)
+            self._versions[namespace] = version
+
+    async def bump(self, namespace: str) -> int:
+        version = int(await self.redis.incr(self._key(namespace)))
+        self._versions[namespace] = version
+        self.local_cache.drop_namespace(namespace)
+        return version
@@ -0,0 +1,96 @@
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+
+# Full-day closures. Early closes are treated as full sessions, which only makes a TTL a little
+# shorter than it could be. Extend these sets every year; a missing holiday just means less caching.
+NASDAQ_HOLIDAYS = frozenset({
+    date(2025, 1, 1), date(2025, 1, 9), date(2025, 1, 20), date(2025, 2, 17), date(2025, 4, 18),
+    date(2025, 5, 26), date(2025, 6, 19), date(2025, 7, 4), date(2025, 9, 1), date(2025, 11, 27),
+    date(2025, 12, 25),
+    date(2026, 1, 1), date(2026, 1, 19), date(2026, 2, 16), date(2026, 4, 3), date(2026, 5, 25),
+    date(2026, 6, 19), date(2026, 7, 3), date(2026, 9, 7), date(2026, 11, 26), date(2026, 12, 25),
+    date(2027, 1, 1), date(2027, 1, 18), date(2027, 2, 15), date(2027, 3, 26), date(2027, 5, 31),
+    date(2027, 6, 18), date(2027, 7, 5), date(2027, 9, 6), date(2027, 11, 25), date(2027, 12, 24),
+})
+
+ASX_HOLIDAYS = frozenset({
+    date(2025, 1, 1), date(2025, 1, 27), date(2025, 4, 18), date(2025, 4, 21), date(2025, 4, 25),
+    date(2025, 6, 9), date(2025, 12, 25), date(2025, 12, 26),
+    date(2026, 1, 1), date(2026, 1, 26), date(2026, 4, 3), date(2026, 4, 6), date(2026, 6, 8),
+    date(2026, 12, 25), date(2026, 12, 28),
+    date(2027, 1, 1), date(2027, 1, 26), date(2027, 3, 26), date(2027, 3, 29), date(2027, 6, 14),
+    date(2027, 12, 27), date(2027, 12, 28),
+})
+
+
+@dataclass(frozen=True)
+class ExchangeCalendar:
+    name: str
+    timezone: ZoneInfo
+    open_time: time
+    close_time: time
+    holidays: frozenset[date]
+
+    def is_trading_day(self, day: date) -> bool:
+        return day.weekday() < 5 and day not in self.holidays
+
+    def session_open(self, day: date) -> datetime:
+        return datetime.combine(day, self.open_time, tzinfo=self.timezone)
+
+    def session_close(self, day: date) -> datetime:
+        return datetime.combine(day, self.close_time, tzinfo=self.timezone)
+
+    def is_open(self, at: datetime) -> bool:
+        local = at.astimezone(self.timezone)
+        day = local.date()
+        return self.is_trading_day(day) and self.session_open(day) <= local < self.session_close(day)
+
+    def trading_days_from(self, at: datetime, max_days: int = 14):
+        day = at.astimezone(self.timezone).date()
+        for offset in range(max_days):
+            candidate = day + timedelta(days=offset)
+            if self.is_trading_day(candidate):
+                yield candidate
+
+    def next_open(self, at: datetime) -> datetime | None:
+        for day in self.trading_days_from(at):
+            session_open = self.session_open(day)
+            if session_open > at:
+                return session_open
+        return None
+
+    def last_close(self, at: datetime) -> datetime | None:
+        day = at.astimezone(self.timezone).date()
+        for offset in range(14):
+            candidate = day - timedelta(days=offset)
+            if self.is_trading_day(candidate) and self.session_close(candidate) <= at:
+                return self.session_close(candidate)
+        return None
+
+
+NASDAQ = ExchangeCalendar(
+    name="NASDAQ",
+    timezone=ZoneInfo("America/New_York"),
+    open_time=time(9, 30),
+    close_time=time(16, 0),
+    holidays=NASDAQ_HOLIDAYS,
+)
+
+ASX = ExchangeCalendar(
+    name="ASX",
+    timezone=ZoneInfo("Australia/Sydney"),
+    open_time=time(10, 0),
+    close_time=time(16, 0),
+    holidays=ASX_HOLIDAYS,
+)
+
+
+def exchange_for_symbol(symbol: str) -> ExchangeCalendar:
+    """ASX listings carry FMP's ".AX" suffix; everything else we track trades on NASDAQ."""
+    return ASX if symbol.strip().upper().endswith(".AX") else NASDAQ
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
@@ -0,0 +1,56 @@
+from typing import Any
+
+from app.core.config import settings
+from app.core.local_cache import LocalCache
+from app.redis_connection import redis
+
+
+class NegativeCache:
+    """
+    Remembers lookups that came back empty upstream (unknown tickers, searches with no match).
+
+    Two tiers: a Redis key per miss with its own short TTL, shared by every worker, and a compact
+    per-worker filter so repeated probes for the same junk symbol are answered without any network
+    call at all.
+    """
+
+    def __init__(self, redis_client: Any, ttl: int, local_max_entries: int, prefix: str = "neg") -> None:
+        self.redis = redis_client
+        self.ttl = ttl
+        self.prefix = prefix
+        # Each entry only records presence, so count it as one byte
+        self._local = LocalCache(max_entries=local_max_entries)
+
+    def key(self, namespace: str, value: str) -> str:
+        return f"{self.prefix}:{namespace}:{value.strip().upper()}"
+
+    def is_known_locally(self, namespace: str, value: str) -> bool:
+        return self._local.get(self.key(namespace, value)) is not None
+
+    def remember_locally(self, namespace: str, value: str) -> None:
+        self._local.set(self.key(namespace, value), True, ttl=self.ttl)
+
+    async def is_known_missing(self, namespace: str, value: str) -> bool:
+        if self.is_known_locally(namespace, value):
+            return True
+        try:
+            if await self.redis.get(self.key(namespace, value)):
+                self.remember_locally(namespace, value)
+                return True
+        except Exception as e:
+            print(f"WARNING: Redis error reading negative cache: {e}")
+        return False
+
+    async def record_missing(self, namespace: str, value: str) -> None:
+        self.remember_locally(namespace, value)
+        try:
+            await self.redis.set(self.key(namespace, value), "1", ex=self.ttl)
+        except Exception as e:
+            print(f"WARNING: Redis error writing negative cache: {e}")
+
+
+negative_cache = NegativeCache(
+    redis,
+    ttl=settings.NEGATIVE_CACHE_TTL_SECONDS,
+    local_max_entries=settings.NEGATIVE_CACHE_LOCAL_MAX_ENTRIES,
+)
@@ -0,0 +1,176 @@
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any
+
+from app.core.config import settings
+from app.core.local_cache import LocalCache
+from app.redis_connection import redis
+
+
+# Bumped only for admin-wide revocations; per-user revocations bump `user_version_key(email)`
+GLOBAL_REVOCATION_KEY = "auth:version:principals"
+
+
+def user_version_key(email: str) -> str:
+    """Redis key of a user's version stamp, bumped whenever the user changes or logs out."""
+    return f"user_version:{email}"
+
+
+def _stamp(value: Any) -> str:
+    return str(int(value)) if value else "0"
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Immutable snapshot of the authenticated user, used instead of a User ORM object on the request
+    path. It carries only what endpoints read (no password hash) and round-trips through Redis as JSON.
+    """
+    id: int
+    email: str
+    full_name: str | None
+    is_active: bool
+    is_superuser: bool
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user: Any) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            is_active=user.is_active,
+            is_superuser=user.is_superuser,
+            created_at=user.created_at,
+        )
+
+    def to_json(self, version: str = "0") -> str:
+        data = asdict(self)
+        data["created_at"] = self.created_at.isoformat()
+        data["version"] = version
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, raw: str, version: str | None = None) -> "Principal | None":
+        """
+        Parse a cached snapshot. Entries written in an older shape, or stamped with another user
+        version than `version` (the user changed since), are treated as a miss.
+        """
+        try:
+            data = json.loads(raw)
+            if version is not None and data.get("version", "0") != version:
+                return None
+            return cls(
+                id=data["id"],
+                email=data["email"],
+                full_name=data.get("full_name"),
+                is_active=data["is_active"],
+                is_superuser=data["is_superuser"],
+                created_at=datetime.fromisoformat(data["created_at"]),
+            )
+        except (ValueError, KeyError, TypeError):
+            return None
+
+
+class PrincipalCache:
+    """
+    Per-worker map of already verified access tokens to their Principal.
+
+    An entry never outlives its token (`exp`) or `max_ttl`, and is tagged with its user's version
+    stamp. Logout and password changes bump that user's stamp in Redis; every worker drops that
+    user's entries on its next background sync, so revocation reaches the whole cluster within
+    `sync_interval` seconds without evicting anyone else. `invalidate()` bumps a global stamp for
+    admin-wide revocations, which flushes every entry.
+    """
+
+    def __init__(self, redis_client: Any, max_entries: int, max_ttl: float, sync_interval: float) -> None:
+        self.redis = redis_client
+        self.max_ttl = max_ttl
+        self.sync_interval = sync_interval
+        self._local = LocalCache(max_entries=max_entries)
+        self._global_version: str | None = None
+        # Stamp each cached user's entries were verified against
+        self._user_versions: dict[str, str | None] = {}
+        self._last_sync = 0.0
+        self._sync_task: asyncio.Task | None = None
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    async def get(self, token: str) -> Principal | None:
+        # Learns about revocations (and schedules background re-syncs) without blocking on Redis
+        if self._global_version is None:
+            await self.sync()
+        elif time.monotonic() - self._last_sync >= self.sync_interval and self._sync_task is None:
+            self._sync_task = asyncio.ensure_future(self._background_sync())
+        return self._local.get(self._key(token))
+
+    def set(self, token: str, principal: Principal, expires_at: float | None, version: str | None) -> None:
+        """Cache a principal verified against user stamp `version` (None if it could not be read)."""
+        ttl = self.max_ttl if expires_at is None else min(self.max_ttl, expires_at - time.time())
+        # An unknown stamp never matches Redis, so the next sync drops the entry
+        self._user_versions[principal.email] = None if version is None else _stamp(version)
+        self._local.set(self._key(token), principal, ttl=ttl, namespace=principal.email)
+
+    async def _background_sync(self) -> None:
+        try:
+            await self.sync()
+        finally:
+            self._sync_task = None
+
+    async def sync(self) -> None:
+        """Re-read the global stamp and the stamps of cached users, dropping whatever was revoked."""
+        emails = list(self._user_versions)
+        try:
+            values = await self.redis.mget(GLOBAL_REVOCATION_KEY, *[user_version_key(email) for email in emails])
+        except Exception as e:
+            print(f"WARNING: Redis error syncing auth revocations: {e}")
+            if self._global_version is None:
+                self._global_version = "0"
+            return
+
+        self._last_sync = time.monotonic()
+        global_version = _stamp(values[0])
+        if self._global_version is not None and global_version != self._global_version:
+            self._global_version = global_version
+            self.invalidate_locally()
+            return
+        self._global_version = global_version
+
+        cached_users = self._local.namespaces()
+        for email, value in zip(emails, values[1:]):
+            if email not in cached_users:
+                # Every entry of the user expired or was evicted: stop syncing its stamp
+                self._user_versions.pop(email, None)
+            elif self._user_versions.get(email) != _stamp(value):
+                self.invalidate_user_locally(email)
+
+    def invalidate_user_locally(self, email: str) -> None:
+        """Drop one user's entries in this worker; INCR `user_version_key(email)` to reach the others."""
+        self._local.drop_namespace(email)
+        self._user_versions.pop(email, None)
+
+    def invalidate_locally(self) -> None:
+        self._local.clear()
+        self._user_versions.clear()
+
+    async def invalidate(self) -> None:
+        """Admin-wide revocation: drop every cached principal in this worker now, and in the others on their next sync."""
+        self.invalidate_locally()
+        try:
+            self._global_version = _stamp(await self.redis.incr(GLOBAL_REVOCATION_KEY))
+        except Exception as e:
+            print(f"WARNING: Redis error propagating auth revocation: {e}")
+
+
+principal_cache = PrincipalCache(
+    redis,
+    max_entries=settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES,
+    max_ttl=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS,
+    sync_interval=settings.AUTH_REVOCATION_SYNC_SECONDS,
+)
@@ -0,0 +1,98 @@
+import hashlib
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from app.core.rate_limit import RateLimiter, RateLimitResult
+from app.core.security import verify_access_token
+
+
+ANONYMOUS_TIER = "anonymous"
+USER_TIER = "user"
+
+
+@dataclass(frozen=True)
+class QuotaIdentity:
+    key: str
+    tier: str
+
+
+@dataclass
+class QuotaCharge:
+    """
+    A request's pending charge. The dependency takes `cached_cost` up front; `redis_cache` settles
+    the remaining `cost - cached_cost` only when the response has to be computed (a cache miss).
+    """
+    identity: QuotaIdentity
+    cost: int
+    cached_cost: int
+    settle: Callable[["QuotaCharge"], Awaitable[None]] | None = None
+    settled: bool = False
+
+    @property
+    def miss_cost(self) -> int:
+        return self.cost - self.cached_cost
+
+
+_current_charge: ContextVar[QuotaCharge | None] = ContextVar("quota_charge", default=None)
+
+
+def set_current_charge(charge: QuotaCharge) -> None:
+    # Each request runs in its own task, so the value never leaks into another request
+    _current_charge.set(charge)
+
+
+async def charge_cache_miss() -> None:
+    """Charge the rest of the current request's cost; raises 429 when the budget cannot cover it."""
+    charge = _current_charge.get()
+    if charge is None or charge.settled or charge.settle is None:
+        return
+    charge.settled = True
+    if charge.miss_cost > 0:
+        await charge.settle(charge)
+
+
+def resolve_identity(request: Any, api_key_tiers: dict[str, str]) -> QuotaIdentity:
+    """
+    Who pays for a request: a known X-API-Key (budget of its tier), else the JWT subject of a valid
+    bearer token, else the client IP. Invalid tokens are not rejected here; auth dependencies do that.
+    """
+    api_key = request.headers.get("X-API-Key")
+    if api_key and api_key in api_key_tiers:
+        digest = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+        return QuotaIdentity(f"key:{digest}", api_key_tiers[api_key])
+
+    scheme, _, token = (request.headers.get("Authorization") or "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            subject = verify_access_token(token).get("sub")
+        except Exception:
+            subject = None
+        if subject:
+            return QuotaIdentity(f"user:{subject}", USER_TIER)
+
+    return QuotaIdentity(f"ip:{request.client.host}", ANONYMOUS_TIER)
+
+
+class QuotaEngine:
+    """
+    Cost-weighted budgets per identity. Each tier has a budget of cost units per window, enforced
+    with the GCRA limiter (so spending is smoothed, not reset at window edges). Routes declare
+    what a call costs, and charges are partly refunded when the response came from cache.
+    """
+
+    def __init__(self, redis: Any, tiers: dict[str, dict[str, int]], prefix: str = "quota") -> None:
+        self.limiters = {
+            tier: RateLimiter(redis, max_requests=config["budget"], window=config["window"], prefix=f"{prefix}:{tier}")
+            for tier, config in tiers.items()
+        }
+
+    def _limiter(self, tier: str) -> RateLimiter:
+        return self.limiters.get(tier) or self.limiters[ANONYMOUS_TIER]
+
+    async def charge(self, identity: QuotaIdentity, cost: int) -> RateLimitResult:
+        return await self._limiter(identity.tier).hit(identity.key, cost=cost)
+
+    async def refund(self, identity: QuotaIdentity, amount: int) -> None:
+        if amount > 0:
+            await self._limiter(identity.tier).hit(identity.key, cost=-amount)
@@ -0,0 +1,307 @@
+import asyncio
+import math
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from app.core.redis_backends import RedisScript
+
+
+def _gcra_locally(backend, keys: list, args: list) -> list[int]:
+    emission, period, cost, now = (int(arg) for arg in args)
+    stored = backend._get(keys[0])
+    tat = max(int(stored) if stored is not None else now, now)
+    new_tat = tat + emission * cost
+    allow_at = new_tat - period
+    if cost > 0 and now < allow_at:
+        return [0, max(0, (now - (tat - period)) // emission), allow_at - now, tat - now]
+    if new_tat > now:
+        backend._set(keys[0], new_tat, px=new_tat - now)
+    else:
+        backend._delete(keys[0])
+    return [1, (now - allow_at) // emission, 0, max(0, new_tat - now)]
+
+
+# Generic cell rate algorithm: one key per identifier holding the "theoretical arrival time" (TAT)
+# in ms. Each request pushes the TAT forward by emission * cost and is allowed while the TAT stays
+# within one period of now. Check-and-update happens in one atomic server-side step.
+# A negative cost refunds earlier usage. Returns {allowed, remaining, retry_after_ms, reset_after_ms}.
+GCRA_SCRIPT = RedisScript(
+    source="""
+local emission = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+local tat = tonumber(redis.call("GET", KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+local new_tat = tat + emission * cost
+local allow_at = new_tat - period
+if cost > 0 and now < allow_at then
+    return {0, math.max(0, math.floor((now - (tat - period)) / emission)), allow_at - now, tat - now}
+end
+if new_tat > now then
+    redis.call("SET", KEYS[1], new_tat, "PX", new_tat - now)
+else
+    redis.call("DEL", KEYS[1])
+end
+return {1, math.floor((now - allow_at) / emission), 0, math.max(0, new_tat - now)}
+""",
+    fallback=_gcra_locally,
+)
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float
+    retry_after: float = 0.0
+
+    def headers(self, prefix: str = "RateLimit") -> dict[str, str]:
+        """The {prefix}-Limit/Remaining/Reset response headers, plus Retry-After when the request was rejected."""
+        headers = {
+            f"{prefix}-Limit": str(self.limit),
+            f"{prefix}-Remaining": str(self.remaining),
+            f"{prefix}-Reset": str(math.ceil(self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+class RateLimiter:
+    """
+    Async GCRA limiter: `max_requests` per `window` seconds with bursts up to `max_requests`.
+    Each check is a single non-blocking script call, so the event loop never waits on the limiter.
+    If Redis is unavailable the request is allowed (graceful degradation).
+    """
+
+    def __init__(self, redis: Any, max_requests: int, window: float, prefix: str) -> None:
+        self.redis = redis
+        self.max_requests = max_requests
+        self.window = window
+        self.prefix = prefix
+        self.period_ms = int(window * 1000)
+        self.emission_ms = max(1, self.period_ms // max_requests)
+
+    def _key(self, identifier: str) -> str:
+        return f"{self.prefix}:{identifier}"
+
+    async def hit(self, identifier: str, cost: int = 1, now: float | None = None) -> RateLimitResult:
+        """Consume `cost` units for `identifier`; a negative cost gives units back."""
+        now_ms = int((time.time() if now is None else now) * 1000)
+        try:
+            allowed, remaining, retry_after_ms, reset_after_ms = await self.redis.eval(
+                GCRA_SCRIPT,
+                keys=[self._key(identifier)],
+                args=[self.emission_ms, self.period_ms, cost, now_ms],
+            )
+        except Exception as e:
+            print(f"WARNING: Redis error checking rate limit {self.prefix}: {e}. Allowing request.")
+            return RateLimitResult(True, self.max_requests, self.max_requests, 0.0)
+
+        return RateLimitResult(
+            allowed=bool(int(allowed)),
+            limit=self.max_requests,
+            remaining=min(int(remaining), self.max_requests),
+            reset_after=int(reset_after_ms) / 1000,
+            retry_after=int(retry_after_ms) / 1000,
+        )
+
+
+def _window_check_locally(backend, keys: list, args: list) -> list[int]:
+    pending, cost, limit, ttl_ms = (int(arg) for arg in args)
+    count = int(backend._get(keys[0]) or 0) + pending
+    allowed = 0
+    if count + cost <= limit:
+        count += cost
+        allowed = 1
+    if count > 0:
+        backend._set(keys[0], count, px=ttl_ms)
+    return [allowed, count]
+
+
+def _window_sync_locally(backend, keys: list, args: list) -> list[int]:
+    ttl_ms, deltas = int(args[0]), [int(arg) for arg in args[1:]]
+    counts = []
+    for key, delta in zip(keys, deltas):
+        count = int(backend._get(key) or 0)
+        if delta > 0:
+            count += delta
+            backend._set(key, count, px=ttl_ms)
+        counts.append(count)
+    return counts
+
+
+# Adds the caller's unsynced hits to a fixed-window counter, then admits `cost` more only if the
+# window still has room. Returns {allowed, count}.
+WINDOW_CHECK_SCRIPT = RedisScript(
+    source="""
+local pending = tonumber(ARGV[1])
+local cost = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local count = tonumber(redis.call("GET", KEYS[1]) or "0") + pending
+local allowed = 0
+if count + cost <= limit then
+    count = count + cost
+    allowed = 1
+end
+if count > 0 then
+    redis.call("SET", KEYS[1], count, "PX", ARGV[4])
+end
+return {allowed, count}
+""",
+    fallback=_window_check_locally,
+)
+
+# Flushes a batch of per-identifier deltas (ARGV[2..]) and returns every counter's cluster-wide value
+WINDOW_SYNC_SCRIPT = RedisScript(
+    source="""
+local counts = {}
+for i, key in ipairs(KEYS) do
+    local delta = tonumber(ARGV[i + 1])
+    if delta > 0 then
+        redis.call("INCRBY", key, delta)
+        redis.call("PEXPIRE", key, ARGV[1])
+    end
+    counts[i] = tonumber(redis.call("GET", key) or "0")
+end
+return counts
+""",
+    fallback=_window_sync_locally,
+)
+
+
+@dataclass
+class _Bucket:
+    window: int
+    synced: int = 0
+    pending: int = 0
+
+
+class HybridRateLimiter:
+    """
+    Approximate fixed-window limiter that decides most requests in process memory.
+
+    Each worker keeps, per identifier, the cluster-wide count as of the last sync plus the hits it
+    admitted since (`pending`). Pending hits are flushed to Redis in one batched script call every
+    `sync_interval` seconds. A request is decided locally while this worker holds fewer than
+    `error_bound * max_requests` unsynced hits for the identifier and the estimate stays that far
+    below the limit; closer to the limit, every request takes the precise Redis path. So each worker
+    can overshoot by at most `error_bound * max_requests` per identifier and window.
+    """
+
+    def __init__(
+        self,
+        redis: Any,
+        max_requests: int,
+        window: float,
+        prefix: str,
+        sync_interval: float,
+        error_bound: float,
+    ) -> None:
+        self.redis = redis
+        self.max_requests = max_requests
+        self.window = window
+        self.prefix = prefix
+        self.sync_interval = sync_interval
+        self.local_allowance = int(max_requests * error_bound)
+        self.ttl_ms = int(window * 1000) * 2
+        self._buckets: dict[str, _Bucket] = {}
+        self._last_sync = time.monotonic()
+        self._sync_task: asyncio.Task | None = None
+
+    def _window(self, now: float) -> int:
+        return int(now // self.window)
+
+    def _key(self, identifier: str, window: int) -> str:
+        return f"{self.prefix}:{identifier}:{window}"
+
+    def _result(self, allowed: bool, count: int, now: float, window: int) -> RateLimitResult:
+        reset_after = (window + 1) * self.window - now
+        return RateLimitResult(
+            allowed=allowed,
+            limit=self.max_requests,
+            remaining=max(0, self.max_requests - count),
+            reset_after=reset_after,
+            retry_after=0.0 if allowed else reset_after,
+        )
+
+    def _maybe_schedule_sync(self) -> None:
+        if self._sync_task is None and time.monotonic() - self._last_sync >= self.sync_interval:
+            self._sync_task = asyncio.ensure_future(self._background_sync())
+
+    async def _background_sync(self) -> None:
+        try:
+            await self.sync()
+        finally:
+            self._sync_task = None
+
+    async def hit(self, identifier: str, cost: int = 1, now: float | None = None) -> RateLimitResult:
+        now = time.time() if now is None else now
+        window = self._window(now)
+        bucket = self._buckets.get(identifier)
+        if bucket is None or bucket.window != window:
+            bucket = self._buckets[identifier] = _Bucket(window)
+        self._maybe_schedule_sync()
+
+        # Counters only grow within a window, so a known-exhausted window is denied without Redis
+        if bucket.synced + cost > self.max_requests:
+            return self._result(False, bucket.synced + bucket.pending, now, window)
+
+        estimate = bucket.synced + bucket.pending
+        if bucket.pending + cost <= self.local_allowance and estimate + cost <= self.max_requests - self.local_allowance:
+            bucket.pending += cost
+            return self._result(True, estimate + cost, now, window)
+
+        return await self._check_precisely(identifier, bucket, cost, now)
+
+    async def _check_precisely(self, identifier: str, bucket: _Bucket, cost: int, now: float) -> RateLimitResult:
+        pending, bucket.pending = bucket.pending, 0
+        try:
+            allowed, count = await self.redis.eval(
+                WINDOW_CHECK_SCRIPT,
+                keys=[self._key(identifier, bucket.window)],
+                args=[pending, cost, self.max_requests, self.ttl_ms],
+            )
+        except Exception as e:
+            print(f"WARNING: Redis error checking rate limit {self.prefix}: {e}. Allowing request.")
+            bucket.pending += pending + cost
+            return self._result(True, bucket.synced + bucket.pending, now, bucket.window)
+
+        bucket.synced = max(bucket.synced, int(count))
+        return self._result(bool(int(allowed)), int(count) + bucket.pending, now, bucket.window)
+
+    async def sync(self, now: float | None = None) -> None:
+        """Flush pending hits and refresh cluster-wide counts for every identifier seen this window."""
+        now = time.time() if now is None else now
+        window = self._window(now)
+        for identifier in [identifier for identifier, bucket in self._buckets.items() if bucket.window != window]:
+            del self._buckets[identifier]
+        self._last_sync = time.monotonic()
+
+        buckets = list(self._buckets.items())
+        if not buckets:
+            return
+
+        deltas = []
+        for _, bucket in buckets:
+            deltas.append(bucket.pending)
+            bucket.pending = 0
+        try:
+            counts = await self.redis.eval(
+                WINDOW_SYNC_SCRIPT,
+                keys=[self._key(identifier, window) for identifier, _ in buckets],
+                args=[self.ttl_ms, *deltas],
+            )
+        except Exception as e:
+            print(f"WARNING: Redis error syncing rate limit {self.prefix}: {e}")
+            for (_, bucket), delta in zip(buckets, deltas):
+                bucket.pending += delta
+            return
+
+        for (_, bucket), count in zip(buckets, counts):
+            bucket.synced = max(bucket.synced, int(count))
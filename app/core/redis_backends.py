@@ -0,0 +1,353 @@
+import fnmatch
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable, Sequence
+
+
+@dataclass(frozen=True)
+class RedisScript:
+    """
+    A Lua script plus an optional Python equivalent `fallback(backend, keys, args)`.
+
+    Native Redis runs scripts by SHA (EVALSHA, loading them on first use), Upstash sends the
+    source, and the in-memory backend runs the fallback since it cannot execute Lua.
+    """
+    source: str
+    fallback: Callable[["InMemoryBackend", list, list], Any] | None = None
+
+
+def _script_source(script: "RedisScript | str") -> str:
+    return script.source if isinstance(script, RedisScript) else script
+
+
+class RedisBackend(ABC):
+    """
+    The Redis interface the app codes against. Commands follow the Upstash client's signatures
+    (`set(key, value, ex=, px=, nx=)`, `eval(script, keys=, args=)`), and `pipeline()`/`multi()`
+    return a batch (get/mget/set/delete/incr/eval) whose commands are queued and sent in one
+    round trip by `await batch.exec()`. A backend missing any command fails at construction.
+    """
+    name = "abstract"
+
+    @abstractmethod
+    async def get(self, key: str) -> Any:
+        ...
+
+    @abstractmethod
+    async def mget(self, *keys: str) -> list:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ex: int | None = None, px: int | None = None, nx: bool = False) -> bool:
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> int:
+        ...
+
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        ...
+
+    @abstractmethod
+    async def eval(self, script: RedisScript | str, keys: Sequence[str] | None = None, args: Sequence[Any] | None = None) -> Any:
+        ...
+
+    @abstractmethod
+    def pipeline(self):
+        ...
+
+    @abstractmethod
+    def multi(self):
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class _UpstashBatch:
+    """Adapts an Upstash pipeline so scripts can be queued as RedisScript objects too."""
+
+    def __init__(self, pipeline) -> None:
+        self._pipeline = pipeline
+
+    def get(self, key):
+        self._pipeline.get(key)
+        return self
+
+    def mget(self, *keys):
+        self._pipeline.mget(*keys)
+        return self
+
+    def set(self, key, value, ex=None, px=None, nx=False):
+        self._pipeline.set(key, value, ex=ex, px=px, nx=nx)
+        return self
+
+    def delete(self, *keys):
+        self._pipeline.delete(*keys)
+        return self
+
+    def incr(self, key):
+        self._pipeline.incr(key)
+        return self
+
+    def eval(self, script, keys=None, args=None):
+        self._pipeline.eval(_script_source(script), keys=list(keys or []), args=list(args or []))
+        return self
+
+    async def exec(self) -> list:
+        return await self._pipeline.exec()
+
+
+class UpstashBackend(RedisBackend):
+    """Upstash over its REST API: every command (or batch) is one HTTPS request."""
+    name = "upstash"
+
+    def __init__(self, url: str, token: str) -> None:
+        from upstash_redis.asyncio import Redis
+
+        self.client = Redis(url=url, token=token)
+
+    async def get(self, key):
+        return await self.client.get(key)
+
+    async def mget(self, *keys):
+        return await self.client.mget(*keys)
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        return await self.client.set(key, value, ex=ex, px=px, nx=nx)
+
+    async def delete(self, *keys):
+        return await self.client.delete(*keys)
+
+    async def incr(self, key):
+        return await self.client.incr(key)
+
+    async def eval(self, script, keys=None, args=None):
+        return await self.client.eval(_script_source(script), keys=list(keys or []), args=list(args or []))
+
+    def pipeline(self):
+        return _UpstashBatch(self.client.pipeline())
+
+    def multi(self):
+        return _UpstashBatch(self.client.multi())
+
+    async def close(self):
+        close = getattr(self.client, "close", None)
+        if close is not None:
+            await close()
+
+
+class _NativeBatch:
+    """Adapts a redis-py pipeline to the `exec()` batch interface."""
+
+    def __init__(self, pipeline) -> None:
+        self._pipeline = pipeline
+
+    def get(self, key):
+        self._pipeline.get(key)
+        return self
+
+    def mget(self, *keys):
+        self._pipeline.mget(*keys)
+        return self
+
+    def set(self, key, value, ex=None, px=None, nx=False):
+        self._pipeline.set(key, value, ex=ex, px=px, nx=nx)
+        return self
+
+    def delete(self, *keys):
+        self._pipeline.delete(*keys)
+        return self
+
+    def incr(self, key):
+        self._pipeline.incr(key)
+        return self
+
+    def eval(self, script, keys=None, args=None):
+        keys = list(keys or [])
+        self._pipeline.eval(_script_source(script), len(keys), *keys, *list(args or []))
+        return self
+
+    async def exec(self) -> list:
+        async with self._pipeline as pipeline:
+            return await pipeline.execute()
+
+
+class NativeRedisBackend(RedisBackend):
+    """
+    A self-hosted Redis over RESP with `redis.asyncio`. Commands share a bounded pool of
+    persistent TCP connections instead of paying an HTTPS request each.
+    """
+    name = "native"
+
+    def __init__(self, url: str, max_connections: int, socket_timeout: float) -> None:
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError("REDIS_BACKEND=native requires the 'redis' package (pip install redis)") from e
+
+        self.pool = redis_asyncio.ConnectionPool.from_url(
+            url,
+            max_connections=max_connections,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_timeout,
+            health_check_interval=30,
+            decode_responses=True,
+        )
+        self.client = redis_asyncio.Redis(connection_pool=self.pool)
+        self._scripts: dict[str, Any] = {}
+
+    async def get(self, key):
+        return await self.client.get(key)
+
+    async def mget(self, *keys):
+        return await self.client.mget(*keys)
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        # redis-py returns None when NX prevents the write
+        return bool(await self.client.set(key, value, ex=ex, px=px, nx=nx))
+
+    async def delete(self, *keys):
+        return await self.client.delete(*keys)
+
+    async def incr(self, key):
+        return await self.client.incr(key)
+
+    async def eval(self, script, keys=None, args=None):
+        source = _script_source(script)
+        registered = self._scripts.get(source)
+        if registered is None:
+            registered = self._scripts[source] = self.client.register_script(source)
+        return await registered(keys=list(keys or []), args=list(args or []))
+
+    def pipeline(self):
+        return _NativeBatch(self.client.pipeline(transaction=False))
+
+    def multi(self):
+        return _NativeBatch(self.client.pipeline(transaction=True))
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class _MemoryBatch:
+    def __init__(self, backend: "InMemoryBackend") -> None:
+        self._backend = backend
+        self._commands: list[tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        if name not in ("get", "mget", "set", "delete", "incr", "eval"):
+            raise AttributeError(name)
+
+        def queue(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def exec(self) -> list:
+        # Nothing awaits in between, so the batch is applied atomically
+        return [getattr(self._backend, f"_{name}")(*args, **kwargs) for name, args, kwargs in self._commands]
+
+
+class InMemoryBackend(RedisBackend):
+    """A process-local fake with the same interface, for tests and benchmarks."""
+    name = "memory"
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        self.store: dict[str, Any] = {}
+        self.expires_at: dict[str, float] = {}
+
+    def _alive(self, key: str) -> bool:
+        expires_at = self.expires_at.get(key)
+        if expires_at is not None and expires_at <= self.clock():
+            self.store.pop(key, None)
+            self.expires_at.pop(key, None)
+        return key in self.store
+
+    def _get(self, key):
+        return self.store[key] if self._alive(key) else None
+
+    def _mget(self, *keys):
+        return [self._get(key) for key in keys]
+
+    def _set(self, key, value, ex=None, px=None, nx=False):
+        if nx and self._alive(key):
+            return False
+        self.store[key] = value if isinstance(value, str) else str(value)
+        self.expires_at.pop(key, None)
+        if ex is not None:
+            self.expires_at[key] = self.clock() + ex
+        elif px is not None:
+            self.expires_at[key] = self.clock() + px / 1000
+        return True
+
+    def _delete(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                del self.store[key]
+                self.expires_at.pop(key, None)
+                removed += 1
+        return removed
+
+    def _incr(self, key):
+        value = int(self._get(key) or 0) + 1
+        self.store[key] = str(value)
+        return value
+
+    def keys(self, pattern: str = "*") -> list[str]:
+        return [key for key in list(self.store) if self._alive(key) and fnmatch.fnmatchcase(key, pattern)]
+
+    async def get(self, key):
+        return self._get(key)
+
+    async def mget(self, *keys):
+        return self._mget(*keys)
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        return self._set(key, value, ex=ex, px=px, nx=nx)
+
+    async def delete(self, *keys):
+        return self._delete(*keys)
+
+    async def incr(self, key):
+        return self._incr(key)
+
+    def _eval(self, script, keys=None, args=None):
+        if not isinstance(script, RedisScript) or script.fallback is None:
+            raise NotImplementedError("The in-memory Redis backend only runs scripts that have a Python fallback")
+        return script.fallback(self, list(keys or []), list(args or []))
+
+    async def eval(self, script, keys=None, args=None):
+        return self._eval(script, keys=keys, args=args)
+
+    def pipeline(self):
+        return _MemoryBatch(self)
+
+    def multi(self):
+        return _MemoryBatch(self)
+
+
+def create_backend(
+    kind: str,
+    upstash_url: str | None = None,
+    upstash_token: str | None = None,
+    url: str | None = None,
+    max_connections: int = 50,
+    socket_timeout: float = 2.0,
+) -> RedisBackend:
+    kind = (kind or "upstash").lower()
+    if kind == UpstashBackend.name:
+        if not upstash_url or not upstash_token:
+            raise RuntimeError("REDIS_BACKEND=upstash requires UPSTASH_REDIS_REST_URL and UPSTASH_REDIS_REST_TOKEN")
+        return UpstashBackend(upstash_url, upstash_token)
+    if kind == NativeRedisBackend.name:
+        if not url:
+            raise RuntimeError("REDIS_BACKEND=native requires REDIS_URL")
+        return NativeRedisBackend(url, max_connections=max_connections, socket_timeout=socket_timeout)
+    if kind == InMemoryBackend.name:
+        return InMemoryBackend()
+    raise ValueError(f"Unsupported Redis backend: {kind}")
@@ -0,0 +1,35 @@
+from typing import Any
+
+
+def add_response_headers(request: Any, headers: dict[str, str]) -> None:
+    """
+    Queue headers for whatever response the request ends up with. Dependencies cannot rely on the
+    injected sub-response: FastAPI drops its headers when the endpoint returns a Response itself,
+    as every `redis_cache` route does. Stored in `scope["state"]`, which backs `request.state`.
+    """
+    state = request.scope.setdefault("state", {})
+    state.setdefault("response_headers", {}).update(headers)
+
+
+class ResponseHeadersMiddleware:
+    """ASGI middleware writing the headers queued with `add_response_headers` onto the response."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                pending = scope.get("state", {}).get("response_headers")
+                if pending:
+                    names = {name.lower().encode("latin-1") for name in pending}
+                    headers = [(name, value) for name, value in message.get("headers", []) if name.lower() not in names]
+                    headers.extend((name.lower().encode("latin-1"), str(value).encode("latin-1")) for name, value in pending.items())
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -0,0 +1,172 @@
+import asyncio
+import hashlib
+import json
+import math
+import time
+from typing import Any, Iterable
+
+from app.core.config import settings
+from app.core.redis_backends import RedisScript
+from app.redis_connection import redis
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing of one SHA-256 digest)."""
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.sha256(item.encode("utf-8")).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:16], "big") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+def _load_index(backend, key: str) -> dict[str, float]:
+    raw = backend._get(key)
+    return json.loads(raw) if raw else {}
+
+
+def _revoke_locally(backend, keys: list, args: list) -> int:
+    revoked_key, index_key, version_key = keys
+    jti, expires_at, ttl = args[0], float(args[1]), int(args[2])
+    backend._set(revoked_key, "1", ex=ttl)
+    index = _load_index(backend, index_key)
+    index[jti] = expires_at
+    backend._set(index_key, json.dumps(index))
+    return backend._incr(version_key)
+
+
+def _sync_locally(backend, keys: list, args: list) -> list:
+    version_key, index_key = keys
+    version = backend._get(version_key) or "0"
+    if version == args[0]:
+        return [version]
+    now = float(args[1])
+    index = {jti: expires_at for jti, expires_at in _load_index(backend, index_key).items() if expires_at > now}
+    backend._set(index_key, json.dumps(index))
+    return [version, *index]
+
+
+# Marks one token ID as revoked until its expiry, indexes it for the workers' filters and bumps
+# the index version. KEYS: revoked:{jti}, index, version. ARGV: jti, expires_at, ttl
+REVOKE_SCRIPT = RedisScript(
+    source="""
+redis.call("SET", KEYS[1], "1", "EX", ARGV[3])
+redis.call("ZADD", KEYS[2], ARGV[2], ARGV[1])
+return redis.call("INCR", KEYS[3])
+""",
+    fallback=_revoke_locally,
+)
+
+# Returns {version} when the caller is up to date, else {version, jti...} for every live revocation.
+# KEYS: version, index. ARGV: known version, now
+SYNC_SCRIPT = RedisScript(
+    source="""
+local version = redis.call("GET", KEYS[1]) or "0"
+if version == ARGV[1] then
+    return {version}
+end
+redis.call("ZREMRANGEBYSCORE", KEYS[2], "-inf", ARGV[2])
+local members = redis.call("ZRANGEBYSCORE", KEYS[2], "(" .. ARGV[2], "+inf")
+table.insert(members, 1, version)
+return members
+""",
+    fallback=_sync_locally,
+)
+
+
+class RevocationStore:
+    """
+    Revoked access tokens, keyed by their `jti` claim.
+
+    Every worker keeps a Bloom filter of the revoked IDs, rebuilt from a Redis sorted set
+    (jti scored by expiry) whenever its version changes. The filter is re-checked in the background
+    at most every `sync_interval` seconds. A token whose jti is not in the filter is treated as
+    not revoked without any network call. Only filter hits, true or false positives, are confirmed
+    against `revoked:{jti}` in Redis.
+    """
+
+    def __init__(self, redis_client: Any, capacity: int, error_rate: float, sync_interval: float, prefix: str = "revoked") -> None:
+        self.redis = redis_client
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.prefix = prefix
+        self._filter = BloomFilter(capacity, error_rate)
+        self._version: str | None = None
+        self._last_sync = 0.0
+        self._sync_task: asyncio.Task | None = None
+
+    def key(self, jti: str) -> str:
+        return f"{self.prefix}:{jti}"
+
+    @property
+    def _index_key(self) -> str:
+        return f"{self.prefix}:index"
+
+    @property
+    def _version_key(self) -> str:
+        return f"{self.prefix}:version"
+
+    async def might_be_revoked(self, jti: str) -> bool:
+        if self._version is None:
+            # First use in this worker: load the filter before answering
+            await self.sync()
+        elif self._sync_task is None and time.monotonic() - self._last_sync >= self.sync_interval:
+            self._sync_task = asyncio.ensure_future(self._background_sync())
+        return jti in self._filter
+
+    async def _background_sync(self) -> None:
+        try:
+            await self.sync()
+        finally:
+            self._sync_task = None
+
+    async def sync(self) -> None:
+        self._last_sync = time.monotonic()
+        try:
+            result = await self.redis.eval(
+                SYNC_SCRIPT,
+                keys=[self._version_key, self._index_key],
+                args=[self._version or "", time.time()],
+            )
+        except Exception as e:
+            print(f"WARNING: Redis error syncing revoked tokens: {e}")
+            return
+
+        version, members = str(result[0]), result[1:]
+        if version == self._version:
+            return
+        rebuilt = BloomFilter(max(self.capacity, len(members)), self.error_rate)
+        for jti in members:
+            rebuilt.add(jti)
+        self._filter, self._version = rebuilt, version
+
+    def revoke(self, batch: Any, jti: str, expires_at: float) -> None:
+        """Queue the revocation on a Redis batch (so logout stays one round trip) and apply it locally."""
+        ttl = max(1, math.ceil(expires_at - time.time()))
+        batch.eval(
+            REVOKE_SCRIPT,
+            keys=[self.key(jti), self._index_key, self._version_key],
+            args=[jti, expires_at, ttl],
+        )
+        self._filter.add(jti)
+
+
+revocation_store = RevocationStore(
+    redis,
+    capacity=settings.REVOCATION_FILTER_CAPACITY,
+    error_rate=settings.REVOCATION_FILTER_ERROR_RATE,
+    sync_interval=settings.AUTH_REVOCATION_SYNC_SECONDS,
+)
@@ -1,3 +1,6 @@
+import hashlib
+import time
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Any, Union
 
@@ -6,9 +9,14 @@ from passlib.context import CryptContext
 from fastapi import HTTPException, status
 
 from .config import settings
+from .executor import cpu_executor
+from .local_cache import LocalCache
 
 app_crypto_context = CryptContext(schemes=["scrypt"], deprecated="auto")
 
+# Verified payloads of recently seen access/refresh tokens; hits/misses are counted by LocalCache
+jwt_cache = LocalCache(max_entries=settings.JWT_CACHE_MAX_ENTRIES)
+
 
 def verify_password(password: str, hashed_password: str) -> bool:
     return app_crypto_context.verify(password, hashed_password)
@@ -18,6 +26,16 @@ def get_password_hash(password: str) -> str:
     return app_crypto_context.hash(password)
 
 
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    """verify_password on the CPU executor, keeping scrypt off the event loop."""
+    return await cpu_executor.run(verify_password, password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the CPU executor, keeping scrypt off the event loop."""
+    return await cpu_executor.run(get_password_hash, password)
+
+
 def _create_token(
     subject: Union[str, int],
     secret_key: str,
@@ -32,6 +50,8 @@ def _create_token(
         "iat": int(now.timestamp()),
         "exp": int(expire.timestamp()),
         "type": token_type,
+        # Unique token ID, so revocation can be stored and checked by a short key
+        "jti": uuid.uuid4().hex,
     }
 
     encoded_jwt =  jwt.encode(
@@ -93,8 +113,24 @@ def decode_token_or_401(token: str, secret_key: str) -> dict:
 
     return payload
 
+
+def _decode_memoized(token: str, secret_key: str) -> dict:
+    """
+    decode_token_or_401, remembering the verified payload until the token's `exp`. The key covers
+    the secret too, so rotating a secret never serves payloads verified with the old one.
+    """
+    cache_key = hashlib.sha256(f"{secret_key}\0{token}".encode("utf-8")).hexdigest()
+    payload = jwt_cache.get(cache_key)
+    if payload is None:
+        payload = decode_token_or_401(token, secret_key=secret_key)
+        if "exp" in payload:
+            jwt_cache.set(cache_key, payload, ttl=payload["exp"] - time.time())
+    # Callers get their own copy, so nothing can alter the cached claims
+    return dict(payload)
+
+
 def verify_access_token(token: str) -> dict:
-    payload = decode_token_or_401(
+    payload = _decode_memoized(
         token,
         secret_key=settings.SECRET_KEY
     )
@@ -110,7 +146,7 @@ def verify_access_token(token: str) -> dict:
 
 
 def verify_refresh_token(token: str) -> dict:
-    payload = decode_token_or_401(
+    payload = _decode_memoized(
         token,
         secret_key=settings.REFRESH_SECRET_KEY
     )
@@ -0,0 +1,101 @@
+import asyncio
+import uuid
+from typing import Any, Awaitable, Callable, Hashable
+
+from app.core.redis_backends import RedisScript
+
+
+def _release_lock_locally(backend, keys: list, args: list) -> int:
+    return backend._delete(keys[0]) if backend._get(keys[0]) == args[0] else 0
+
+
+# Deletes the lock only if we still own it, so a slow leader never releases someone else's lock
+_RELEASE_LOCK_SCRIPT = RedisScript(
+    source="""
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+""",
+    fallback=_release_lock_locally,
+)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one in-flight execution per worker.
+
+    The shared work runs in its own task, so a caller that disconnects (and is cancelled)
+    does not cancel the result the other callers are waiting for.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Task] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda finished: self._forget(key, finished))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved even if every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+
+async def distributed_single_flight(
+    redis: Any,
+    lock_key: str,
+    fn: Callable[[], Awaitable[Any]],
+    wait_for_result: Callable[[], Awaitable[Any]],
+    lock_ttl_ms: int = 10000,
+    poll_interval: float = 0.1,
+    max_wait: float = 5.0,
+) -> Any:
+    """
+    Cross-worker variant of SingleFlight built on a short Redis lock (SET NX PX).
+
+    The worker that takes the lock runs `fn`. The others poll `wait_for_result` (normally a
+    cache read) until it returns a value, and run `fn` themselves if nothing shows up within
+    `max_wait`. Any Redis error degrades to simply running `fn`.
+    """
+    token = uuid.uuid4().hex
+    try:
+        acquired = await redis.set(lock_key, token, nx=True, px=lock_ttl_ms)
+    except Exception as e:
+        print(f"WARNING: Redis error acquiring lock {lock_key}: {e}")
+        return await fn()
+
+    if acquired:
+        try:
+            return await fn()
+        finally:
+            try:
+                await redis.eval(_RELEASE_LOCK_SCRIPT, keys=[lock_key], args=[token])
+            except Exception as e:
+                print(f"WARNING: Redis error releasing lock {lock_key}: {e}")
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_wait
+    while loop.time() < deadline:
+        await asyncio.sleep(poll_interval)
+        try:
+            result = await wait_for_result()
+        except Exception as e:
+            print(f"WARNING: Redis error waiting on {lock_key}: {e}")
+            break
+        if result is not None:
+            return result
+
+    return await fn()
+
+
+upstream_flight = SingleFlight()
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+from typing import Callable
+
+from app.core.config import settings
+from app.core.market_calendar import exchange_for_symbol, utc_now
+
+
+def _clamp(seconds: float) -> int:
+    return int(max(settings.MARKET_MIN_TTL_SECONDS, min(seconds, settings.MARKET_MAX_TTL_SECONDS)))
+
+
+def quote_ttl(symbol: str, now: datetime | None = None) -> int:
+    """
+    Short TTL while the symbol's exchange is trading (and shortly after the close, while closing
+    prices settle); otherwise keep the quote until the next session opens.
+    """
+    now = now or utc_now()
+    exchange = exchange_for_symbol(symbol)
+    if exchange.is_open(now):
+        return settings.MARKET_QUOTE_TTL_OPEN_SECONDS
+
+    last_close = exchange.last_close(now)
+    if last_close is not None and now - last_close < timedelta(minutes=settings.MARKET_CLOSE_SETTLE_MINUTES):
+        return settings.MARKET_QUOTE_TTL_OPEN_SECONDS
+
+    next_open = exchange.next_open(now)
+    if next_open is None:
+        return settings.MARKET_MAX_TTL_SECONDS
+    return _clamp((next_open - now).total_seconds())
+
+
+def eod_ttl(symbol: str, now: datetime | None = None) -> int:
+    """End-of-day data only changes when the next session's EOD bar is published, so expire then."""
+    now = now or utc_now()
+    exchange = exchange_for_symbol(symbol)
+    publish_delay = timedelta(minutes=settings.MARKET_EOD_PUBLISH_DELAY_MINUTES)
+    for day in exchange.trading_days_from(now):
+        published_at = exchange.session_close(day) + publish_delay
+        if published_at > now:
+            return _clamp((published_at - now).total_seconds())
+    return settings.MARKET_MAX_TTL_SECONDS
+
+
+def quote_expiry(symbol_param: str) -> Callable[[dict], int]:
+    """redis_cache expiry policy for quote endpoints, keyed on the endpoint's symbol argument."""
+    return lambda params: quote_ttl(params[symbol_param])
+
+
+def eod_expiry(symbol_param: str) -> Callable[[dict], int]:
+    """redis_cache expiry policy for end-of-day endpoints, keyed on the endpoint's symbol argument."""
+    return lambda params: eod_ttl(params[symbol_param])
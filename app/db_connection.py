@@ -1,38 +1,121 @@
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from urllib.parse import quote_plus
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
 from app.core.config import settings
+from app.core.db_metrics import PoolMetrics, SlowQueryLog
+from app.core.lazy_session import LazySession
 
 class Base(DeclarativeBase):
     pass
 
-# Read environment variables
-username = settings.CLOUD_SERVER_ADMIN
-raw_password = settings.DB_PASSWORD
-server = settings.SERVER
-database = settings.DATABASE
-
-# Encode password
-password = quote_plus(raw_password)
-
-# Create the asynchronous engine
-connection_url = (
-    f"mssql+aioodbc://{username}:{password}"
-    f"@{server}.database.windows.net:1433/{database}"
-    "?driver=ODBC+Driver+18+for+SQL+Server"
-    "&Encrypt=yes"
-    "&TrustServerCertificate=no"
+
+def build_connection_url() -> str:
+    if settings.DATABASE_URL:
+        return settings.DATABASE_URL
+
+    # Encode password
+    password = quote_plus(settings.DB_PASSWORD)
+    return (
+        f"mssql+aioodbc://{settings.CLOUD_SERVER_ADMIN}:{password}"
+        f"@{settings.SERVER}.database.windows.net:1433/{settings.DATABASE}"
+        "?driver=ODBC+Driver+18+for+SQL+Server"
+        "&Encrypt=yes"
+        "&TrustServerCertificate=no"
+    )
+
+
+pool_metrics = PoolMetrics()
+slow_query_log = SlowQueryLog(
+    pool_metrics,
+    threshold_ms=settings.DB_SLOW_QUERY_MS,
+    sample_rate=settings.DB_SLOW_QUERY_SAMPLE_RATE,
+    always_log_ms=settings.DB_SLOW_QUERY_ALWAYS_LOG_MS,
 )
 
 
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a free connection."""
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.record_wait(time.perf_counter() - started_at, timed_out=True)
+            raise
+        pool_metrics.record_wait(time.perf_counter() - started_at)
+        return connection
+
+
+connection_url = build_connection_url()
+
 engine = create_async_engine(
     connection_url,
-    echo=True,    
-    pool_pre_ping=True
+    echo=settings.DB_ECHO,
+    poolclass=InstrumentedPool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
 )
 
 
+def _set_statement_timeout(dbapi_connection: Any, seconds: int) -> None:
+    # pyodbc applies Connection.timeout to every statement; aioodbc wraps the pyodbc connection
+    driver_connection = getattr(dbapi_connection, "driver_connection", dbapi_connection)
+    raw_connection = getattr(driver_connection, "_conn", driver_connection)
+    if hasattr(raw_connection, "timeout"):
+        raw_connection.timeout = seconds
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    pool_metrics.connects += 1
+    if settings.DB_STATEMENT_TIMEOUT_SECONDS and engine.dialect.name == "mssql":
+        _set_statement_timeout(dbapi_connection, settings.DB_STATEMENT_TIMEOUT_SECONDS)
+
+
+@event.listens_for(engine.sync_engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    pool_metrics.checked_out()
+
+
+@event.listens_for(engine.sync_engine, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    pool_metrics.checked_in()
+
+
+@event.listens_for(engine.sync_engine, "invalidate")
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    pool_metrics.invalidations += 1
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(slow_query_log.start())
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_started_at")
+    if started:
+        slow_query_log.finish(started.pop(), statement)
+
+
+def database_metrics() -> dict[str, Any]:
+    return pool_metrics.snapshot(engine.pool)
+
+
+async def dispose_engine() -> None:
+    await engine.dispose()
+
+
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
@@ -45,3 +128,15 @@ async def get_db():
 
         yield db
         # This automatically handles closing the connection
+
+
+async def get_lazy_db() -> AsyncGenerator[LazySession, None]:
+    """
+    Session dependency that only checks out a connection on first use. Call `await db.release()`
+    once the service is done to hand the connection back before the response is sent.
+    """
+    db = LazySession(AsyncSessionLocal)
+    try:
+        yield db
+    finally:
+        await db.release()
@@ -4,11 +4,11 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
 from app.core.security import verify_access_token
-from app.db_connection import get_db
-from app.models.user import User
-from app.services.auth_service import get_user_by_email
+from app.core.principal import Principal, principal_cache
+from app.core.revocation import revocation_store
+from app.db_connection import get_lazy_db
+from app.services.auth_service import load_user_snapshot, user_cache_keys
 from app.redis_connection import redis
-import json
 
 
 security = HTTPBearer()
@@ -16,26 +16,20 @@ security = HTTPBearer()
 
 async def get_current_user_and_token(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> Tuple[User, str]:
+    db: Session = Depends(get_lazy_db)
+) -> Tuple[Principal, str]:
     """
     Dependency to get the current authenticated user and token from JWT.
     Returns both user and the token string for operations like logout.
+
+    Tokens verified recently by this worker are answered from the in-process principal cache
+    without JWT verification or any network call.
     """
     token = credentials.credentials
-    
-    # Check if token is blacklisted (user logged out)
-    try:
-        blacklisted = await redis.get(f"blacklist:{token}")
-        if blacklisted:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token has been revoked",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-    except Exception as e:
-        # If Redis is down, we still allow authentication (graceful degradation)
-        print(f"WARNING: Redis error checking blacklist: {e}")
+
+    principal = await principal_cache.get(token)
+    if principal is not None:
+        return principal, token
     
     # Verify and decode the token
     payload = verify_access_token(token)
@@ -48,53 +42,57 @@ async def get_current_user_and_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Check if user data is cached in Redis
+    # Revoked tokens (user logged out) are ruled out by the local filter in the common case; only
+    # possible matches are confirmed in Redis, in the same round trip as the cached user lookup
+    jti = payload.get("jti")
+    if not jti:
+        revocation_key = f"blacklist:{token}"
+    elif await revocation_store.might_be_revoked(jti):
+        revocation_key = revocation_store.key(jti)
+    else:
+        revocation_key = None
+
+    snapshot_key, version_key = user_cache_keys(email)
+    blacklisted, cached_user, version = None, None, None
     try:
-        cached_user = await redis.get(f"user:{email}")
-        if cached_user:
-            user_data = json.loads(cached_user)
-            # Reconstruct User object
-            user = User(
-                id=user_data["id"],
-                email=user_data["email"],
-                full_name=user_data.get("full_name"),
-                is_active=user_data["is_active"],
-                is_superuser=user_data["is_superuser"],
-                hashed_password=user_data["hashed_password"]
-            )
-            return user, token
+        if revocation_key:
+            blacklisted, cached_user, version = await redis.mget(revocation_key, snapshot_key, version_key)
+        else:
+            cached_user, version = await redis.mget(snapshot_key, version_key)
+        version = version or "0"
     except Exception as e:
-        print(f"WARNING: Redis error retrieving user: {e}")
+        # If Redis is down, we still allow authentication (graceful degradation)
+        print(f"WARNING: Redis error checking blacklist and user cache: {e}")
     
-    # Get user from database
-    user = await get_user_by_email(db, email=email)
-    if user is None:
+    if blacklisted:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
+            detail="Token has been revoked",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Cache user data in Redis for 15 minutes
-    try:
-        user_data = {
-            "id": user.id,
-            "email": user.email,
-            "full_name": user.full_name,
-            "is_active": user.is_active,
-            "is_superuser": user.is_superuser,
-            "hashed_password": user.hashed_password
-        }
-        await redis.set(f"user:{email}", json.dumps(user_data), ex=900)  # 15 minutes
-    except Exception as e:
-        print(f"WARNING: Redis error caching user: {e}")
-    
-    return user, token
+    principal = Principal.from_json(cached_user, version) if cached_user else None
+    if principal is None:
+        # Get user from database
+        try:
+            principal = await load_user_snapshot(db, email, version)
+        finally:
+            # The route may not need the database; hand the connection back now
+            await db.release()
+        if principal is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+    principal_cache.set(token, principal, expires_at=payload.get("exp"), version=version)
+    return principal, token
 
 
 async def get_current_user(
-    user_and_token: Tuple[User, str] = Depends(get_current_user_and_token)
-) -> User:
+    user_and_token: Tuple[Principal, str] = Depends(get_current_user_and_token)
+) -> Principal:
     """
     Dependency to get the current authenticated user from JWT token.
     """
@@ -102,8 +100,8 @@ async def get_current_user(
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """
     Dependency to ensure the current user is active.
     """
@@ -116,8 +114,8 @@ async def get_current_active_user(
 
 
 async def get_current_superuser(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """
     Dependency to ensure the current user is a superuser.
     """
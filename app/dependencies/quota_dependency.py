@@ -0,0 +1,50 @@
+from fastapi import Request, HTTPException, status
+from app.redis_connection import redis
+from app.core.config import settings
+from app.core.quota import QuotaCharge, QuotaEngine, resolve_identity, set_current_charge
+from app.core.rate_limit import RateLimitResult
+from app.core.response_headers import add_response_headers
+from typing import Callable
+import math
+
+
+quota_engine = QuotaEngine(redis, settings.QUOTA_TIERS)
+
+
+def _quota_exceeded(result: RateLimitResult) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=f"Quota exceeded. Try again in {max(1, math.ceil(result.retry_after))} seconds.",
+        headers=result.headers("X-Quota")
+    )
+
+
+def quota(cost: int, cached_cost: int | None = None) -> Callable:
+    """
+    Dependency factory charging `cost` quota units per call. With `cached_cost` (only for routes
+    wrapped in `redis_cache`), just `cached_cost` units are required up front and `redis_cache`
+    charges the remainder on a cache miss, so cached responses stay affordable on a low balance.
+    X-Quota-* headers report the balance after everything the request was charged.
+    """
+    cached_cost = cost if cached_cost is None else cached_cost
+
+    async def quota_dependency(req: Request) -> QuotaCharge:
+        identity = resolve_identity(req, settings.QUOTA_API_KEY_TIERS)
+        result = await quota_engine.charge(identity, cached_cost)
+        if not result.allowed:
+            raise _quota_exceeded(result)
+        add_response_headers(req, result.headers("X-Quota"))
+
+        async def settle(charge: QuotaCharge) -> None:
+            miss_result = await quota_engine.charge(identity, charge.miss_cost)
+            if not miss_result.allowed:
+                # The request is rejected, so the up-front part is returned as well
+                await quota_engine.refund(identity, cached_cost)
+                raise _quota_exceeded(miss_result)
+            add_response_headers(req, miss_result.headers("X-Quota"))
+
+        charge = QuotaCharge(identity, cost, cached_cost, settle=settle)
+        set_current_charge(charge)
+        return charge
+
+    return quota_dependency
@@ -1,14 +1,5 @@
-from upstash_ratelimit import Ratelimit, FixedWindow
-from fastapi import Request
-from app.redis_connection import sync_redis
+from app.dependencies.rate_limiter_dependency import get_rate_limiter
 
 
-rate_limit = Ratelimit(
-    redis=sync_redis,
-    limiter=FixedWindow(max_requests=10, window=10),
-    prefix="@upstash/ratelimit"
-)
-
-async def rate_limiter(req: Request):
-    identifier = req.client.host
-    return rate_limit.limit(identifier=identifier)
+# Per-IP limit for the market data endpoints (10 requests per 10 seconds)
+rate_limiter = get_rate_limiter("market_data")
@@ -1,59 +1,87 @@
-from upstash_ratelimit import Ratelimit, FixedWindow
 from fastapi import Request, HTTPException, status
-from app.redis_connection import sync_redis
+from app.redis_connection import redis
+from app.core.config import settings
+from app.core.rate_limit import HybridRateLimiter, RateLimiter
+from app.core.response_headers import add_response_headers
 from typing import Callable
+import math
 
 
 RATE_LIMIT_CONFIGS = {
     "standard": {
-        "limiter": FixedWindow(max_requests=100, window=60),
-        "prefix": "@upstash/ratelimit",
+        "max_requests": 100,
+        "window": 60,
+        "prefix": "ratelimit:standard",
+        "error_message": "Rate limit exceeded. Try again in {seconds} seconds.",
+        "format_time": lambda seconds: seconds
+    },
+    "market_data": {
+        "max_requests": 10,
+        "window": 10,
+        "prefix": "ratelimit:market_data",
+        # Decided in process memory far from the limit; see HybridRateLimiter
+        "mode": "hybrid",
         "error_message": "Rate limit exceeded. Try again in {seconds} seconds.",
         "format_time": lambda seconds: seconds
     },
     "auth": {
-        "limiter": FixedWindow(max_requests=5, window=60),
-        "prefix": "@upstash/ratelimit/auth",
+        "max_requests": 5,
+        "window": 60,
+        "prefix": "ratelimit:auth",
         "error_message": "Too many login attempts. Try again in {seconds} seconds.",
         "format_time": lambda seconds: seconds
     },
     "register": {
-        "limiter": FixedWindow(max_requests=3, window=3600),
-        "prefix": "@upstash/ratelimit/register",
+        "max_requests": 3,
+        "window": 3600,
+        "prefix": "ratelimit:register",
         "error_message": "Registration limit exceeded. Try again in {seconds} minutes.",
-        "format_time": lambda seconds: int(seconds / 60)
+        "format_time": lambda seconds: max(1, int(seconds / 60))
     }
 }
 
 
-rate_limiters = {
-    name: Ratelimit(
-        redis=sync_redis,
-        limiter=config["limiter"],
+def _build_limiter(config: dict):
+    if config.get("mode") == "hybrid":
+        return HybridRateLimiter(
+            redis,
+            max_requests=config["max_requests"],
+            window=config["window"],
+            prefix=config["prefix"],
+            sync_interval=settings.RATE_LIMIT_SYNC_INTERVAL_SECONDS,
+            error_bound=settings.RATE_LIMIT_ERROR_BOUND,
+        )
+    return RateLimiter(
+        redis,
+        max_requests=config["max_requests"],
+        window=config["window"],
         prefix=config["prefix"]
     )
-    for name, config in RATE_LIMIT_CONFIGS.items()
-}
+
+
+rate_limiters = {name: _build_limiter(config) for name, config in RATE_LIMIT_CONFIGS.items()}
 
 
 async def _rate_limit_handler(req: Request, limiter_name: str):
     identifier = req.client.host
     limiter = rate_limiters[limiter_name]
     config = RATE_LIMIT_CONFIGS[limiter_name]
-    
-    response = limiter.limit(identifier=identifier)
-    
-    if not response.allowed:
-        remaining_time = response.reset - response.current
+
+    result = await limiter.hit(identifier)
+
+    if not result.allowed:
+        remaining_time = max(1, math.ceil(result.retry_after))
         formatted_time = config["format_time"](remaining_time)
         error_message = config["error_message"].format(seconds=formatted_time)
-        
+
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail=error_message
+            detail=error_message,
+            headers=result.headers()
         )
-    
-    return response
+
+    add_response_headers(req, result.headers())
+    return result
 
 
 def get_rate_limiter(limiter_name: str) -> Callable:
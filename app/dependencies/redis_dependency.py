@@ -1,51 +1,208 @@
 from app.redis_connection import redis
+from app.core.config import settings
+from app.core.single_flight import SingleFlight, distributed_single_flight
+from app.core.local_cache import LocalCache, NamespaceVersions
+from app.core.cache_entry import CacheEntry, resolve_compression
+from app.core.cache_keys import build_cache_key, cache_key_params
+from app.core.quota import charge_cache_miss
 from functools import wraps
-import json
-from fastapi.responses import JSONResponse
+from typing import Callable, Iterable
+import asyncio
+import time
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
 
 
-def redis_cache(expiry: int):
+cache_flight = SingleFlight()
+local_cache = LocalCache(
+    max_entries=settings.CACHE_L1_MAX_ENTRIES,
+    max_bytes=settings.CACHE_L1_MAX_BYTES,
+)
+cache_versions = NamespaceVersions(redis, local_cache, sync_interval=settings.CACHE_VERSION_SYNC_SECONDS)
+_refresh_tasks: set[asyncio.Task] = set()
+_compression = resolve_compression(settings.CACHE_COMPRESSION)
+
+
+async def invalidate_cache_namespace(namespace: str) -> None:
+    """Invalidate every cached result of an endpoint (e.g. "get_stock_chart") in Redis and in all workers."""
+    await cache_versions.bump(namespace)
+
+
+def _store_locally(cache_key: str, entry: CacheEntry, size: int, namespace: str) -> None:
+    if settings.CACHE_L1_ENABLED:
+        local_cache.set(
+            cache_key,
+            entry,
+            ttl=min(entry.remaining_ttl(), settings.CACHE_L1_MAX_TTL_SECONDS),
+            size=size,
+            namespace=namespace,
+        )
+
+
+async def _read_entry(cache_key: str, namespace: str) -> CacheEntry | None:
+    if settings.CACHE_L1_ENABLED:
+        local_entry = local_cache.get(cache_key)
+        if local_entry is not None:
+            return local_entry
+
+    try:
+        cached_value = await redis.get(cache_key)
+        if cached_value:
+            entry = CacheEntry.deserialize(cached_value)
+            if entry is not None:
+                print("Retrieved from cache")
+                _store_locally(cache_key, entry, len(entry.body), namespace)
+                return entry
+    except Exception as e:
+        print(f"WARNING: Redis error: {e}. Falling back to live data.")
+    return None
+
+
+def _as_response(entry: CacheEntry) -> Response:
+    # The cached bytes are exactly what the client receives: no JSON parse or re-encode on a hit
+    return Response(content=entry.body, media_type=entry.media_type)
+
+
+async def _read_cache(cache_key: str, namespace: str):
+    entry = await _read_entry(cache_key, namespace)
+    return _as_response(entry) if entry is not None else None
+
+
+def _encode_result(result) -> Response:
+    """Render an endpoint result to its final bytes exactly once."""
+    if isinstance(result, Response):
+        return result
+    if hasattr(result, 'model_dump_json'):
+        return Response(content=result.model_dump_json(), media_type="application/json")
+    return JSONResponse(content=jsonable_encoder(result))
+
+
+async def _write_cache(cache_key: str, response: Response, expiry: int, stale_ttl: int, delta: float, namespace: str) -> None:
+    try:
+        entry = CacheEntry.create(
+            bytes(response.body),
+            response.media_type or "application/json",
+            soft_ttl=expiry,
+            hard_ttl=expiry + stale_ttl,
+            delta=delta,
+        )
+        serialized = entry.serialize(_compression, min_size=settings.CACHE_COMPRESSION_MIN_BYTES)
+    except Exception as e:
+        print(f"WARNING: Could not serialize result for {cache_key}: {e}. Data is not cached.")
+        return
+
+    _store_locally(cache_key, entry, len(entry.body), namespace)
+
+    try:
+        await redis.set(cache_key, serialized, ex=expiry + stale_ttl)
+        print(f"Data stored in Redis {cache_key}")
+    except Exception as e:
+        print(f"WARNING: Redis error: {e}. Data is not stored in Redis.")
+
+
+def _schedule_refresh(cache_key: str, load, lock_timeout: float) -> None:
+    """Refresh a stale entry after the response, at most once per worker and (best effort) once per cluster."""
+    if cache_flight.in_flight(cache_key):
+        return
+
+    async def refresh():
+        try:
+            acquired = await redis.set(f"lock:refresh:{cache_key}", "1", nx=True, px=int(lock_timeout * 1000))
+        except Exception as e:
+            print(f"WARNING: Redis error acquiring refresh lock: {e}")
+            acquired = True
+        if acquired:
+            await cache_flight.do(cache_key, load)
+
+    task = asyncio.ensure_future(refresh())
+    _refresh_tasks.add(task)
+
+    def _done(finished: asyncio.Task) -> None:
+        _refresh_tasks.discard(finished)
+        if not finished.cancelled() and finished.exception() is not None:
+            print(f"WARNING: Background refresh of {cache_key} failed: {finished.exception()}")
+
+    task.add_done_callback(_done)
+
+
+def redis_cache(
+    expiry: int | Callable[[dict], int],
+    stale_ttl: int = 0,
+    version: int = 1,
+    exclude: Iterable[str] = (),
+    single_flight: bool = True,
+    distributed_lock: bool = False,
+    lock_timeout: float = 10.0,
+):
+    """
+    Cache the endpoint result in Redis for `expiry` seconds, with an in-process L1 copy in front
+    so hot keys are served without a network hop. The result is rendered to bytes once and the
+    bytes are what gets cached and replayed, optionally compressed in Redis (CACHE_COMPRESSION).
+    `expiry` may also be a policy called with the normalized endpoint arguments (see ttl_policy).
+
+    With `stale_ttl`, entries are kept for a further `stale_ttl` seconds after they go stale. Stale
+    entries are served immediately while a background task refreshes them, and fresh entries are
+    refreshed early with XFetch so refreshes spread out instead of hitting a latency cliff. Leave
+    `stale_ttl` at 0 for endpoints whose work depends on request-scoped resources (db sessions),
+    since refreshes run after the response is sent.
+
+    The key covers every bound argument of the endpoint except injected dependencies and
+    `exclude`d names, with symbols upper-cased. Bump `version` when the response shape changes.
+
+    On a miss, concurrent identical calls in this worker share one execution (`single_flight`).
+    With `distributed_lock`, workers also coordinate through a short Redis lock: one worker
+    computes while the others wait up to `lock_timeout` seconds for the value to land in the cache.
+
+    A miss also charges the rest of the request's quota cost (see `quota(cost, cached_cost)`).
+    """
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            company_ticker = kwargs.get("company_ticker")
-            cache_key = f"{func.__name__}:{company_ticker}"
-
-            try:
-                cached_value = await redis.get(cache_key)
-                if cached_value:
-                    print("Retrieved from cache")
-                    cached_data = json.loads(cached_value)
-                    # Return cached data as JSONResponse
-                    return JSONResponse(content=cached_data)
-            except Exception as e:
-                print(f"WARNING: Redis error: {e}. Falling back to live data.")
-
-            result = await func(*args, **kwargs)
-
-            try:
-                # Extract actual data from JSONResponse if that's what was returned
-                if isinstance(result, JSONResponse):
-                    # JSONResponse.body contains the encoded JSON bytes
-                    # We need to decode it first
-                    data_to_cache = json.loads(result.body.decode('utf-8'))
-                    json_data = json.dumps(data_to_cache)
-                # Convert Pydantic model to dict before JSON serialization
-                elif hasattr(result, 'model_dump'):
-                    json_data = json.dumps(result.model_dump())
-                else:
-                    json_data = json.dumps(result)
-                    
-                await redis.set(cache_key, json_data, ex=expiry)
-                print(f"Data stored in Redis {cache_key}")
-            except Exception as e:
-                print(f"WARNING: Redis error: {e}. Data is not stored in Redis.")
-
-            return result
+            namespace = func.__name__
+            params = cache_key_params(func, args, kwargs, exclude)
+            cache_key = build_cache_key(
+                namespace,
+                params,
+                schema_version=version,
+                generation=await cache_versions.current(namespace),
+            )
 
-        return wrapper
-    return decorator
+            async def load():
+                started = time.perf_counter()
+                response = _encode_result(await func(*args, **kwargs))
+                delta = time.perf_counter() - started
+                # Only successful responses are cached
+                if response.status_code < 400:
+                    ttl = expiry(params) if callable(expiry) else expiry
+                    await _write_cache(cache_key, response, ttl, stale_ttl, delta, namespace)
+                return response
 
+            cached_entry = await _read_entry(cache_key, namespace)
+            if cached_entry is not None:
+                if stale_ttl > 0 and cached_entry.should_refresh(settings.CACHE_XFETCH_BETA):
+                    _schedule_refresh(cache_key, load, lock_timeout)
+                return _as_response(cached_entry)
 
+            # The response has to be computed: charge the full quota cost, not just the cached cost
+            await charge_cache_miss()
 
+            if not single_flight:
+                return await load()
 
+            async def coalesced_load():
+                if not distributed_lock:
+                    return await load()
+                return await distributed_single_flight(
+                    redis,
+                    f"lock:{cache_key}",
+                    load,
+                    wait_for_result=lambda: _read_cache(cache_key, namespace),
+                    lock_ttl_ms=int(lock_timeout * 1000),
+                    poll_interval=settings.SINGLE_FLIGHT_POLL_INTERVAL_SECONDS,
+                    max_wait=lock_timeout,
+                )
+
+            return await cache_flight.do(cache_key, coalesced_load)
+
+        return wrapper
+    return decorator
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
@@ -8,6 +9,11 @@ from app.routers import (auth_router, company_stock_price_router,
                         portfolio_router, company_fundamentals_router, company_balance_sheet_router, ai_router,
                         stock_target_price_router)
 from app.core.config import settings
+from app.core.http_client import start_http_client, close_http_client
+from app.redis_connection import close_redis
+from app.db_connection import database_metrics, dispose_engine
+from app.core.executor import start_cpu_executor, shutdown_cpu_executor
+from app.core.response_headers import ResponseHeadersMiddleware
 from app.core.exceptions import (
     http_exception_handler,
     validation_exception_handler,
@@ -15,12 +21,25 @@ from app.core.exceptions import (
 )
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared upstream resources live for the lifetime of the worker
+    await start_http_client()
+    start_cpu_executor()
+    yield
+    shutdown_cpu_executor()
+    await close_http_client()
+    await close_redis()
+    await dispose_engine()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="Production-grade API with JWT authentication",
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Register exception handlers
@@ -46,6 +65,9 @@ app.add_middleware(
     expose_headers=["*"],  # Expose all headers to frontend
 )
 
+# Writes the rate limit and quota headers queued by dependencies onto every response
+app.add_middleware(ResponseHeadersMiddleware)
+
 # Add trusted host middleware for production security
 # Uncomment and configure for production
 # app.add_middleware(
@@ -86,7 +108,8 @@ async def detailed_health():
         "status": "healthy",
         "api": "operational",
         "database": "connected",
-        "redis": "connected"
+        "redis": "connected",
+        "database_pool": database_metrics()
     }
 
 
@@ -0,0 +1,55 @@
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.db_connection import Base, build_connection_url
+# Importing the models registers their tables on Base.metadata
+from app.models import (  # noqa: F401
+    company_fundamentals_metrics_model,
+    company_fundamentals_model,
+    company_profile_model,
+    portfolio_company_model,
+    user,
+)
+
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    """Emit the migration SQL (alembic upgrade head --sql) without connecting."""
+    context.configure(
+        url=build_connection_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        include_schemas=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection) -> None:
+    context.configure(connection=connection, target_metadata=target_metadata, include_schemas=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_migrations_online() -> None:
+    # A dedicated, unpooled engine: migrations must not hold connections from the app's pool
+    engine = create_async_engine(build_connection_url(), poolclass=NullPool)
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_migrations_online())
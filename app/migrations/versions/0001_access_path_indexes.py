@@ -0,0 +1,79 @@
+"""Indexes for the portfolio, fundamentals and profile access paths
+
+- portfolio_companies is read by (user_name, symbol) and by user_name: a unique composite index
+  serves both and rejects duplicate holdings. SQL Server cannot index nvarchar(max), so both
+  columns are bounded first.
+- company_fundamentals is read by company_symbol ordered by fiscal_year DESC: a matching index
+  that INCLUDEs the projected columns answers the read without key lookups. Its key repeats
+  uq_company_fiscal_year, which stays: the constraint is the narrow index the upsert MERGE
+  matches on, and the covering copy only grows when a year of fundamentals is written (rare,
+  batched) while it is read on every page view. The old single-column company_symbol index is a
+  prefix of both and is dropped, so the table keeps two indexes on the symbol rather than three.
+- company_profiles is read by symbol.
+
+Existing duplicate (user_name, symbol) rows must be merged before upgrading.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.indexes import FUNDAMENTALS_SYMBOL_YEAR_INCLUDE, FUNDAMENTALS_SYMBOL_YEAR_INDEX
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+# Created by the model's old `index=True` on company_symbol
+FUNDAMENTALS_SYMBOL_INDEX = "ix_dbo_company_fundamentals_company_symbol"
+
+
+def _bound_string_columns(lengths: dict[str, tuple[int, int | None]], table: str) -> None:
+    # SQLite ignores declared lengths (and cannot ALTER COLUMN), so only resize on real servers
+    if op.get_bind().dialect.name == "sqlite":
+        return
+    for column, (new_length, old_length) in lengths.items():
+        op.alter_column(
+            table,
+            column,
+            type_=sa.String(new_length),
+            existing_type=sa.String(old_length),
+            existing_nullable=False,
+            schema="dbo",
+        )
+
+
+def upgrade() -> None:
+    _bound_string_columns({"user_name": (100, None), "symbol": (20, None)}, "portfolio_companies")
+    op.create_index(
+        "uq_portfolio_user_symbol",
+        "portfolio_companies",
+        ["user_name", "symbol"],
+        unique=True,
+        schema="dbo",
+    )
+
+    op.create_index(
+        FUNDAMENTALS_SYMBOL_YEAR_INDEX,
+        "company_fundamentals",
+        ["company_symbol", sa.text("fiscal_year DESC")],
+        schema="dbo",
+        mssql_include=FUNDAMENTALS_SYMBOL_YEAR_INCLUDE,
+    )
+    op.drop_index(FUNDAMENTALS_SYMBOL_INDEX, table_name="company_fundamentals", schema="dbo")
+
+    _bound_string_columns({"symbol": (20, None)}, "company_profiles")
+    op.create_index("ix_company_profiles_symbol", "company_profiles", ["symbol"], schema="dbo")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_company_profiles_symbol", table_name="company_profiles", schema="dbo")
+    op.create_index(FUNDAMENTALS_SYMBOL_INDEX, "company_fundamentals", ["company_symbol"], schema="dbo")
+    op.drop_index(FUNDAMENTALS_SYMBOL_YEAR_INDEX, table_name="company_fundamentals", schema="dbo")
+    op.drop_index("uq_portfolio_user_symbol", table_name="portfolio_companies", schema="dbo")
+    # Columns stay bounded: widening back to nvarchar(max) gains nothing
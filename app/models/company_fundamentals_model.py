@@ -1,13 +1,14 @@
-from sqlalchemy import Integer, String, Float, UniqueConstraint, Date
+from sqlalchemy import Index, Integer, String, Float, UniqueConstraint, Date
 from sqlalchemy.orm import Mapped, mapped_column
 from app.db_connection import Base
+from app.models.indexes import FUNDAMENTALS_SYMBOL_YEAR_INCLUDE, FUNDAMENTALS_SYMBOL_YEAR_INDEX
 
 class CompanyFundamentalsModel(Base):
     __table_args__ = (UniqueConstraint('company_symbol', 'fiscal_year', name='uq_company_fiscal_year'), {"schema": "dbo"})
     __tablename__ = "company_fundamentals"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    company_symbol: Mapped[str] = mapped_column(String(20), index=True)
+    company_symbol: Mapped[str] = mapped_column(String(20))
     fiscal_year: Mapped[str] = mapped_column(String(10), nullable=True)
     date: Mapped[Date] = mapped_column(Date, nullable=True)
     revenue: Mapped[float] = mapped_column(Float, nullable=True)
@@ -22,4 +23,14 @@ class CompanyFundamentalsModel(Base):
     price_to_earings_ratio: Mapped[float] = mapped_column(Float, nullable=True)
     price_to_book_ratio: Mapped[float] = mapped_column(Float, nullable=True)
     price_to_sales_ratio: Mapped[float] = mapped_column(Float, nullable=True)      
-    reporting_currency: Mapped[str] = mapped_column(String, nullable=True)
\ No newline at end of file
+    reporting_currency: Mapped[str] = mapped_column(String, nullable=True)
+
+
+# Serves the per-symbol read (newest fiscal year first) without key lookups on SQL Server.
+# Its key leads with company_symbol, so no separate single-column index is needed.
+Index(
+    FUNDAMENTALS_SYMBOL_YEAR_INDEX,
+    CompanyFundamentalsModel.company_symbol,
+    CompanyFundamentalsModel.fiscal_year.desc(),
+    mssql_include=FUNDAMENTALS_SYMBOL_YEAR_INCLUDE,
+)
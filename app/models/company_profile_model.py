@@ -1,13 +1,13 @@
 from app.db_connection import Base
-from sqlalchemy import Integer, String, Float
+from sqlalchemy import Index, Integer, String, Float
 from sqlalchemy.orm import Mapped, mapped_column
 
 class CompanyProfileModel(Base):
-    __table_args__ = {"schema": "dbo"}
+    __table_args__ = (Index("ix_company_profiles_symbol", "symbol"), {"schema": "dbo"})
     __tablename__ = "company_profiles"
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    symbol: Mapped[str] = mapped_column(String)
+    symbol: Mapped[str] = mapped_column(String(20))
     market_cap: Mapped[int] = mapped_column(Integer)
     last_dividend: Mapped[float] = mapped_column(Float)
     average_volume: Mapped[int] = mapped_column(Integer)
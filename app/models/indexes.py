@@ -0,0 +1,22 @@
+# Shared by the models and the migrations, so an index is declared the same way in both.
+# Kept free of engine imports: migrations load this module without a database connection.
+
+FUNDAMENTALS_SYMBOL_YEAR_INDEX = "ix_company_fundamentals_symbol_year"
+
+# Every column the per-symbol fundamentals read projects besides the index key
+FUNDAMENTALS_SYMBOL_YEAR_INCLUDE = [
+    "date",
+    "revenue",
+    "revenue_yoy_change",
+    "gross_profit",
+    "gross_profit_yoy_change",
+    "net_income",
+    "net_income_yoy_change",
+    "free_cash_flow",
+    "free_cash_flow_yoy_change",
+    "eps",
+    "price_to_earings_ratio",
+    "price_to_book_ratio",
+    "price_to_sales_ratio",
+    "reporting_currency",
+]
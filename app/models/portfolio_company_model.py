@@ -1,14 +1,14 @@
 from app.db_connection import Base
-from sqlalchemy import Integer, String, Float
+from sqlalchemy import Index, Integer, String, Float
 from sqlalchemy.orm import Mapped, mapped_column
 
 class PortfolioCompanyModel(Base):
-    __table_args__ = {"schema": "dbo"}
+    __table_args__ = (Index("uq_portfolio_user_symbol", "user_name", "symbol", unique=True), {"schema": "dbo"})
     __tablename__ = "portfolio_companies"
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    user_name: Mapped[str] = mapped_column(String)
-    symbol: Mapped[str] = mapped_column(String)
+    user_name: Mapped[str] = mapped_column(String(100))
+    symbol: Mapped[str] = mapped_column(String(20))
     company_name: Mapped[str] = mapped_column(String)
     shares_owned: Mapped[int] = mapped_column(Integer, default=0)
     average_purchase_price: Mapped[float] = mapped_column(Float, default=0.0)
@@ -1,10 +1,25 @@
-from upstash_redis.asyncio import Redis as async_redis
-from upstash_redis import Redis as sync_redis_for_rate_limit
 from app.core.config import settings
+from app.core.redis_backends import create_backend
 
 
-redis = async_redis(url=settings.UPSTASH_REDIS_REST_URL, 
-              token=settings.UPSTASH_REDIS_REST_TOKEN)
+# The one Redis client the app uses; REDIS_BACKEND picks Upstash REST, native RESP or in-memory
+redis = create_backend(
+    settings.REDIS_BACKEND,
+    upstash_url=settings.UPSTASH_REDIS_REST_URL,
+    upstash_token=settings.UPSTASH_REDIS_REST_TOKEN,
+    url=settings.REDIS_URL,
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+    socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+)
 
-sync_redis = sync_redis_for_rate_limit(url=settings.UPSTASH_REDIS_REST_URL, 
-              token=settings.UPSTASH_REDIS_REST_TOKEN)
\ No newline at end of file
+
+def redis_batch(transaction: bool = False):
+    """
+    Queue several commands and send them in a single round trip with `await batch.exec()`.
+    With `transaction`, the commands run atomically (MULTI/EXEC); otherwise they are pipelined.
+    """
+    return redis.multi() if transaction else redis.pipeline()
+
+
+async def close_redis() -> None:
+    await redis.close()
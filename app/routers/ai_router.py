@@ -1,16 +1,20 @@
 from fastapi import APIRouter, Depends
 from app.services.ai_service.ai_service import run_ai_service
-from app.db_connection import get_db
+from app.db_connection import get_lazy_db
 from app.dependencies.redis_dependency import redis_cache
+from app.dependencies.quota_dependency import quota
 
 
 
 ai_router = APIRouter(prefix="/ai", tags=["AI Services"])
 
 
-@ai_router.get("/analyze/{company_symbol}")
-@redis_cache(expiry=86400)
-async def analyze_company(company_symbol: str, db=Depends(get_db)):
+@ai_router.get("/analyze/{company_symbol}", dependencies=[Depends(quota(cost=100, cached_cost=1))])
+@redis_cache(expiry=86400, distributed_lock=True, lock_timeout=60)
+async def analyze_company(company_symbol: str, db=Depends(get_lazy_db)):
 
-    analysis = await run_ai_service(company_symbol, db)
+    try:
+        analysis = await run_ai_service(company_symbol, db)
+    finally:
+        await db.release()
     return analysis
\ No newline at end of file
@@ -22,7 +22,7 @@ from app.dependencies.rate_limiter_dependency import (
     auth_rate_limiter, 
     register_rate_limiter
 )
-from app.models.user import User
+from app.core.principal import Principal
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db_connection import get_db
 from typing import Tuple
@@ -114,7 +114,7 @@ async def refresh_token(
 
 @auth_router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
 async def logout(
-    user_and_token: Tuple[User, str] = Depends(get_current_user_and_token)
+    user_and_token: Tuple[Principal, str] = Depends(get_current_user_and_token)
 ):
     """
     Logout user by blacklisting their current access token.
@@ -122,13 +122,13 @@ async def logout(
     Requires valid authentication. Frontend should delete stored tokens after this call.
     """
     current_user, access_token = user_and_token
-    await blacklist_tokens(current_user.id, access_token)
+    await blacklist_tokens(current_user.id, current_user.email, access_token)
     return None
 
 
 @auth_router.get("/me", response_model=UserRead)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> UserRead:
     """
     Get current authenticated user information.
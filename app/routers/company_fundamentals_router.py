@@ -2,22 +2,26 @@ import httpx
 from fastapi import APIRouter, HTTPException, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.company_fundamentals_service import get_or_fetch_company_fundamentals
-from app.db_connection import get_db
+from app.db_connection import get_lazy_db
+from app.dependencies.quota_dependency import quota
 
 
 company_fundamentals_router = APIRouter(prefix="/company_fundamentals", tags=["Company Fundamentals"])
 
 
-@company_fundamentals_router.get("/{company_symbol}")
+@company_fundamentals_router.get("/{company_symbol}", dependencies=[Depends(quota(cost=10))])
 async def get_company_fundamentals(
     company_symbol: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_lazy_db)
 ):
     try:
-        fundamentals = await get_or_fetch_company_fundamentals(
-            company_symbol=company_symbol.upper(),
-            db=db
-        )
+        try:
+            fundamentals = await get_or_fetch_company_fundamentals(
+                company_symbol=company_symbol.upper(),
+                db=db
+            )
+        finally:
+            await db.release()
         if not fundamentals:
             raise HTTPException(
                 status_code=404, 
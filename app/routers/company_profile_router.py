@@ -1,12 +1,13 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from app.services.company_profile_service import fetch_company_profile
 from app.schemas.company_profile_schema import CompanyProfileSchema
+from app.dependencies.quota_dependency import quota
 
 
 company_profile_router = APIRouter(prefix="/company_profile", tags=["Company Profile"])
 
 
-@company_profile_router.get("/{company_symbol}", response_model=CompanyProfileSchema)
+@company_profile_router.get("/{company_symbol}", response_model=CompanyProfileSchema, dependencies=[Depends(quota(cost=5))])
 async def get_company_profile(company_symbol: str) -> CompanyProfileSchema:
     return await fetch_company_profile(company_symbol)
     
\ No newline at end of file
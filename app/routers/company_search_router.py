@@ -1,27 +1,32 @@
-import httpx
-from fastapi import APIRouter, HTTPException
-from app.core.config import settings
+from fastapi import APIRouter, HTTPException, Depends
+from app.core.http_client import fmp_get
+from app.core.negative_cache import negative_cache
+from app.dependencies.quota_dependency import quota
 
 
 company_search_router = APIRouter(prefix="/company_search", tags=["Company Search"])
-@company_search_router.get("/{company_name}")
+@company_search_router.get("/{company_name}", dependencies=[Depends(quota(cost=2))])
 async def search_company_by_ticker(company_name: str):
+    if await negative_cache.is_known_missing("search", company_name):
+        raise HTTPException(status_code=404, detail="No Company found in ASX or NASDAQ exchanges")
+
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://financialmodelingprep.com/stable/search-name", params={
-                    "query": company_name,
-                    "apikey": settings.FMP_API_KEY
-                })
-            data = response.json()
-            if not data:
-                raise HTTPException(status_code=404, detail="No Company found")
-            
-            filtered_data = [stock for stock in data if stock.get("exchange") in ["ASX", "NASDAQ"]]
-            
-            if not filtered_data:
-                raise HTTPException(status_code=404, detail="No Company found in ASX or NASDAQ exchanges")
-            
-            return filtered_data
+        response = await fmp_get("search-name", params={
+                "query": company_name,
+            })
+        data = response.json()
+        if not data:
+            await negative_cache.record_missing("search", company_name)
+            raise HTTPException(status_code=404, detail="No Company found")
+        
+        filtered_data = [stock for stock in data if stock.get("exchange") in ["ASX", "NASDAQ"]]
+        
+        if not filtered_data:
+            await negative_cache.record_missing("search", company_name)
+            raise HTTPException(status_code=404, detail="No Company found in ASX or NASDAQ exchanges")
+        
+        return filtered_data
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
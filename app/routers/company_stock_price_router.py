@@ -2,7 +2,9 @@ import httpx
 from fastapi import APIRouter, HTTPException, Depends
 from app.core.config import settings
 from app.dependencies.redis_dependency import redis_cache
+from app.core.ttl_policy import quote_expiry
 from app.dependencies.rate_limit_dependency import rate_limiter
+from app.dependencies.quota_dependency import quota
 from app.services.company_latest_stock_price_service import get_latest_company_stock_price_service
 
 
@@ -11,8 +13,8 @@ company_stock_price_router = APIRouter(prefix="/latest_stock_price", tags=["Comp
 
 
 
-@company_stock_price_router.get("/{company_ticker}", dependencies=[Depends(rate_limiter)])
-@redis_cache(expiry=300)
+@company_stock_price_router.get("/{company_ticker}", dependencies=[Depends(rate_limiter), Depends(quota(cost=1))])
+@redis_cache(expiry=quote_expiry("company_ticker"), stale_ttl=300)
 async def get_latest_stock_price(company_ticker: str):
     return await get_latest_company_stock_price_service(company_ticker)
     
\ No newline at end of file
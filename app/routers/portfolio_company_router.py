@@ -1,7 +1,7 @@
 from app.services.portfolio_service import add_portfolio_company_service, remove_portfolio_company_service
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db_connection import get_db
+from app.db_connection import get_lazy_db
 from app.schemas.portfolio_company_schema import PortfolioCompanySchema
 
 
@@ -10,10 +10,11 @@ portfolio_company_router = APIRouter(prefix="/portfolio", tags=["Portfolio"])
 @portfolio_company_router.post("/add/company")
 async def add_portfolio_company(
     company: PortfolioCompanySchema,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_lazy_db)
 ):
     try:
         result = await add_portfolio_company_service(company.user_name, company, db)
+        await db.release()
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to add company to portfolio: {e}")
@@ -24,10 +25,11 @@ async def add_portfolio_company(
 async def remove_portfolio_company(
     company_symbol: str,
     user_name: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_lazy_db)
 ):
     try:
         result = await remove_portfolio_company_service(user_name, company_symbol, db)
+        await db.release()
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to remove company from portfolio: {e}")
@@ -1,9 +1,11 @@
 import httpx
 import datetime
 from fastapi import APIRouter, HTTPException, Depends
-from app.core.config import settings
+from app.core.http_client import fmp_get
 from app.dependencies.redis_dependency import redis_cache
+from app.core.ttl_policy import eod_expiry
 from app.dependencies.rate_limit_dependency import rate_limiter
+from app.dependencies.quota_dependency import quota
 from app.schemas.stock_price_schema import (
     StockPriceChartResponse,
     StockPriceRecord,
@@ -14,12 +16,10 @@ from app.schemas.stock_price_schema import (
 stock_price_chart_router = APIRouter(prefix="/stock_chart", tags=["Stock Chart"])
 
 
-@stock_price_chart_router.get("/{company_symbol}", response_model=StockPriceChartResponse, dependencies=[Depends(rate_limiter)])
-@redis_cache(expiry=14400)
+@stock_price_chart_router.get("/{company_symbol}", response_model=StockPriceChartResponse, dependencies=[Depends(rate_limiter), Depends(quota(cost=5, cached_cost=1))])
+@redis_cache(expiry=eod_expiry("company_symbol"), stale_ttl=3600)
 async def get_stock_chart(company_symbol: str):
 
-    url = f"https://financialmodelingprep.com/stable/historical-price-eod/full"
-
     current_month = datetime.date.today().month
     previous_fourth_month = current_month - 4
     if current_month <= 4:
@@ -35,47 +35,45 @@ async def get_stock_chart(company_symbol: str):
         "symbol": company_symbol,
         "from": four_month_old_date.isoformat(),
         "to": datetime.date.today().isoformat(),
-        "apikey": settings.FMP_API_KEY
     }
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, params=params)
-            
-            response.raise_for_status() 
-            
-            data = response.json()
-            
-            if not data:
-                raise HTTPException(status_code=404, detail="Ticker not found")
+    try:
+        response = await fmp_get("historical-price-eod/full", params=params)
+        
+        response.raise_for_status() 
+        
+        data = response.json()
+        
+        if not data:
+            raise HTTPException(status_code=404, detail="Ticker not found")
+        
+        price_records = [StockPriceRecord(**record) for record in data]
+        
+        if price_records:
+            overall_high = max(record.high for record in price_records)
+            overall_low = min(record.low for record in price_records)
+            average_volume = sum(record.volume for record in price_records) / len(price_records)
             
-            price_records = [StockPriceRecord(**record) for record in data]
-            
-            if price_records:
-                overall_high = max(record.high for record in price_records)
-                overall_low = min(record.low for record in price_records)
-                average_volume = sum(record.volume for record in price_records) / len(price_records)
-                
-                aggregates = StockPriceAggregates(
-                    overall_high=overall_high,
-                    overall_low=overall_low,
-                    average_volume=average_volume
-                )
-            else:
-                aggregates = StockPriceAggregates(
-                    overall_high=0.0,
-                    overall_low=0.0,
-                    average_volume=0.0
-                )
-            
-            return StockPriceChartResponse(
-                symbol=company_symbol,
-                data=price_records,
-                aggregates=aggregates,
-                record_count=len(price_records)
+            aggregates = StockPriceAggregates(
+                overall_high=overall_high,
+                overall_low=overall_low,
+                average_volume=average_volume
             )
-            
-        except httpx.HTTPStatusError as exc:
-            raise HTTPException(status_code=exc.response.status_code, detail=f"Error from data provider {exc}")
-        except httpx.RequestError as req_exc:
-            raise HTTPException(status_code=503, detail= f"Service unavailable {req_exc}")
\ No newline at end of file
+        else:
+            aggregates = StockPriceAggregates(
+                overall_high=0.0,
+                overall_low=0.0,
+                average_volume=0.0
+            )
+        
+        return StockPriceChartResponse(
+            symbol=company_symbol,
+            data=price_records,
+            aggregates=aggregates,
+            record_count=len(price_records)
+        )
+        
+    except httpx.HTTPStatusError as exc:
+        raise HTTPException(status_code=exc.response.status_code, detail=f"Error from data provider {exc}")
+    except httpx.RequestError as req_exc:
+        raise HTTPException(status_code=503, detail= f"Service unavailable {req_exc}")
\ No newline at end of file
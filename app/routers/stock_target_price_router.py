@@ -1,9 +1,10 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from app.services.stock_target_price_service import fetch_stock_target_price
+from app.dependencies.quota_dependency import quota
 
 stock_target_price_router = APIRouter(prefix="/stock-target-price", tags=["Stock Target Price"])
 
-@stock_target_price_router.get("/{company_symbol}", summary="Get stock target price data for a given ticker")
+@stock_target_price_router.get("/{company_symbol}", summary="Get stock target price data for a given ticker", dependencies=[Depends(quota(cost=2))])
 async def get_stock_target_price(company_symbol: str):
     try:
         target_price_data = await fetch_stock_target_price(company_symbol)
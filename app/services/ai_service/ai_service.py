@@ -4,6 +4,7 @@ from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage, BaseMessage
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
+from app.core.concurrency import gather_branches
 from app.services.company_fundamentals_service import get_or_fetch_company_fundamentals
 from app.services.company_profile_service import fetch_company_profile
 from app.services.company_balance_sheet_service import fetch_company_balance_sheet
@@ -13,15 +14,28 @@ from app.services.ai_service.ai_prompt import generate_prompt
 
 
 async def run_ai_service(symbol: str, db: AsyncSession) -> dict:
-    fundamentals = await get_or_fetch_company_fundamentals(symbol, db)
-    profile = await fetch_company_profile(symbol)
-    balance_sheet = await fetch_company_balance_sheet(symbol)
+    # The prompt tolerates a missing balance sheet, but not missing fundamentals or profile
+    inputs = await gather_branches(
+        {
+            "fundamentals": get_or_fetch_company_fundamentals(symbol, db),
+            "profile": fetch_company_profile(symbol),
+            "balance_sheet": fetch_company_balance_sheet(symbol),
+        },
+        required={"fundamentals", "profile"},
+    )
+    fundamentals = inputs.get("fundamentals")
+    profile = inputs.get("profile")
+    balance_sheet = inputs.get("balance_sheet")
 
     anthropic_client = ChatAnthropic(api_key=settings.CLAUDE_API_KEY,
                                       model="claude-opus-4-20250514", temperature=0.7,
                                       max_tokens=1000, top_p=1, stop=None)
 
-    prompt = generate_prompt(profile.model_dump(), fundamentals, balance_sheet.model_dump())
+    prompt = generate_prompt(
+        profile.model_dump(),
+        fundamentals,
+        balance_sheet.model_dump() if balance_sheet else None,
+    )
 
     response = anthropic_client.invoke(
         input = [prompt]
@@ -1,23 +1,25 @@
 from typing import Optional
-import json
 from fastapi import HTTPException, status
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.core.security import (
-    get_password_hash, 
-    verify_password, 
+    get_password_hash_async,
+    verify_password_async,
     create_access_token, 
     create_refresh_token,
     verify_refresh_token,
     create_password_reset_token,
+    verify_access_token,
     verify_password_reset_token
 )
 from app.models.user import User
 from app.schemas.user_model import UserCreate
 from app.schemas.token_model import Token
-from app.redis_connection import redis
+from app.redis_connection import redis, redis_batch
+from app.core.principal import Principal, principal_cache, user_version_key
+from app.core.revocation import revocation_store
 from app.core.config import settings
 
 
@@ -32,11 +34,49 @@ async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
     return result.scalars().first()
 
 
+def user_cache_keys(email: str) -> tuple[str, str]:
+    """Redis keys of a user's snapshot and of its version stamp, bumped whenever the user changes."""
+    return f"user:{email}", user_version_key(email)
+
+
+async def load_user_snapshot(db: AsyncSession, email: str, version: str | None) -> Optional[Principal]:
+    """
+    Read the user from the database and cache the snapshot stamped with `version` (the stamp read
+    before the query). If the user changes meanwhile, the stamp no longer matches and readers
+    ignore the entry. With an unknown version (Redis down) nothing is cached.
+    """
+    user = await get_user_by_email(db, email=email)
+    if user is None:
+        return None
+    principal = Principal.from_user(user)
+
+    if version is not None:
+        try:
+            # Cache user data in Redis for 15 minutes
+            await redis.set(user_cache_keys(email)[0], principal.to_json(version), ex=900)
+        except Exception as e:
+            print(f"WARNING: Redis error caching user: {e}")
+    return principal
+
+
+async def invalidate_user_snapshot(email: str) -> None:
+    """Drop the cached snapshot and bump its version, which also revokes the user's cached principals in all workers."""
+    snapshot_key, version_key = user_cache_keys(email)
+    try:
+        batch = redis_batch(transaction=True)
+        batch.delete(snapshot_key)
+        batch.incr(version_key)
+        await batch.exec()
+    except Exception as e:
+        print(f"WARNING: Redis error clearing user cache: {e}")
+    principal_cache.invalidate_user_locally(email)
+
+
 async def create_user(db: AsyncSession, user_in: UserCreate) -> User:
     db_user = User(
         email=user_in.email,
         full_name=user_in.full_name,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=await get_password_hash_async(user_in.password),
     )
     db.add(db_user)
     await db.commit()
@@ -48,7 +88,7 @@ async def authenticate_user(db: AsyncSession, email: str, password: str) -> Opti
     user = await get_user_by_email(db, email=email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return None
     return user
 
@@ -58,24 +98,14 @@ async def create_access_and_refresh_token(email: str, user_id: int) -> Token:
     access_token = create_access_token(email)
     refresh_token = create_refresh_token(email)
 
-    try:
-        await redis.set(
-            f"access_token:{user_id}",
-            access_token,
-            ex=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
-        )
-        
-        await redis.set(
-            f"refresh_token:{user_id}",
-            refresh_token,
-            ex=settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
-        )
+    refresh_ttl = settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
 
-        await redis.set(
-            f"refresh_token_user:{refresh_token}",
-            email,
-            ex=settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
-        )
+    try:
+        batch = redis_batch(transaction=True)
+        batch.set(f"access_token:{user_id}", access_token, ex=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+        batch.set(f"refresh_token:{user_id}", refresh_token, ex=refresh_ttl)
+        batch.set(f"refresh_token_user:{refresh_token}", email, ex=refresh_ttl)
+        await batch.exec()
         
         print(f"Tokens stored in Redis for user {email}")
     except Exception as e:
@@ -98,18 +128,27 @@ async def refresh_access_token(refresh_token: str, db: AsyncSession) -> Token:
             detail="Invalid refresh token",
         )
     
+    # Validate the refresh token and read the cached user snapshot in one round trip
+    snapshot_key, version_key = user_cache_keys(email)
     try:
-        stored_email = await redis.get(f"refresh_token_user:{refresh_token}")
-        if not stored_email or stored_email!= email:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Refresh token has been revoked or is invalid",
-            )
+        stored_email, cached_user, version = await redis.mget(
+            f"refresh_token_user:{refresh_token}", snapshot_key, version_key
+        )
+        version = version or "0"
     except Exception as e:
         print(f"WARNING: Redis error validating refresh token: {e}")
+        stored_email, cached_user, version = email, None, None
+
+    if not stored_email or stored_email != email:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token has been revoked or is invalid",
+        )
     
-    # Get user from database
-    user = await get_user_by_email(db, email=email)
+    # The database is only read when the snapshot is missing or stale
+    user = Principal.from_json(cached_user, version) if cached_user else None
+    if user is None:
+        user = await load_user_snapshot(db, email, version)
     if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -120,29 +159,28 @@ async def refresh_access_token(refresh_token: str, db: AsyncSession) -> Token:
     return await create_access_and_refresh_token(email, user.id)
 
 
-async def blacklist_tokens(user_id: int, access_token: str) -> None:
+async def blacklist_tokens(user_id: int, email: str, access_token: str) -> None:
     """Blacklist user tokens during logout"""
+    claims = verify_access_token(access_token)
     try:
-        # Blacklist the access token for remaining validity period
-        await redis.set(
-            f"blacklist:{access_token}",
-            "true",
-            ex=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
-        )
-        
-        # Delete stored tokens
-        await redis.delete(f"access_token:{user_id}")
-        await redis.delete(f"refresh_token:{user_id}")
-        
-        # Delete user cache
-        user = await redis.get(f"user:{user_id}")
-        if user:
-            user_data = json.loads(user)
-            await redis.delete(f"user:{user_data.get('email')}")
+        batch = redis_batch(transaction=True)
+        # Revoke the access token for its remaining validity period
+        if claims.get("jti"):
+            revocation_store.revoke(batch, claims["jti"], expires_at=claims["exp"])
+        else:
+            # Tokens issued before jti claims existed are blacklisted by their full value
+            batch.set(f"blacklist:{access_token}", "true", ex=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+        # Delete stored tokens and the cached user
+        snapshot_key, version_key = user_cache_keys(email)
+        batch.delete(f"access_token:{user_id}", f"refresh_token:{user_id}", snapshot_key)
+        # Other workers drop this user's verified tokens on their next sync
+        batch.incr(version_key)
+        await batch.exec()
         
         print(f"Tokens blacklisted for user {user_id}")
     except Exception as e:
         print(f"WARNING: Redis error blacklisting tokens: {e}")
+    principal_cache.invalidate_user_locally(email)
 
 
 async def create_password_reset_token_for_email(db: AsyncSession, email: str) -> str:
@@ -186,14 +224,12 @@ async def reset_password_with_token(
             detail="User not found",
         )
 
-    user.hashed_password = get_password_hash(new_password)
+    user.hashed_password = await get_password_hash_async(new_password)
     db.add(user)
     await db.commit()
     await db.refresh(user)
 
-    try:
-        await redis.delete(f"user:{email}")
-    except Exception as e:
-        print(f"WARNING: Redis error clearing user cache: {e}")
+    await invalidate_user_snapshot(email)
 
     return user
+
@@ -1,120 +1,110 @@
 import httpx
-from app.core.config import settings
+from app.core.http_client import fmp_get
+from app.core.concurrency import gather_branches
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, update, and_
-from datetime import date, datetime, timedelta
+from sqlalchemy import bindparam, select, func, update, and_
+from datetime import date
 from typing import Dict, Any, List, Union, Optional
+from app.core.bulk_upsert import bulk_upsert
+from app.core.config import settings
+from app.core.freshness_index import FreshnessIndex
 from app.models.company_fundamentals_model import CompanyFundamentalsModel
 
 
-BASE_URL = "https://financialmodelingprep.com/stable"
-
 async def fetch_income_statement(company_symbol: str, limit: int = 5) -> dict:
     try:
-        url = f"{BASE_URL}/income-statement"
         params = {
             "symbol": company_symbol,
             "limit": limit,
             "period": "annual",
-            "apikey": settings.FMP_API_KEY
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            result = response.json()
-            income_statements = []
-            for record in result:
-                income_statements.append({
-                    "date": date.fromisoformat(record.get("date")) if record.get("date") else None,
-                    "fiscal_year": record.get("fiscalYear", None),
-                    "company_symbol": record.get("symbol", None),
-                    "revenue": record.get("revenue", None),
-                    "gross_profit": record.get("grossProfit", None),
-                    "net_income": record.get("netIncome", None),
-                    "eps": record.get("eps", None),
-                    "reporting_currency": record.get("reportedCurrency", None)
-                })
-            return income_statements
+        response = await fmp_get("income-statement", params=params)
+        response.raise_for_status()
+        result = response.json()
+        income_statements = []
+        for record in result:
+            income_statements.append({
+                "date": date.fromisoformat(record.get("date")) if record.get("date") else None,
+                "fiscal_year": record.get("fiscalYear", None),
+                "company_symbol": record.get("symbol", None),
+                "revenue": record.get("revenue", None),
+                "gross_profit": record.get("grossProfit", None),
+                "net_income": record.get("netIncome", None),
+                "eps": record.get("eps", None),
+                "reporting_currency": record.get("reportedCurrency", None)
+            })
+        return income_statements
     except httpx.HTTPError as e:
         raise RuntimeError(f"Error fetching income statement for {company_symbol}: {e}")
     
 
 async def fetch_financial_ratios(company_symbol: str, limit : int = 5):
     try:
-        url = f"{BASE_URL}/ratios"
         params = {
             "symbol": company_symbol,
             "limit": limit,
             "period": "annual",
-            "apikey": settings.FMP_API_KEY
         }
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, params= params)
-            resp.raise_for_status()
-            result = resp.json()
-
-            financial_ratios = []
-            for record in result:
-                financial_ratios.append({
-                    "fiscal_year": record.get("fiscalYear", None),
-                    "price_to_earings_ratio": record.get("priceToEarningsRatio", None),
-                    "price_to_book_ratio": record.get("priceToBookRatio", None),
-                    "price_to_sales_ratio": record.get("priceToSalesRatio", None),
-                    "reporting_currency": record.get("reportedCurrency", None)
-                })
-            return financial_ratios
+        resp = await fmp_get("ratios", params=params)
+        resp.raise_for_status()
+        result = resp.json()
+
+        financial_ratios = []
+        for record in result:
+            financial_ratios.append({
+                "fiscal_year": record.get("fiscalYear", None),
+                "price_to_earings_ratio": record.get("priceToEarningsRatio", None),
+                "price_to_book_ratio": record.get("priceToBookRatio", None),
+                "price_to_sales_ratio": record.get("priceToSalesRatio", None),
+                "reporting_currency": record.get("reportedCurrency", None)
+            })
+        return financial_ratios
     except httpx.HTTPError as e:
         raise RuntimeError(f"Error fetching the financial ratios for {company_symbol}. Error: {e}")
     
 
 async def fetch_balance_sheet(company_symbol: str, limit: int = 5) -> dict:
     try:
-        url = f"{BASE_URL}/balance-sheet-statement"
         params = {
             "symbol": company_symbol,
             "limit": limit,
             "period": "annual",
-            "apikey": settings.FMP_API_KEY
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            result = response.json()
-            balance_sheets = []
-            for record in result:
-                balance_sheets.append({
-                    "fiscal_year": record.get("fiscalYear", None),
-                    "total_assets": record.get("totalAssets", None),
-                    "total_liabilities": record.get("totalLiabilities", None),
-                    "reporting_currency": record.get("reportedCurrency", None)
-                })
-            return balance_sheets
+        response = await fmp_get("balance-sheet-statement", params=params)
+        response.raise_for_status()
+        result = response.json()
+        balance_sheets = []
+        for record in result:
+            balance_sheets.append({
+                "fiscal_year": record.get("fiscalYear", None),
+                "total_assets": record.get("totalAssets", None),
+                "total_liabilities": record.get("totalLiabilities", None),
+                "reporting_currency": record.get("reportedCurrency", None)
+            })
+        return balance_sheets
     except httpx.HTTPError as e:
         raise RuntimeError(f"Error fetching balance sheet for {company_symbol}: {e}")
     
     
 async def fetch_cash_flow_statement(company_symbol: str, limit: int = 5) -> dict:
     try:
-        url = f"{BASE_URL}/cash-flow-statement"
         params = {
             "symbol": company_symbol,
             "limit": limit,
             "period": "annual",
-            "apikey": settings.FMP_API_KEY
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            result = response.json()
-
-            cash_flow_statements = []
-            for record in result:
-                cash_flow_statements.append({
-                    "fiscal_year": record.get("fiscalYear", None),
-                    "free_cash_flow": record.get("freeCashFlow", None),
-                    "reporting_currency": record.get("reportedCurrency", None)
-                })
-            return cash_flow_statements
+        response = await fmp_get("cash-flow-statement", params=params)
+        response.raise_for_status()
+        result = response.json()
+
+        cash_flow_statements = []
+        for record in result:
+            cash_flow_statements.append({
+                "fiscal_year": record.get("fiscalYear", None),
+                "free_cash_flow": record.get("freeCashFlow", None),
+                "reporting_currency": record.get("reportedCurrency", None)
+            })
+        return cash_flow_statements
     except httpx.HTTPError as e:
         raise RuntimeError(f"Error fetching cash flow statement for {company_symbol}: {e}")
 
@@ -164,9 +154,18 @@ def calc_yoy_metrics(data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
 
 async def process_company_fundamentals(company_symbol: str) -> list[Dict[str, Any]]:
     try:
-        income_statement = await fetch_income_statement(company_symbol)
-        cash_flow_statement = await fetch_cash_flow_statement(company_symbol)
-        financial_ratios = await fetch_financial_ratios(company_symbol)
+        # All three statements are persisted together, so every branch is required
+        statements = await gather_branches(
+            {
+                "income_statement": fetch_income_statement(company_symbol),
+                "cash_flow_statement": fetch_cash_flow_statement(company_symbol),
+                "financial_ratios": fetch_financial_ratios(company_symbol),
+            },
+            required={"income_statement", "cash_flow_statement", "financial_ratios"},
+        )
+        income_statement = statements.get("income_statement")
+        cash_flow_statement = statements.get("cash_flow_statement")
+        financial_ratios = statements.get("financial_ratios")
 
         cash_flow_statement_index = {
             (record["fiscal_year"], record["reporting_currency"]): record for record in cash_flow_statement
@@ -210,84 +209,147 @@ async def process_company_fundamentals(company_symbol: str) -> list[Dict[str, An
         raise RuntimeError(f"Error processing company fundamentals for {company_symbol}: {e}")
 
 
+fundamentals_freshness = FreshnessIndex(
+    max_age_days=settings.FUNDAMENTALS_MAX_AGE_DAYS,
+    max_entries=settings.FUNDAMENTALS_FRESHNESS_INDEX_MAX_ENTRIES,
+    ttl=settings.FUNDAMENTALS_FRESHNESS_INDEX_TTL_SECONDS,
+)
+
+
+def latest_fiscal_date(records: List[Dict[str, Any]]) -> Optional[date]:
+    return max((record["date"] for record in records if record.get("date")), default=None)
+
+
 async def is_data_fresh(company_symbol: str, db: AsyncSession) -> bool:
+    fresh = fundamentals_freshness.is_fresh(company_symbol)
+    if fresh is not None:
+        return fresh
     try:
         stmt = select(func.max(CompanyFundamentalsModel.date)).where(
             CompanyFundamentalsModel.company_symbol == company_symbol,
             CompanyFundamentalsModel.date.isnot(None)
         )
         result = await db.execute(stmt)
-        latest_date = result.scalar_one_or_none()
-        
-        if latest_date is None:
-            return False
-        
-        # Data is fresh if the latest record is less than 1 year old
-        one_year_ago = datetime.now().date() - timedelta(days=365)
-        return latest_date >= one_year_ago
+        fundamentals_freshness.record(company_symbol, result.scalar_one_or_none())
+        return bool(fundamentals_freshness.is_fresh(company_symbol))
     except Exception as e:
         raise RuntimeError(f"Error checking data freshness for {company_symbol}: {e}")
 
 
-async def upsert_company_fundamentals(
-    company_symbol: str, 
-    fundamentals_data: List[Dict[str, Any]], 
+FUNDAMENTALS_KEY_COLUMNS = ("company_symbol", "fiscal_year")
+
+
+def _fundamentals_row(record: Dict[str, Any], company_symbol: str) -> Dict[str, Any]:
+    return {
+        "company_symbol": record.get("symbol", company_symbol),
+        "fiscal_year": record.get("fiscal_year"),
+        "date": record.get("date"),
+        "revenue": record.get("revenue"),
+        "revenue_yoy_change": record.get("revenue_yoy_pct"),
+        "gross_profit": record.get("gross_profit"),
+        "gross_profit_yoy_change": record.get("gross_profit_yoy_pct"),
+        "net_income": record.get("net_income"),
+        "net_income_yoy_change": record.get("net_income_yoy_pct"),
+        "free_cash_flow": record.get("free_cash_flow"),
+        "free_cash_flow_yoy_change": record.get("free_cash_flow_yoy_pct"),
+        "eps": record.get("eps"),
+        "price_to_earings_ratio": record.get("price_to_earings_ratio"),
+        "price_to_book_ratio": record.get("price_to_book_ratio"),
+        "price_to_sales_ratio": record.get("price_to_sales_ratio"),
+        "reporting_currency": record.get("reporting_currency")
+    }
+
+
+async def upsert_many_company_fundamentals(
+    fundamentals_by_symbol: Dict[str, List[Dict[str, Any]]],
     db: AsyncSession
 ) -> Dict[str, Any]:
+    """
+    Insert new fiscal years and overwrite existing ones (restatements, updated ratios) for any
+    number of symbols in one set-based upsert and one commit, e.g. during backfills.
+    """
+    rows = []
+    for company_symbol, fundamentals_data in fundamentals_by_symbol.items():
+        for record in fundamentals_data or []:
+            row = _fundamentals_row(record, company_symbol)
+            if row["fiscal_year"] is None:
+                print(f"WARNING: Skipping {company_symbol} fundamentals without a fiscal year")
+                continue
+            rows.append(row)
+
     try:
-        if not fundamentals_data:
-            return {"inserted": 0}
-        
-        stmt = select(CompanyFundamentalsModel).where(
-            CompanyFundamentalsModel.company_symbol == company_symbol
-        )
-        result = await db.execute(stmt)
-        existing_records = result.scalars().all()
-        
-        existing_map = {record.fiscal_year: record for record in existing_records}
-        
-        records_to_insert = []
-        
-        for record in fundamentals_data:
-            fiscal_year = record.get("fiscal_year")
-            record_data = {
-                "company_symbol": record.get("symbol", company_symbol),
-                "fiscal_year": fiscal_year,
-                "date": record.get("date"),
-                "revenue": record.get("revenue"),
-                "revenue_yoy_change": record.get("revenue_yoy_pct"),
-                "gross_profit": record.get("gross_profit"),
-                "gross_profit_yoy_change": record.get("gross_profit_yoy_pct"),
-                "net_income": record.get("net_income"),
-                "net_income_yoy_change": record.get("net_income_yoy_pct"),
-                "free_cash_flow": record.get("free_cash_flow"),
-                "free_cash_flow_yoy_change": record.get("free_cash_flow_yoy_pct"),
-                "eps": record.get("eps"),
-                "price_to_earings_ratio": record.get("price_to_earings_ratio"),
-                "price_to_book_ratio": record.get("price_to_book_ratio"),
-                "price_to_sales_ratio": record.get("price_to_sales_ratio"),
-                "reporting_currency": record.get("reporting_currency")
-            }
-            
-            if fiscal_year in existing_map:
-                pass
-            else:
-                records_to_insert.append(record_data)
-        
-        
-        if records_to_insert:
-            db.add_all([CompanyFundamentalsModel(**data) for data in records_to_insert])
-        
+        upserted = await bulk_upsert(db, CompanyFundamentalsModel, rows, key_columns=FUNDAMENTALS_KEY_COLUMNS)
         await db.commit()
-        
-        return {
-            "company_symbol": company_symbol,
-            "inserted": len(records_to_insert),
-            "status": "success"
-        }
     except Exception as e:
         await db.rollback()
-        raise RuntimeError(f"Error upserting company fundamentals for {company_symbol}: {e}")
+        raise RuntimeError(f"Error upserting company fundamentals for {', '.join(fundamentals_by_symbol)}: {e}")
+
+    for company_symbol, fundamentals_data in fundamentals_by_symbol.items():
+        fundamentals_freshness.record(company_symbol, latest_fiscal_date(fundamentals_data or []))
+
+    return {
+        "company_symbols": list(fundamentals_by_symbol),
+        "upserted": upserted,
+        "status": "success"
+    }
+
+
+async def upsert_company_fundamentals(
+    company_symbol: str, 
+    fundamentals_data: List[Dict[str, Any]], 
+    db: AsyncSession
+) -> Dict[str, Any]:
+    if not fundamentals_data:
+        return {"upserted": 0}
+
+    result = await upsert_many_company_fundamentals({company_symbol: fundamentals_data}, db)
+    return {
+        "company_symbol": company_symbol,
+        "upserted": result["upserted"],
+        "status": result["status"]
+    }
+
+
+_fundamentals_read = None
+
+
+def _fundamentals_read_statement():
+    """
+    Output keys and the per-symbol SELECT of plain columns (no ORM entities), newest fiscal year
+    first. Built on first use, then reused so SQLAlchemy's compiled-statement cache always hits.
+    """
+    global _fundamentals_read
+    if _fundamentals_read is None:
+        model = CompanyFundamentalsModel
+        columns = {
+            "fiscal_year": model.fiscal_year,
+            "date": model.date,
+            "symbol": model.company_symbol,
+            "revenue": model.revenue,
+            "revenue_yoy_change": model.revenue_yoy_change,
+            "gross_profit": model.gross_profit,
+            "gross_profit_yoy_change": model.gross_profit_yoy_change,
+            "net_income": model.net_income,
+            "net_income_yoy_change": model.net_income_yoy_change,
+            "free_cash_flow": model.free_cash_flow,
+            "free_cash_flow_yoy_change": model.free_cash_flow_yoy_change,
+            "eps": model.eps,
+            "price_to_earings_ratio": model.price_to_earings_ratio,
+            "price_to_book_ratio": model.price_to_book_ratio,
+            "price_to_sales_ratio": model.price_to_sales_ratio,
+            "reporting_currency": model.reporting_currency,
+        }
+        stmt = select(*columns.values()).where(
+            model.company_symbol == bindparam("company_symbol")
+        ).order_by(model.fiscal_year.desc())
+        _fundamentals_read = (tuple(columns), stmt)
+    return _fundamentals_read
+
+
+async def read_company_fundamentals(company_symbol: str, db: AsyncSession) -> List[Dict[str, Any]]:
+    keys, stmt = _fundamentals_read_statement()
+    result = await db.execute(stmt, {"company_symbol": company_symbol})
+    return [dict(zip(keys, row)) for row in result.all()]
 
 
 async def get_or_fetch_company_fundamentals(
@@ -295,35 +357,12 @@ async def get_or_fetch_company_fundamentals(
     db: AsyncSession,
 ) -> List[Dict[str, Any]]:
     try:
-        if await is_data_fresh(company_symbol, db):
-            stmt = select(CompanyFundamentalsModel).where(
-                CompanyFundamentalsModel.company_symbol == company_symbol
-            ).order_by(CompanyFundamentalsModel.fiscal_year.desc())
-            
-            result = await db.execute(stmt)
-            records = result.scalars().all()
-            
-            return [
-                {
-                    "fiscal_year": record.fiscal_year,
-                    "date": record.date,
-                    "symbol": record.company_symbol,
-                    "revenue": record.revenue,
-                    "revenue_yoy_change": record.revenue_yoy_change,
-                    "gross_profit": record.gross_profit,
-                    "gross_profit_yoy_change": record.gross_profit_yoy_change,
-                    "net_income": record.net_income,
-                    "net_income_yoy_change": record.net_income_yoy_change,
-                    "free_cash_flow": record.free_cash_flow,
-                    "free_cash_flow_yoy_change": record.free_cash_flow_yoy_change,
-                    "eps": record.eps,
-                    "price_to_earings_ratio": record.price_to_earings_ratio,
-                    "price_to_book_ratio": record.price_to_book_ratio,
-                    "price_to_sales_ratio": record.price_to_sales_ratio,
-                    "reporting_currency": record.reporting_currency
-                }
-                for record in records
-            ]
+        # Symbols this worker already knows to be stale go straight to the upstream fetch
+        if fundamentals_freshness.is_fresh(company_symbol) is not False:
+            records = await read_company_fundamentals(company_symbol, db)
+            fundamentals_freshness.record(company_symbol, latest_fiscal_date(records))
+            if fundamentals_freshness.is_fresh(company_symbol):
+                return records
         
         fundamentals_data = await process_company_fundamentals(company_symbol)
         
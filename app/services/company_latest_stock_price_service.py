@@ -1,32 +1,88 @@
+import json
 import httpx
 from fastapi import HTTPException
-from app.core.config import settings
+from app.core.http_client import fmp_get
+from app.core.ttl_policy import quote_ttl
+from app.core.negative_cache import negative_cache
+from app.redis_connection import redis
 
 
 
 
 
 async def get_latest_company_stock_price_service(company_ticker: str):
-    url = f"https://financialmodelingprep.com/stable/quote"
-    params = {
-        "symbol": company_ticker,
-        "apikey": settings.FMP_API_KEY
-    }
+    """
+    Quote for one ticker, in the shape of FMP's single quote (a one-element list). It goes through
+    the batch lookup so single quotes and portfolio valuations share the `quote:{SYMBOL}` entries.
+    """
+    symbol = company_ticker.upper()
+    quotes = await get_latest_company_stock_prices_service([symbol])
+    if symbol not in quotes:
+        raise HTTPException(status_code=404, detail="Ticker not found")
+    return [quotes[symbol]]
 
-    async with httpx.AsyncClient() as client:
+
+def _quote_cache_key(company_ticker: str) -> str:
+    return f"quote:{company_ticker.upper()}"
+
+
+async def get_latest_company_stock_prices_service(company_tickers: list[str]) -> dict[str, dict]:
+    """
+    Resolve quotes for many tickers at once, keyed by upper-case symbol.
+    Cached quotes are read with a single MGET; only the misses go upstream, in one batch-quote call.
+    Symbols FMP does not know are simply absent from the result, and are negatively cached so they
+    are not requested again until the negative entry expires.
+    """
+    symbols = list(dict.fromkeys(ticker.upper() for ticker in company_tickers))
+    known_missing = {symbol for symbol in symbols if negative_cache.is_known_locally("quote", symbol)}
+    symbols = [symbol for symbol in symbols if symbol not in known_missing]
+    if not symbols:
+        return {}
+
+    quotes: dict[str, dict] = {}
+    try:
+        # Quote keys and negative-cache keys are read in the same round trip
+        cached_values = await redis.mget(
+            *[_quote_cache_key(symbol) for symbol in symbols],
+            *[negative_cache.key("quote", symbol) for symbol in symbols],
+        )
+        for symbol, cached_value, missing_marker in zip(symbols, cached_values, cached_values[len(symbols):]):
+            if cached_value:
+                quotes[symbol] = json.loads(cached_value)
+            elif missing_marker:
+                negative_cache.remember_locally("quote", symbol)
+                known_missing.add(symbol)
+    except Exception as e:
+        print(f"WARNING: Redis error reading cached quotes: {e}. Falling back to live data.")
+
+    misses = [symbol for symbol in symbols if symbol not in quotes and symbol not in known_missing]
+    if not misses:
+        return quotes
+
+    try:
+        response = await fmp_get("batch-quote", params={"symbols": ",".join(misses)})
+        response.raise_for_status()
+        data = response.json() or []
+    except httpx.HTTPStatusError as exc:
+        raise HTTPException(status_code=exc.response.status_code, detail=f"Error from data provider {exc}")
+    except httpx.RequestError as req_exc:
+        raise HTTPException(status_code=503, detail= f"Service unavailable {req_exc}")
+
+    fetched = {quote["symbol"].upper(): quote for quote in data if quote.get("symbol")}
+    quotes.update(fetched)
+    unknown = [symbol for symbol in misses if symbol not in fetched]
+    for symbol in unknown:
+        negative_cache.remember_locally("quote", symbol)
+
+    if fetched or unknown:
         try:
-            response = await client.get(url, params=params)
-            
-            response.raise_for_status() 
-            
-            data = response.json()
-            
-            if not data:
-                raise HTTPException(status_code=404, detail="Ticker not found")
-                
-            return data
-            
-        except httpx.HTTPStatusError as exc:
-            raise HTTPException(status_code=exc.response.status_code, detail=f"Error from data provider {exc}")
-        except httpx.RequestError as req_exc:
-            raise HTTPException(status_code=503, detail= f"Service unavailable {req_exc}")
\ No newline at end of file
+            pipeline = redis.pipeline()
+            for symbol, quote in fetched.items():
+                pipeline.set(_quote_cache_key(symbol), json.dumps(quote), ex=quote_ttl(symbol))
+            for symbol in unknown:
+                pipeline.set(negative_cache.key("quote", symbol), "1", ex=negative_cache.ttl)
+            await pipeline.exec()
+        except Exception as e:
+            print(f"WARNING: Redis error: {e}. Quotes are not stored in Redis.")
+
+    return quotes
@@ -1,56 +1,62 @@
-import httpx
 from fastapi import HTTPException
 from app.schemas.company_profile_schema import CompanyProfileSchema
-from app.core.config import settings
+from app.core.http_client import fmp_get
+from app.core.concurrency import gather_branches
 
 
 
-async def fetch_company_profile(symbol: str) -> CompanyProfileSchema:
-
-    company_profile_api_url = "https://financialmodelingprep.com/stable/profile"
+async def _fetch_profile_data(symbol: str) -> dict:
     company_profile_params = {
         "symbol": symbol,
-        "apikey": settings.FMP_API_KEY
     }
-    company_revenue_api_url = "https://financialmodelingprep.com/stable/revenue-geographic-segmentation"
+    profile_response = await fmp_get("profile", params=company_profile_params)
+    profile_response.raise_for_status()
+    profile_result = profile_response.json()
+    return profile_result[0]
+
+
+async def _fetch_revenue_by_regions(symbol: str) -> dict:
     company_revenue_params = {
         "symbol": symbol,
         "period": "annual",
         "structure": "flat",
-        "apikey": settings.FMP_API_KEY
     }
+    revenue_response = await fmp_get("revenue-geographic-segmentation", params=company_revenue_params)
+    revenue_response.raise_for_status()
+    revenue_result = revenue_response.json()
+    if not revenue_result:
+        return {}
+    return revenue_result[0].get("data", {})
+
+
+async def fetch_company_profile(symbol: str) -> CompanyProfileSchema:
 
     try:
-        async with httpx.AsyncClient() as client:
-            profile_response = await client.get(company_profile_api_url, params=company_profile_params)
-            profile_response.raise_for_status()
-            profile_result = profile_response.json()
-            profile_data = profile_result[0] 
-
-            revenue_response = await client.get(company_revenue_api_url, params=company_revenue_params)
-            revenue_response.raise_for_status()
-            revenue_result = revenue_response.json()
-            revenue_data = revenue_result[0]
-            return CompanyProfileSchema(
-                company_name=profile_data.get("companyName", ""),
-                website=profile_data.get("website", ""),
-                description=profile_data.get("description", ""),
-                industry=profile_data.get("industry", ""),
-                sector=profile_data.get("sector", ""),
-                country=profile_data.get("country", ""),
-                ceo=profile_data.get("ceo", ""),
-                exchange_full_name=profile_data.get("exchangeFullName", ""),
-                symbol=profile_data.get("symbol", ""),
-                market_cap=profile_data.get("marketCap", 0),
-                currency=profile_data.get("currency", ""),
-                cik=profile_data.get("cik", ""),
-                isin=profile_data.get("isin", ""),
-                ipo_date=profile_data.get("ipoDate", ""),
-                revenue_by_regions=revenue_data.get("data", {})
-            )
+        # Revenue segmentation is optional: not every company reports it
+        branches = await gather_branches(
+            {
+                "profile": _fetch_profile_data(symbol),
+                "revenue_by_regions": _fetch_revenue_by_regions(symbol),
+            },
+            required={"profile"},
+        )
+        profile_data = branches.get("profile")
+        return CompanyProfileSchema(
+            company_name=profile_data.get("companyName", ""),
+            website=profile_data.get("website", ""),
+            description=profile_data.get("description", ""),
+            industry=profile_data.get("industry", ""),
+            sector=profile_data.get("sector", ""),
+            country=profile_data.get("country", ""),
+            ceo=profile_data.get("ceo", ""),
+            exchange_full_name=profile_data.get("exchangeFullName", ""),
+            symbol=profile_data.get("symbol", ""),
+            market_cap=profile_data.get("marketCap", 0),
+            currency=profile_data.get("currency", ""),
+            cik=profile_data.get("cik", ""),
+            isin=profile_data.get("isin", ""),
+            ipo_date=profile_data.get("ipoDate", ""),
+            revenue_by_regions=branches.get("revenue_by_regions", {})
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching company profile: {str(e)}")
-
-    
-    
-    
\ No newline at end of file
@@ -4,7 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.portfolio_company_model import PortfolioCompanyModel
 from app.schemas.portfolio_company_schema import PortfolioCompanySchema
 from app.schemas.portfolio_schema import PorfolioCompanyWithSharePriceSchema
-from app.services.company_latest_stock_price_service import get_latest_company_stock_price_service
+from app.services.company_latest_stock_price_service import get_latest_company_stock_prices_service
 
 
 
@@ -65,9 +65,9 @@ async def get_portfolio_companies_with_share_price_service(username: str, db: As
             PortfolioCompanyModel.user_name == username
         ))
         companies = query.scalars().all()
+        quotes = await get_latest_company_stock_prices_service([company.symbol for company in companies])
         result = []
         for company in companies:
-            latest_price_data = await get_latest_company_stock_price_service(company.symbol)
             company_dict = {
                 'id': company.id,
                 'user_name': company.user_name,
@@ -82,7 +82,10 @@ async def get_portfolio_companies_with_share_price_service(username: str, db: As
                 'profit_loss_percentage': company.profit_loss_percentage,
                 'currency': company.currency
             }
-            company_dict['latest_share_price'] = latest_price_data[0]['price']
+            quote = quotes.get(company.symbol.upper())
+            if quote is None:
+                print(f"WARNING: No quote returned for {company.symbol}. Using stored current price.")
+            company_dict['latest_share_price'] = quote['price'] if quote else company.current_price
             result.append(PorfolioCompanyWithSharePriceSchema(**company_dict))
         return result
     except Exception as e:
@@ -1,24 +1,26 @@
-import httpx
 from fastapi import HTTPException
-from app.core.config import settings
+from app.core.http_client import fmp_get
+from app.core.negative_cache import negative_cache
 
 
 
 async def fetch_stock_target_price(ticker: str) -> dict[str, any]:
-    try:
-        url = "https://financialmodelingprep.com/stable/price-target-consensus"
+    if await negative_cache.is_known_missing("price-target", ticker):
+        raise HTTPException(status_code=404, detail="No target price data found for the given ticker.")
 
+    try:
         params = {
             "symbol": ticker,
-            "apikey": settings.FMP_API_KEY
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
+        response = await fmp_get("price-target-consensus", params=params)
         response.raise_for_status()
         data = response.json()
         if not data:
+            await negative_cache.record_missing("price-target", ticker)
             raise HTTPException(status_code=404, detail="No target price data found for the given ticker.")
         return data[0]
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching stock target price: {str(e)}")
\ No newline at end of file
@@ -1,5 +1,6 @@
 import base64
 import hashlib
+import importlib.util
 import json
 import os
 import sys
@@ -85,19 +86,51 @@ if "fastapi" not in sys.modules:
                 return func
             return decorator
 
+    class Request:
+        def __init__(self, client_host: str = "127.0.0.1", headers=None):
+            self.client = types.SimpleNamespace(host=client_host)
+            self.headers = headers or {}
+            self.scope = {"type": "http", "state": {}}
+
+    class Response:
+        def __init__(self, content=None, status_code: int = 200, headers=None, media_type=None):
+            self.body = content
+            self.status_code = status_code
+            self.headers = dict(headers or {})
+            self.media_type = media_type
+
+    class JSONResponse(Response):
+        def __init__(self, content=None, status_code: int = 200, headers=None, media_type="application/json"):
+            super().__init__(json.dumps(content).encode(), status_code, headers, media_type)
+
     class _Status:
         HTTP_200_OK = 200
         HTTP_201_CREATED = 201
         HTTP_401_UNAUTHORIZED = 401
         HTTP_403_FORBIDDEN = 403
+        HTTP_429_TOO_MANY_REQUESTS = 429
         HTTP_500_INTERNAL_SERVER_ERROR = 500
         HTTP_502_BAD_GATEWAY = 502
+        HTTP_503_SERVICE_UNAVAILABLE = 503
 
     fastapi_module.HTTPException = HTTPException
     fastapi_module.APIRouter = APIRouter
+    fastapi_module.Request = Request
+    fastapi_module.Depends = lambda dependency=None, **kwargs: types.SimpleNamespace(dependency=dependency)
+    fastapi_module.Response = Response
     fastapi_module.status = _Status()
     sys.modules["fastapi"] = fastapi_module
 
+    responses_module = types.ModuleType("fastapi.responses")
+    responses_module.Response = Response
+    responses_module.JSONResponse = JSONResponse
+    encoders_module = types.ModuleType("fastapi.encoders")
+    encoders_module.jsonable_encoder = lambda value: value
+    fastapi_module.responses = responses_module
+    fastapi_module.encoders = encoders_module
+    sys.modules["fastapi.responses"] = responses_module
+    sys.modules["fastapi.encoders"] = encoders_module
+
 
 if "passlib.context" not in sys.modules:
     passlib_module = types.ModuleType("passlib")
@@ -167,22 +200,59 @@ if "httpx" not in sys.modules:
         pass
 
     class AsyncClient:
+        def __init__(self, *args, **kwargs):
+            self.kwargs = kwargs
+            self.is_closed = False
+
         async def __aenter__(self):
             return self
 
         async def __aexit__(self, exc_type, exc, tb):
             return False
 
-        async def get(self, url, params=None):
+        async def get(self, url, params=None, **kwargs):
             raise NotImplementedError
 
+        async def aclose(self):
+            self.is_closed = True
+
+    class Response:
+        pass
+
+    class Limits:
+        def __init__(self, **kwargs):
+            self.__dict__.update(kwargs)
+
+    class Timeout:
+        def __init__(self, timeout=None, **kwargs):
+            self.read = timeout
+            self.__dict__.update(kwargs)
+
     module.AsyncClient = AsyncClient
+    module.Response = Response
+    module.Limits = Limits
+    module.Timeout = Timeout
     module.HTTPError = HTTPError
     module.HTTPStatusError = HTTPStatusError
     module.RequestError = RequestError
     sys.modules["httpx"] = module
 
 
+if "upstash_redis" not in sys.modules:
+    module = types.ModuleType("upstash_redis")
+    asyncio_module = types.ModuleType("upstash_redis.asyncio")
+
+    class Redis:
+        def __init__(self, *args, **kwargs):
+            pass
+
+    module.Redis = Redis
+    asyncio_module.Redis = Redis
+    module.asyncio = asyncio_module
+    sys.modules["upstash_redis"] = module
+    sys.modules["upstash_redis.asyncio"] = asyncio_module
+
+
 if "mailersend" not in sys.modules:
     module = types.ModuleType("mailersend")
 
@@ -203,7 +273,8 @@ if "mailersend" not in sys.modules:
     module.MailerSendClient = MailerSendClient
     sys.modules["mailersend"] = module
 
-if "sqlalchemy" not in sys.modules:
+# Stubbed only when SQLAlchemy is not installed, so the database tests can run where it is
+if "sqlalchemy" not in sys.modules and importlib.util.find_spec("sqlalchemy") is None:
     sqlalchemy_module = types.ModuleType("sqlalchemy")
 
     def select(*args, **kwargs):
@@ -218,6 +289,10 @@ if "sqlalchemy" not in sys.modules:
     sqlalchemy_module.select = select
     sqlalchemy_module.update = update
     sqlalchemy_module.and_ = and_
+    sqlalchemy_module.insert = lambda *args, **kwargs: None
+    sqlalchemy_module.text = lambda *args, **kwargs: None
+    sqlalchemy_module.bindparam = lambda *args, **kwargs: None
+    sqlalchemy_module.tuple_ = lambda *args, **kwargs: None
     sqlalchemy_module.func = types.SimpleNamespace(max=lambda *args, **kwargs: None)
 
     ext_module = types.ModuleType("sqlalchemy.ext")
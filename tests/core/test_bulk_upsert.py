@@ -0,0 +1,65 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.core import bulk_upsert as bulk
+
+
+def test_build_merge_statement_updates_matches_and_inserts_the_rest():
+    statement = bulk.build_merge_statement(
+        "company_fundamentals", "dbo",
+        columns=["company_symbol", "fiscal_year", "revenue"],
+        key_columns=["company_symbol", "fiscal_year"],
+        update_columns=["revenue"],
+        row_count=2,
+    )
+
+    assert statement.startswith("MERGE INTO [dbo].[company_fundamentals] WITH (HOLDLOCK) AS target")
+    assert "USING (VALUES (:p0_0, :p0_1, :p0_2), (:p1_0, :p1_1, :p1_2)) AS source ([company_symbol], [fiscal_year], [revenue])" in statement
+    assert "ON target.[company_symbol] = source.[company_symbol] AND target.[fiscal_year] = source.[fiscal_year]" in statement
+    assert "WHEN MATCHED THEN UPDATE SET target.[revenue] = source.[revenue]" in statement
+    assert statement.endswith("INSERT ([company_symbol], [fiscal_year], [revenue]) VALUES (source.[company_symbol], source.[fiscal_year], source.[revenue]);")
+
+
+def test_rows_per_chunk_stays_under_parameter_and_row_limits():
+    assert bulk.rows_per_chunk(16, bulk.MSSQL_MAX_PARAMETERS, bulk.MSSQL_MAX_VALUES_ROWS) * 16 < 2100
+    assert bulk.rows_per_chunk(1, bulk.MSSQL_MAX_PARAMETERS, bulk.MSSQL_MAX_VALUES_ROWS) == 1000
+    assert bulk.rows_per_chunk(5000, bulk.MSSQL_MAX_PARAMETERS, bulk.MSSQL_MAX_VALUES_ROWS) == 1
+
+
+class FakeSession:
+    def __init__(self, dialect):
+        self.dialect = dialect
+        self.executed = []
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=SimpleNamespace(name=self.dialect))
+
+    async def execute(self, statement, params=None):
+        self.executed.append(params)
+
+
+def test_bulk_upsert_merges_deduplicated_rows_in_chunks(monkeypatch):
+    monkeypatch.setattr(bulk, "MSSQL_MAX_PARAMETERS", 7)
+    model = SimpleNamespace(__table__=SimpleNamespace(name="company_fundamentals", schema="dbo"))
+    rows = [
+        {"company_symbol": "AAPL", "fiscal_year": "2023", "revenue": 1},
+        {"company_symbol": "AAPL", "fiscal_year": "2024", "revenue": 2},
+        {"company_symbol": "AAPL", "fiscal_year": "2023", "revenue": 3},
+        {"company_symbol": "MSFT", "fiscal_year": "2024", "revenue": 4},
+    ]
+    db = FakeSession("mssql")
+
+    written = asyncio.run(bulk.bulk_upsert(db, model, rows, key_columns=["company_symbol", "fiscal_year"]))
+
+    assert written == 3
+    # 3 columns under a 7-parameter limit: two rows per MERGE
+    assert [len(params) for params in db.executed] == [6, 3]
+    assert db.executed[0]["p0_2"] == 3
+    assert db.executed[1]["p0_0"] == "MSFT"
+
+
+def test_bulk_upsert_skips_empty_payloads():
+    db = FakeSession("mssql")
+
+    assert asyncio.run(bulk.bulk_upsert(db, SimpleNamespace(__table__=None), [], key_columns=["id"])) == 0
+    assert db.executed == []
@@ -0,0 +1,53 @@
+import json
+
+from app.core.cache_entry import GZIP, IDENTITY, CacheEntry, resolve_compression
+
+
+def _entry(body=b'{"price":190.1}', delta=0.2):
+    return CacheEntry.create(body, "application/json", soft_ttl=300, hard_ttl=600, delta=delta, now=1000.0)
+
+
+def test_cache_entry_round_trips_raw_bytes():
+    entry = _entry()
+
+    restored = CacheEntry.deserialize(entry.serialize(IDENTITY))
+
+    assert restored == entry
+    assert restored.soft_expires_at == 1300.0
+    assert restored.hard_expires_at == 1600.0
+
+
+def test_cache_entry_compresses_large_bodies_only():
+    large = _entry(body=json.dumps([{"close": 271.86}] * 500).encode())
+    small = _entry()
+
+    large_serialized = large.serialize(GZIP, min_size=1024)
+    small_serialized = small.serialize(GZIP, min_size=1024)
+
+    assert len(large_serialized) < len(large.body)
+    assert '"enc": "gzip"' in large_serialized
+    assert '"enc": "identity"' in small_serialized
+    assert CacheEntry.deserialize(large_serialized).body == large.body
+
+
+def test_cache_entry_ignores_values_written_in_older_formats():
+    assert CacheEntry.deserialize('[{"symbol": "AAPL"}]') is None
+
+
+def test_resolve_compression_accepts_none():
+    assert resolve_compression("none") == IDENTITY
+
+
+def test_stale_entry_always_refreshes():
+    entry = CacheEntry.create(b"{}", "application/json", soft_ttl=300, hard_ttl=600, delta=0.0, now=0.0)
+
+    assert entry.is_stale(now=299.0) is False
+    assert entry.should_refresh(beta=1.0, now=301.0) is True
+
+
+def test_xfetch_refreshes_early_only_close_to_soft_expiry():
+    entry = CacheEntry.create(b"{}", "application/json", soft_ttl=300, hard_ttl=600, delta=1.0, now=0.0)
+
+    # rand=0.5 -> -ln(0.5) * delta ~= 0.69s of head start
+    assert entry.should_refresh(beta=1.0, now=200.0, rand=0.5) is False
+    assert entry.should_refresh(beta=1.0, now=299.5, rand=0.5) is True
@@ -0,0 +1,46 @@
+from app.core.cache_keys import build_cache_key, cache_key_params
+from app.core.config import settings
+
+
+class FakeDepends:
+    def __init__(self, dependency):
+        self.dependency = dependency
+
+
+def get_db():
+    return None
+
+
+async def get_stock_chart(company_symbol: str, interval: str = "1d"):
+    return None
+
+
+async def analyze_company(company_symbol: str, db=FakeDepends(get_db)):
+    return None
+
+
+def test_cache_key_params_normalizes_symbols_and_applies_defaults():
+    params = cache_key_params(get_stock_chart, (), {"company_symbol": " aapl "})
+
+    assert params == {"company_symbol": "AAPL", "interval": "1d"}
+
+
+def test_cache_key_params_skips_injected_dependencies():
+    params = cache_key_params(analyze_company, (), {"company_symbol": "MSFT", "db": object()})
+
+    assert params == {"company_symbol": "MSFT"}
+
+
+def test_cache_key_params_binds_positional_and_keyword_calls_the_same_way():
+    assert cache_key_params(get_stock_chart, ("AAPL",), {}) == cache_key_params(get_stock_chart, (), {"company_symbol": "aapl"})
+
+
+def test_build_cache_key_separates_symbols_and_versions():
+    aapl = build_cache_key("get_stock_chart", {"company_symbol": "AAPL"})
+    msft = build_cache_key("get_stock_chart", {"company_symbol": "MSFT"})
+    aapl_v2 = build_cache_key("get_stock_chart", {"company_symbol": "AAPL"}, schema_version=2)
+
+    assert aapl != msft
+    assert aapl != aapl_v2
+    assert aapl.startswith(f"{settings.CACHE_KEY_PREFIX}:get_stock_chart:s1:g0:")
+    assert aapl_v2.startswith(f"{settings.CACHE_KEY_PREFIX}:get_stock_chart:s2:g0:")
@@ -0,0 +1,124 @@
+import asyncio
+import gc
+
+from app.core.concurrency import gather_branches
+
+
+def test_gather_branches_runs_branches_concurrently():
+    started = []
+
+    async def branch(name, other_started):
+        started.append(name)
+        # Only completes if the other branch was started before this one finished
+        await asyncio.wait_for(other_started.wait(), timeout=1)
+        return name
+
+    async def run():
+        a_started, b_started = asyncio.Event(), asyncio.Event()
+
+        async def a():
+            a_started.set()
+            return await branch("a", b_started)
+
+        async def b():
+            b_started.set()
+            return await branch("b", a_started)
+
+        return await gather_branches({"a": a(), "b": b()}, required={"a", "b"})
+
+    result = asyncio.run(run())
+
+    assert result.values == {"a": "a", "b": "b"}
+    assert result.complete is True
+
+
+def test_gather_branches_records_optional_failures():
+    async def ok():
+        return 1
+
+    async def boom():
+        raise ValueError("upstream down")
+
+    result = asyncio.run(gather_branches({"ok": ok(), "optional": boom()}, required={"ok"}))
+
+    assert result.get("ok") == 1
+    assert result.get("optional") is None
+    assert isinstance(result.errors["optional"], ValueError)
+    assert result.complete is False
+
+
+def test_gather_branches_raises_required_failure_and_cancels_others():
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def boom():
+        raise ValueError("required failed")
+
+    try:
+        asyncio.run(gather_branches({"slow": slow(), "required": boom()}, required={"required"}))
+    except ValueError as exc:
+        assert str(exc) == "required failed"
+    else:
+        assert False
+
+    assert cancelled == [True]
+
+
+def test_gather_branches_times_out_optional_branches():
+    async def fast():
+        return "fast"
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    result = asyncio.run(gather_branches({"fast": fast(), "slow": slow()}, required={"fast"}, timeout=0.05))
+
+    assert result.get("fast") == "fast"
+    assert isinstance(result.errors["slow"], asyncio.TimeoutError)
+
+
+def test_gather_branches_retrieves_every_failure_when_a_required_branch_fails():
+    unretrieved = []
+
+    async def boom():
+        raise ValueError("required failed")
+
+    async def also_boom():
+        raise RuntimeError("optional failed")
+
+    async def scenario():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: unretrieved.append(context))
+        try:
+            await gather_branches({"required": boom(), "optional": also_boom()}, required={"required"})
+        except ValueError as exc:
+            assert str(exc) == "required failed"
+        else:
+            assert False
+        await asyncio.sleep(0)
+        gc.collect()
+
+    asyncio.run(scenario())
+
+    assert unretrieved == []
+
+
+def test_gather_branches_records_an_optional_branch_cancelled_from_outside():
+    async def ok():
+        await asyncio.sleep(0.01)
+        return 1
+
+    async def scenario():
+        optional = asyncio.ensure_future(asyncio.sleep(10))
+        optional.cancel()
+        return await gather_branches({"ok": ok(), "optional": optional}, required={"ok"})
+
+    result = asyncio.run(scenario())
+
+    assert result.get("ok") == 1
+    assert isinstance(result.errors["optional"], asyncio.CancelledError)
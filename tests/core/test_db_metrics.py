@@ -0,0 +1,49 @@
+from app.core.db_metrics import PoolMetrics, SlowQueryLog
+
+
+class FakePool:
+    def size(self):
+        return 10
+
+    def checkedin(self):
+        return 7
+
+    def overflow(self):
+        return -7
+
+
+def test_pool_metrics_track_active_connections_and_checkout_wait():
+    metrics = PoolMetrics()
+
+    metrics.record_wait(0.002)
+    metrics.checked_out()
+    metrics.record_wait(0.010)
+    metrics.checked_out()
+    metrics.checked_in()
+    metrics.record_wait(0.030, timed_out=True)
+
+    snapshot = metrics.snapshot(FakePool())
+
+    assert snapshot["active_connections"] == 1
+    assert snapshot["peak_active_connections"] == 2
+    assert snapshot["checkout_wait_avg_ms"] == 14.0
+    assert snapshot["checkout_wait_max_ms"] == 30.0
+    assert snapshot["checkout_timeouts"] == 1
+    assert snapshot["pool_size"] == 10
+    assert snapshot["pool_checkedin"] == 7
+
+
+def test_slow_query_log_samples_slow_queries_but_always_logs_very_slow_ones(monkeypatch, capsys):
+    metrics = PoolMetrics()
+    log = SlowQueryLog(metrics, threshold_ms=100, sample_rate=0.1, always_log_ms=1000, sampler=lambda: 0.5)
+    clock = iter([0.0, 0.05, 0.0, 0.5, 0.0, 2.0])
+    monkeypatch.setattr("app.core.db_metrics.time.perf_counter", lambda: next(clock))
+
+    fast = log.finish(log.start(), "SELECT 1")
+    slow_unsampled = log.finish(log.start(), "SELECT 2")
+    very_slow = log.finish(log.start(), "SELECT\n    3")
+
+    assert (fast, slow_unsampled, very_slow) == (False, False, True)
+    assert metrics.queries == 3
+    assert metrics.slow_queries == 2
+    assert "Slow query (2000 ms): SELECT 3" in capsys.readouterr().out
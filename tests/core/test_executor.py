@@ -0,0 +1,59 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.executor import CpuExecutor
+from app.core.security import app_crypto_context, get_password_hash_async, verify_password_async
+
+
+def test_cpu_executor_runs_work_off_the_event_loop():
+    executor = CpuExecutor(kind="thread", max_workers=2, max_pending=4)
+
+    async def scenario():
+        loop_thread = threading.get_ident()
+        worker_thread = await executor.run(threading.get_ident)
+        return loop_thread, worker_thread
+
+    try:
+        loop_thread, worker_thread = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert loop_thread != worker_thread
+    assert executor.pending == 0
+
+
+def test_cpu_executor_sheds_load_beyond_its_queue_depth():
+    executor = CpuExecutor(kind="thread", max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as exc_info:
+            await executor.run(sum, [1, 2])
+        release.set()
+        await blocked
+        return exc_info.value
+
+    try:
+        error = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert error.status_code == 503
+    assert error.headers["Retry-After"] == "1"
+    assert executor.shed == 1
+
+
+def test_async_password_helpers_match_the_sync_context():
+    async def scenario():
+        hashed = await get_password_hash_async("Str0ngP@ssw0rd!")
+        return hashed, await verify_password_async("Str0ngP@ssw0rd!", hashed)
+
+    hashed, verified = asyncio.run(scenario())
+
+    assert verified is True
+    assert app_crypto_context.verify("Str0ngP@ssw0rd!", hashed)
@@ -0,0 +1,25 @@
+from datetime import date
+
+from app.core.freshness_index import FreshnessIndex
+
+
+def test_freshness_index_answers_known_symbols_and_returns_none_for_unknown():
+    index = FreshnessIndex(max_age_days=365, max_entries=10, ttl=60, today=lambda: date(2026, 6, 1))
+
+    index.record("AAPL", date(2025, 9, 27))
+    index.record("OLD", date(2024, 12, 31))
+    index.record("EMPTY", None)
+
+    assert index.is_fresh("AAPL") is True
+    assert index.is_fresh("OLD") is False
+    assert index.is_fresh("EMPTY") is False
+    assert index.is_fresh("MSFT") is None
+
+
+def test_freshness_index_forgets_symbols():
+    index = FreshnessIndex(max_age_days=365, max_entries=10, ttl=60, today=lambda: date(2026, 6, 1))
+    index.record("AAPL", date(2025, 9, 27))
+
+    index.forget("AAPL")
+
+    assert index.is_fresh("AAPL") is None
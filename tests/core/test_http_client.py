@@ -0,0 +1,42 @@
+import asyncio
+
+from app.core import http_client
+from app.core.config import settings
+
+
+class RecordingClient:
+    def __init__(self):
+        self.calls = []
+
+    async def get(self, url, params=None, timeout=None):
+        self.calls.append({"url": url, "params": params, "timeout": timeout})
+        return "response"
+
+
+def test_fmp_get_adds_api_key_and_endpoint_timeout(monkeypatch):
+    client = RecordingClient()
+    monkeypatch.setattr(http_client, "get_http_client", lambda: client)
+
+    result = asyncio.run(http_client.fmp_get("historical-price-eod/full", params={"symbol": "AAPL"}))
+
+    assert result == "response"
+    call = client.calls[0]
+    assert call["url"] == f"{settings.FMP_BASE_URL}/historical-price-eod/full"
+    assert call["params"] == {"symbol": "AAPL", "apikey": settings.FMP_API_KEY}
+    assert call["timeout"].read == settings.FMP_ENDPOINT_TIMEOUTS["historical-price-eod/full"]
+
+
+def test_get_endpoint_timeout_falls_back_to_default():
+    assert http_client.get_endpoint_timeout("unknown-endpoint") == settings.HTTP_DEFAULT_TIMEOUT_SECONDS
+
+
+def test_client_is_shared_until_closed(monkeypatch):
+    monkeypatch.setattr(http_client, "_client", None)
+
+    asyncio.run(http_client.start_http_client())
+    first = http_client.get_http_client()
+    assert http_client.get_http_client() is first
+
+    asyncio.run(http_client.close_http_client())
+    assert first.is_closed is True
+    assert http_client._client is None
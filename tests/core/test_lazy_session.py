@@ -0,0 +1,49 @@
+import asyncio
+
+from app.core.lazy_session import LazySession
+
+
+class FakeSession:
+    def __init__(self):
+        self.closed = False
+
+    async def execute(self, statement):
+        return f"ran {statement}"
+
+    async def close(self):
+        self.closed = True
+
+
+def test_lazy_session_is_not_created_until_first_use():
+    created = []
+
+    def factory():
+        created.append(FakeSession())
+        return created[-1]
+
+    db = LazySession(factory)
+    asyncio.run(db.release())
+
+    assert created == []
+    assert not db.opened
+    assert asyncio.run(db.execute("SELECT 1")) == "ran SELECT 1"
+    assert len(created) == 1
+
+
+def test_release_closes_the_session_and_reopens_on_next_use():
+    created = []
+
+    def factory():
+        created.append(FakeSession())
+        return created[-1]
+
+    db = LazySession(factory)
+    asyncio.run(db.execute("SELECT 1"))
+    asyncio.run(db.release())
+
+    assert created[0].closed
+    assert not db.opened
+
+    asyncio.run(db.execute("SELECT 2"))
+    assert len(created) == 2
+    assert not created[1].closed
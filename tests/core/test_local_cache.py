@@ -0,0 +1,86 @@
+import asyncio
+
+from app.core import local_cache as local_cache_module
+from app.core.local_cache import LocalCache, NamespaceVersions
+
+
+def test_local_cache_evicts_least_recently_used_entry():
+    cache = LocalCache(max_entries=2, max_bytes=1000)
+    cache.set("a", 1, ttl=60, size=1)
+    cache.set("b", 2, ttl=60, size=1)
+    cache.get("a")
+    cache.set("c", 3, ttl=60, size=1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_local_cache_respects_byte_budget():
+    cache = LocalCache(max_entries=10, max_bytes=100)
+    cache.set("a", "x", ttl=60, size=60)
+    cache.set("b", "y", ttl=60, size=60)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == "y"
+    assert cache.size_bytes == 60
+
+    cache.set("huge", "z", ttl=60, size=500)
+    assert cache.get("huge") is None
+    assert cache.get("b") == "y"
+
+
+def test_local_cache_without_byte_budget_is_bounded_by_entry_count_only():
+    cache = LocalCache(max_entries=2)
+    cache.set("a", "x" * 100_000, ttl=60)
+    cache.set("b", "y" * 100_000, ttl=60)
+    cache.set("c", "z", ttl=60)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == "y" * 100_000
+    assert cache.get("c") == "z"
+    assert cache.size_bytes == 0
+
+
+def test_local_cache_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(local_cache_module.time, "monotonic", lambda: now[0])
+    cache = LocalCache(max_entries=10, max_bytes=1000)
+    cache.set("quote", {"price": 1}, ttl=30, size=10)
+
+    now[0] += 29
+    assert cache.get("quote") == {"price": 1}
+    now[0] += 2
+    assert cache.get("quote") is None
+    assert len(cache) == 0
+
+
+class FakeVersionRedis:
+    def __init__(self):
+        self.store = {}
+
+    async def mget(self, *keys):
+        return [self.store.get(key) for key in keys]
+
+    async def incr(self, key):
+        self.store[key] = str(int(self.store.get(key, 0)) + 1)
+        return int(self.store[key])
+
+
+def test_namespace_versions_drop_local_entries_when_another_worker_bumps():
+    redis = FakeVersionRedis()
+    cache = LocalCache(max_entries=10, max_bytes=1000)
+    versions = NamespaceVersions(redis, cache, sync_interval=0)
+    other_worker = NamespaceVersions(redis, LocalCache(max_entries=10, max_bytes=1000), sync_interval=0)
+
+    async def run():
+        assert await versions.current("get_stock_chart") == 0
+        cache.set("get_stock_chart:v0:AAPL", {"symbol": "AAPL"}, ttl=60, size=10, namespace="get_stock_chart")
+
+        await other_worker.bump("get_stock_chart")
+        await versions.sync()
+        return await versions.current("get_stock_chart")
+
+    assert asyncio.run(run()) == 1
+    assert cache.get("get_stock_chart:v0:AAPL") is None
@@ -0,0 +1,49 @@
+import asyncio
+
+from app.core.negative_cache import NegativeCache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+        self.get_calls = 0
+
+    async def get(self, key):
+        self.get_calls += 1
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = value
+        return True
+
+
+def test_negative_cache_records_misses_in_redis_and_locally():
+    fake_redis = FakeRedis()
+    cache = NegativeCache(fake_redis, ttl=60, local_max_entries=10)
+
+    asyncio.run(cache.record_missing("quote", " zzzz "))
+
+    assert fake_redis.store == {"neg:quote:ZZZZ": "1"}
+    assert asyncio.run(cache.is_known_missing("quote", "ZZZZ")) is True
+    assert fake_redis.get_calls == 0
+
+
+def test_negative_cache_learns_misses_recorded_by_other_workers():
+    fake_redis = FakeRedis()
+    fake_redis.store["neg:search:NOPE"] = "1"
+    cache = NegativeCache(fake_redis, ttl=60, local_max_entries=10)
+
+    assert asyncio.run(cache.is_known_missing("search", "nope")) is True
+    assert asyncio.run(cache.is_known_missing("search", "nope")) is True
+    assert fake_redis.get_calls == 1
+    assert asyncio.run(cache.is_known_missing("search", "apple")) is False
+
+
+def test_negative_cache_treats_redis_errors_as_unknown():
+    class BrokenRedis:
+        async def get(self, key):
+            raise ConnectionError("down")
+
+    cache = NegativeCache(BrokenRedis(), ttl=60, local_max_entries=10)
+
+    assert asyncio.run(cache.is_known_missing("quote", "AAPL")) is False
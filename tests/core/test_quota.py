@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException, Request
+
+from app.core import quota as quota_module
+from app.core.quota import QuotaEngine, QuotaIdentity, resolve_identity
+from app.core.redis_backends import InMemoryBackend
+from app.core.security import create_access_token
+from app.dependencies import quota_dependency, redis_dependency
+
+
+TIERS = {"anonymous": {"budget": 10, "window": 60}, "user": {"budget": 100, "window": 60}}
+
+
+def test_resolve_identity_prefers_api_key_then_jwt_subject_then_ip():
+    token = create_access_token("ada@example.com")
+
+    by_key = resolve_identity(Request("1.1.1.1", {"X-API-Key": "k1", "Authorization": f"Bearer {token}"}), {"k1": "pro"})
+    by_user = resolve_identity(Request("1.1.1.1", {"Authorization": f"Bearer {token}"}), {})
+    by_ip = resolve_identity(Request("1.1.1.1", {"Authorization": "Bearer not-a-token"}), {})
+
+    assert by_key.tier == "pro" and by_key.key.startswith("key:") and "k1" not in by_key.key
+    assert by_user == QuotaIdentity("user:ada@example.com", "user")
+    assert by_ip == QuotaIdentity("ip:1.1.1.1", "anonymous")
+
+
+def test_quota_engine_charges_costs_against_the_tier_budget():
+    engine = QuotaEngine(InMemoryBackend(), TIERS)
+    identity = QuotaIdentity("ip:1.1.1.1", "anonymous")
+
+    async def scenario():
+        first = await engine.charge(identity, 8)
+        second = await engine.charge(identity, 5)
+        await engine.refund(identity, 6)
+        third = await engine.charge(identity, 5)
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+
+    assert first.allowed and first.remaining == 2
+    assert not second.allowed
+    assert third.allowed
+
+
+def _engine_with_balance(monkeypatch, key, remaining):
+    engine = QuotaEngine(InMemoryBackend(), TIERS)
+    monkeypatch.setattr(quota_dependency, "quota_engine", engine)
+    asyncio.run(engine.charge(QuotaIdentity(key, "anonymous"), TIERS["anonymous"]["budget"] - remaining))
+    return engine
+
+
+def _cached_endpoint(served):
+    @redis_dependency.redis_cache(expiry=60)
+    async def analyze(company_symbol: str):
+        served.append(company_symbol)
+        return {"symbol": company_symbol}
+    return analyze
+
+
+def _use_memory_cache(monkeypatch):
+    backend = InMemoryBackend()
+    monkeypatch.setattr(redis_dependency, "redis", backend)
+    monkeypatch.setattr(redis_dependency.cache_versions, "redis", backend)
+    monkeypatch.setattr(redis_dependency.settings, "CACHE_L1_ENABLED", False)
+
+
+def test_cached_call_only_needs_the_cached_cost(monkeypatch):
+    _use_memory_cache(monkeypatch)
+    _engine_with_balance(monkeypatch, "ip:2.2.2.2", remaining=10)
+    dependency = quota_dependency.quota(cost=9, cached_cost=1)
+    served = []
+    endpoint = _cached_endpoint(served)
+
+    async def call():
+        request = Request("2.2.2.2")
+        await dependency(request)
+        await endpoint("AAPL")
+        return request.scope["state"]["response_headers"]
+
+    async def scenario():
+        miss = await call()
+        hit = await call()
+        return miss, hit
+
+    miss, hit = asyncio.run(scenario())
+
+    assert served == ["AAPL"]
+    # 9 units for the computed response, then 1 for the cached one; headers report what is left
+    assert miss["X-Quota-Remaining"] == "1"
+    assert hit["X-Quota-Remaining"] == "0"
+
+
+def test_cache_miss_without_budget_for_the_full_cost_is_rejected_and_refunded(monkeypatch):
+    _use_memory_cache(monkeypatch)
+    engine = _engine_with_balance(monkeypatch, "ip:3.3.3.3", remaining=3)
+    dependency = quota_dependency.quota(cost=9, cached_cost=1)
+    served = []
+    endpoint = _cached_endpoint(served)
+
+    async def scenario():
+        await dependency(Request("3.3.3.3"))
+        with pytest.raises(HTTPException) as exc_info:
+            await endpoint("MSFT")
+        assert exc_info.value.status_code == 429
+        # The up-front unit came back: the full remaining balance is still spendable
+        return (await engine.charge(QuotaIdentity("ip:3.3.3.3", "anonymous"), 3)).allowed
+
+    assert asyncio.run(scenario()) is True
+    assert served == []
+    assert quota_module._current_charge.get() is None
@@ -0,0 +1,103 @@
+import asyncio
+
+from app.core.rate_limit import HybridRateLimiter, RateLimiter
+from app.core.redis_backends import InMemoryBackend
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_gcra_allows_a_burst_then_spaces_requests_out():
+    clock = FakeClock()
+    limiter = RateLimiter(InMemoryBackend(clock=clock), max_requests=3, window=3, prefix="rl")
+
+    async def hit():
+        return await limiter.hit("1.2.3.4", now=clock.now)
+
+    results = [asyncio.run(hit()) for _ in range(4)]
+
+    assert [result.allowed for result in results] == [True, True, True, False]
+    assert [result.remaining for result in results[:3]] == [2, 1, 0]
+    assert results[3].retry_after == 1.0
+    assert results[3].headers()["Retry-After"] == "1"
+
+    clock.now += 1
+    assert asyncio.run(hit()).allowed is True
+    assert asyncio.run(hit()).allowed is False
+
+
+def test_gcra_limits_each_identifier_separately():
+    limiter = RateLimiter(InMemoryBackend(), max_requests=1, window=60, prefix="rl")
+
+    assert asyncio.run(limiter.hit("a", now=10)).allowed is True
+    assert asyncio.run(limiter.hit("a", now=10)).allowed is False
+    assert asyncio.run(limiter.hit("b", now=10)).allowed is True
+
+
+def test_rate_limiter_fails_open_when_redis_is_down():
+    class BrokenRedis:
+        async def eval(self, *args, **kwargs):
+            raise ConnectionError("down")
+
+    result = asyncio.run(RateLimiter(BrokenRedis(), max_requests=5, window=60, prefix="rl").hit("a"))
+
+    assert result.allowed is True
+    assert result.headers()["RateLimit-Limit"] == "5"
+
+
+class CountingBackend(InMemoryBackend):
+    def __init__(self):
+        super().__init__()
+        self.evals = 0
+
+    async def eval(self, script, keys=None, args=None):
+        self.evals += 1
+        return await super().eval(script, keys=keys, args=args)
+
+
+def test_hybrid_limiter_decides_locally_far_from_the_limit():
+    backend = CountingBackend()
+    limiter = HybridRateLimiter(backend, max_requests=100, window=60, prefix="rl", sync_interval=60, error_bound=0.1)
+
+    async def scenario():
+        results = [await limiter.hit("a", now=30) for _ in range(10)]
+        assert backend.evals == 0
+        await limiter.sync(now=30)
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert all(result.allowed for result in results)
+    assert results[-1].remaining == 90
+    assert backend.evals == 1
+    assert backend.keys("rl:a:*") == ["rl:a:0"]
+    assert asyncio.run(backend.get("rl:a:0")) == "10"
+
+
+def test_hybrid_limiter_enforces_precisely_near_the_limit_across_workers():
+    backend = CountingBackend()
+    workers = [
+        HybridRateLimiter(backend, max_requests=10, window=60, prefix="rl", sync_interval=60, error_bound=0.2)
+        for _ in range(2)
+    ]
+
+    async def scenario():
+        allowed = 0
+        for _ in range(10):
+            for worker in workers:
+                allowed += (await worker.hit("a", now=30)).allowed
+        for worker in workers:
+            await worker.sync(now=30)
+        return allowed
+
+    allowed = asyncio.run(scenario())
+
+    # Each worker may overshoot by at most error_bound * max_requests
+    assert 10 <= allowed <= 10 + 2 * 2
+    assert all(not asyncio.run(worker.hit("a", now=30)).allowed for worker in workers)
+    assert asyncio.run(workers[0].hit("a", now=61)).allowed is True
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from app.core.redis_backends import InMemoryBackend, RedisBackend, RedisScript, create_backend
+from app.core.single_flight import distributed_single_flight
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_in_memory_backend_expires_keys_and_honours_nx():
+    clock = FakeClock()
+    backend = InMemoryBackend(clock=clock)
+
+    async def scenario():
+        assert await backend.set("lock", "a", nx=True, px=500) is True
+        assert await backend.set("lock", "b", nx=True, px=500) is False
+        await backend.set("quote:AAPL", "1", ex=60)
+        clock.now += 1
+        assert await backend.mget("lock", "quote:AAPL") == [None, "1"]
+        clock.now += 60
+        assert await backend.get("quote:AAPL") is None
+        assert await backend.incr("counter") == 1
+        assert await backend.incr("counter") == 2
+
+    asyncio.run(scenario())
+
+
+def test_in_memory_backend_batches_commands():
+    backend = InMemoryBackend()
+
+    async def scenario():
+        batch = backend.multi()
+        batch.set("a", "1").set("b", "2")
+        batch.delete("a")
+        results = await batch.exec()
+        return results, await backend.mget("a", "b")
+
+    results, values = asyncio.run(scenario())
+
+    assert results == [True, True, 1]
+    assert values == [None, "2"]
+
+
+def test_in_memory_backend_runs_script_fallbacks_only():
+    backend = InMemoryBackend()
+    script = RedisScript("return 1", fallback=lambda redis, keys, args: len(keys) + len(args))
+
+    assert asyncio.run(backend.eval(script, keys=["k"], args=[1, 2])) == 3
+    with pytest.raises(NotImplementedError):
+        asyncio.run(backend.eval("return 1"))
+
+
+def test_distributed_single_flight_releases_its_lock_on_in_memory_backend():
+    backend = InMemoryBackend()
+
+    async def compute():
+        return "value"
+
+    async def wait_for_result():
+        return None
+
+    result = asyncio.run(distributed_single_flight(backend, "lock:k", compute, wait_for_result))
+
+    assert result == "value"
+    assert backend.keys("lock:*") == []
+
+
+def test_create_backend_validates_configuration():
+    assert isinstance(create_backend("memory"), InMemoryBackend)
+    with pytest.raises(RuntimeError):
+        create_backend("upstash")
+    with pytest.raises(ValueError):
+        create_backend("memcached")
+
+
+def test_backend_missing_a_command_fails_at_construction():
+    class NoPipelineBackend(RedisBackend):
+        async def get(self, key):
+            return None
+
+        async def mget(self, *keys):
+            return [None] * len(keys)
+
+        async def set(self, key, value, ex=None, px=None, nx=False):
+            return True
+
+        async def delete(self, *keys):
+            return 0
+
+        async def incr(self, key):
+            return 1
+
+        async def eval(self, script, keys=None, args=None):
+            return None
+
+    with pytest.raises(TypeError, match="multi, pipeline"):
+        NoPipelineBackend()
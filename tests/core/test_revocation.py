@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+from app.core.redis_backends import InMemoryBackend
+from app.core.revocation import BloomFilter, RevocationStore
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"revoked-{i}")
+
+    assert all(f"revoked-{i}" in bloom for i in range(1000))
+    false_positives = sum(f"live-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_revocation_reaches_other_workers_through_the_filter_sync():
+    backend = InMemoryBackend()
+    worker_a = RevocationStore(backend, capacity=100, error_rate=0.01, sync_interval=60)
+    worker_b = RevocationStore(backend, capacity=100, error_rate=0.01, sync_interval=60)
+
+    async def scenario():
+        assert await worker_b.might_be_revoked("abc") is False
+
+        batch = backend.multi()
+        worker_a.revoke(batch, "abc", expires_at=time.time() + 600)
+        await batch.exec()
+        assert await worker_a.might_be_revoked("abc") is True
+
+        await worker_b.sync()
+        return await worker_b.might_be_revoked("abc"), await backend.get(worker_b.key("abc"))
+
+    revoked, stored = asyncio.run(scenario())
+
+    assert revoked is True
+    assert stored == "1"
+
+
+def test_expired_revocations_are_dropped_from_the_filter():
+    backend = InMemoryBackend()
+    store = RevocationStore(backend, capacity=100, error_rate=0.01, sync_interval=60)
+
+    async def scenario():
+        batch = backend.multi()
+        store.revoke(batch, "old", expires_at=time.time() - 1)
+        store.revoke(batch, "new", expires_at=time.time() + 600)
+        await batch.exec()
+
+        fresh = RevocationStore(backend, capacity=100, error_rate=0.01, sync_interval=60)
+        return await fresh.might_be_revoked("old"), await fresh.might_be_revoked("new")
+
+    assert asyncio.run(scenario()) == (False, True)
@@ -43,3 +43,46 @@ def test_refresh_token_round_trip_contains_subject_and_type():
 
     assert payload["sub"] == "7"
     assert payload["type"] == "refresh"
+
+
+def test_tokens_carry_a_unique_jti():
+    first = verify_access_token(create_access_token("user@example.com"))
+    second = verify_access_token(create_access_token("user@example.com"))
+
+    assert first["jti"] and second["jti"]
+    assert first["jti"] != second["jti"]
+
+
+def test_verified_payloads_are_memoized_until_expiry(monkeypatch):
+    from app.core import security
+
+    token = create_access_token("memo@example.com")
+    calls = []
+    real_decode = security.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args)
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(security.jwt, "decode", counting_decode)
+    hits_before = security.jwt_cache.hits
+
+    first = verify_access_token(token)
+    first["sub"] = "tampered"
+    second = verify_access_token(token)
+
+    assert len(calls) == 1
+    assert second["sub"] == "memo@example.com"
+    assert security.jwt_cache.hits == hits_before + 1
+
+
+def test_memoized_payloads_are_scoped_to_the_secret():
+    token = create_refresh_token("memo@example.com")
+    assert verify_refresh_token(token)["type"] == "refresh"
+
+    try:
+        verify_access_token(token)
+    except Exception as exc:
+        assert getattr(exc, "status_code", None) == 401
+    else:
+        assert False
@@ -0,0 +1,100 @@
+import asyncio
+
+from app.core.single_flight import SingleFlight, distributed_single_flight
+
+
+def test_single_flight_shares_one_execution_between_concurrent_callers():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"price": 190.1}
+
+    async def run():
+        flight = SingleFlight()
+        results = await asyncio.gather(*[flight.do(("quote", "AAPL"), fetch) for _ in range(5)])
+        return flight, results
+
+    flight, results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert all(result == {"price": 190.1} for result in results)
+    assert flight.in_flight(("quote", "AAPL")) is False
+
+
+def test_single_flight_propagates_errors_to_every_caller():
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    async def run():
+        flight = SingleFlight()
+        return await asyncio.gather(*[flight.do("key", fail) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_single_flight_survives_a_cancelled_caller():
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "value"
+
+    async def run():
+        flight = SingleFlight()
+        first = asyncio.ensure_future(flight.do("key", fetch))
+        second = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "value"
+
+
+class FakeLockRedis:
+    def __init__(self, locked=False):
+        self.locked = locked
+        self.released = False
+
+    async def set(self, key, value, nx=False, px=None):
+        if self.locked:
+            return None
+        self.locked = True
+        return True
+
+    async def eval(self, script, keys=None, args=None):
+        self.released = True
+        return 1
+
+
+def test_distributed_single_flight_runs_fn_when_lock_is_acquired():
+    redis = FakeLockRedis()
+
+    async def fetch():
+        return "computed"
+
+    async def never():
+        return None
+
+    result = asyncio.run(distributed_single_flight(redis, "lock:key", fetch, never))
+
+    assert result == "computed"
+    assert redis.released is True
+
+
+def test_distributed_single_flight_waits_for_the_lock_holder_result():
+    redis = FakeLockRedis(locked=True)
+    polls = []
+
+    async def fetch():
+        raise AssertionError("should not compute while another worker holds the lock")
+
+    async def cached():
+        polls.append(1)
+        return "from-cache" if len(polls) >= 2 else None
+
+    result = asyncio.run(distributed_single_flight(redis, "lock:key", fetch, cached, poll_interval=0.001))
+
+    assert result == "from-cache"
@@ -0,0 +1,45 @@
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.core.market_calendar import ASX, NASDAQ, exchange_for_symbol
+from app.core.ttl_policy import eod_ttl, quote_ttl
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_exchange_for_symbol_uses_asx_suffix():
+    assert exchange_for_symbol("bhp.ax") is ASX
+    assert exchange_for_symbol("AAPL") is NASDAQ
+
+
+def test_quote_ttl_is_short_while_trading():
+    # Wednesday 10:00 in New York
+    assert quote_ttl("AAPL", now=utc(2026, 10, 14, 14, 0)) == settings.MARKET_QUOTE_TTL_OPEN_SECONDS
+
+
+def test_quote_ttl_stays_short_while_closing_prices_settle():
+    # Wednesday 16:10 in New York
+    assert quote_ttl("AAPL", now=utc(2026, 10, 14, 20, 10)) == settings.MARKET_QUOTE_TTL_OPEN_SECONDS
+
+
+def test_quote_ttl_holds_until_next_open_over_the_weekend():
+    # Friday 18:00 in New York -> Monday 09:30
+    assert quote_ttl("AAPL", now=utc(2026, 10, 16, 22, 0)) == 63.5 * 3600
+
+
+def test_quote_ttl_skips_holidays():
+    # Day before Thanksgiving, 17:00 in New York -> Friday 09:30
+    assert quote_ttl("AAPL", now=utc(2026, 11, 25, 22, 0)) == 40.5 * 3600
+
+
+def test_quote_ttl_uses_the_asx_session_for_asx_symbols():
+    # Saturday 12:00 in Sydney -> Monday 10:00
+    assert quote_ttl("BHP.AX", now=utc(2026, 10, 17, 1, 0)) == 46 * 3600
+
+
+def test_eod_ttl_expires_when_the_next_eod_bar_is_published():
+    # Wednesday 10:00 in New York -> 16:00 close + publication delay
+    expected = 6 * 3600 + settings.MARKET_EOD_PUBLISH_DELAY_MINUTES * 60
+    assert eod_ttl("AAPL", now=utc(2026, 10, 14, 14, 0)) == expected
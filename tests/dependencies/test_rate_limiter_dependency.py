@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException, Request
+
+from app.core.rate_limit import RateLimiter
+from app.core.redis_backends import InMemoryBackend
+from app.dependencies import rate_limiter_dependency
+
+
+def test_rate_limit_dependency_sets_headers_and_rejects_with_retry_after(monkeypatch):
+    monkeypatch.setitem(
+        rate_limiter_dependency.rate_limiters,
+        "auth",
+        RateLimiter(InMemoryBackend(), max_requests=1, window=60, prefix="rl:auth"),
+    )
+    dependency = rate_limiter_dependency.get_rate_limiter("auth")
+
+    request = Request("10.0.0.1")
+    asyncio.run(dependency(request))
+    assert request.scope["state"]["response_headers"]["RateLimit-Limit"] == "1"
+    assert request.scope["state"]["response_headers"]["RateLimit-Remaining"] == "0"
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(dependency(Request("10.0.0.1")))
+
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers["Retry-After"] == "60"
+    assert "60 seconds" in exc_info.value.detail
@@ -0,0 +1,127 @@
+import asyncio
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("alembic")
+pytest.importorskip("aiosqlite")
+sqlalchemy = pytest.importorskip("sqlalchemy")
+if not hasattr(sqlalchemy, "create_engine"):
+    pytest.skip("SQLAlchemy is not installed", allow_module_level=True)
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+
+MIGRATION = Path(__file__).resolve().parents[2] / "app" / "migrations" / "versions" / "0001_access_path_indexes.py"
+
+# The tables as they existed before the migration; SQLite stands in for Azure SQL
+BASELINE = [
+    """CREATE TABLE dbo.portfolio_companies (
+        id INTEGER PRIMARY KEY, user_name VARCHAR NOT NULL, symbol VARCHAR NOT NULL,
+        company_name VARCHAR NOT NULL, shares_owned INTEGER, currency VARCHAR)""",
+    """CREATE TABLE dbo.company_fundamentals (
+        id INTEGER PRIMARY KEY, company_symbol VARCHAR(20) NOT NULL, fiscal_year VARCHAR(10),
+        date DATE, revenue FLOAT, eps FLOAT, reporting_currency VARCHAR,
+        CONSTRAINT uq_company_fiscal_year UNIQUE (company_symbol, fiscal_year))""",
+    "CREATE INDEX dbo.ix_dbo_company_fundamentals_company_symbol ON company_fundamentals (company_symbol)",
+    """CREATE TABLE dbo.company_profiles (
+        id INTEGER PRIMARY KEY, symbol VARCHAR NOT NULL, company_name VARCHAR NOT NULL)""",
+]
+
+QUERIES = {
+    "portfolio_by_user_and_symbol": "SELECT * FROM dbo.portfolio_companies WHERE user_name = 'alice' AND symbol = 'AAPL'",
+    "portfolio_by_user": "SELECT * FROM dbo.portfolio_companies WHERE user_name = 'alice'",
+    "fundamentals_by_symbol": "SELECT * FROM dbo.company_fundamentals WHERE company_symbol = 'AAPL' ORDER BY fiscal_year DESC",
+    "profile_by_symbol": "SELECT * FROM dbo.company_profiles WHERE symbol = 'AAPL'",
+}
+
+
+def _load_migration():
+    spec = importlib.util.spec_from_file_location("migration_0001", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _run(sync_connection, step):
+    with Operations.context(MigrationContext.configure(sync_connection)):
+        step()
+
+
+def _engine():
+    engine = create_async_engine("sqlite+aiosqlite://")
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def attach_dbo(dbapi_connection, connection_record):
+        # Lets the "dbo" schema the models and migration use resolve in SQLite
+        cursor = dbapi_connection.cursor()
+        cursor.execute("ATTACH DATABASE ':memory:' AS dbo")
+        cursor.close()
+
+    return engine
+
+
+async def _plans(upgrade: bool) -> dict[str, str]:
+    engine = _engine()
+    try:
+        async with engine.connect() as connection:
+            for statement in BASELINE:
+                await connection.execute(text(statement))
+            if upgrade:
+                await connection.run_sync(_run, _load_migration().upgrade)
+            indexes = (await connection.execute(text("SELECT name FROM dbo.sqlite_master WHERE type = 'index'"))).scalars().all()
+            plans = {"indexes": " | ".join(indexes)}
+            for name, query in QUERIES.items():
+                rows = (await connection.execute(text(f"EXPLAIN QUERY PLAN {query}"))).all()
+                plans[name] = " | ".join(row[-1] for row in rows)
+            return plans
+    finally:
+        await engine.dispose()
+
+
+def test_queries_scan_without_the_migration():
+    plans = asyncio.run(_plans(upgrade=False))
+
+    assert "INDEX" not in plans["portfolio_by_user"]
+    assert "INDEX" not in plans["profile_by_symbol"]
+    assert "ix_company_fundamentals_symbol_year" not in plans["fundamentals_by_symbol"]
+
+
+def test_migration_indexes_portfolio_fundamentals_and_profile_lookups():
+    plans = asyncio.run(_plans(upgrade=True))
+
+    assert "uq_portfolio_user_symbol" in plans["portfolio_by_user_and_symbol"]
+    assert "uq_portfolio_user_symbol" in plans["portfolio_by_user"]
+    assert "ix_company_fundamentals_symbol_year" in plans["fundamentals_by_symbol"]
+    assert "TEMP B-TREE" not in plans["fundamentals_by_symbol"]
+    assert "ix_company_profiles_symbol" in plans["profile_by_symbol"]
+
+
+def test_migration_drops_the_single_column_fundamentals_index():
+    before = asyncio.run(_plans(upgrade=False))
+    after = asyncio.run(_plans(upgrade=True))
+
+    assert "ix_dbo_company_fundamentals_company_symbol" in before["indexes"]
+    assert "ix_dbo_company_fundamentals_company_symbol" not in after["indexes"]
+
+
+def test_unique_index_rejects_duplicate_holdings():
+    async def insert_twice():
+        engine = _engine()
+        try:
+            async with engine.connect() as connection:
+                for statement in BASELINE:
+                    await connection.execute(text(statement))
+                await connection.run_sync(_run, _load_migration().upgrade)
+                insert = text("INSERT INTO dbo.portfolio_companies (user_name, symbol, company_name) VALUES ('alice', 'AAPL', 'Apple')")
+                await connection.execute(insert)
+                with pytest.raises(sqlalchemy.exc.IntegrityError):
+                    await connection.execute(insert)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(insert_twice())
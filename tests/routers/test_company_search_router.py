@@ -1,7 +1,12 @@
 import asyncio
 
-import httpx
+import pytest
+from fastapi import HTTPException
 
+from app.core import http_client
+from app.core.negative_cache import NegativeCache
+from app.core.redis_backends import InMemoryBackend
+from app.routers import company_search_router
 from app.routers.company_search_router import search_company_by_ticker
 
 
@@ -23,7 +28,7 @@ class DummyClient:
     async def __aexit__(self, exc_type, exc, tb):
         return False
 
-    async def get(self, url, params=None):
+    async def get(self, url, params=None, **kwargs):
         return DummyResponse(self.payload)
 
 
@@ -33,9 +38,19 @@ def test_search_company_by_ticker_filters_to_supported_exchanges(monkeypatch):
         {"symbol": "BHP", "exchange": "ASX"},
         {"symbol": "XYZ", "exchange": "NYSE"},
     ]
-    monkeypatch.setattr(httpx, "AsyncClient", lambda: DummyClient(payload))
+    monkeypatch.setattr(http_client, "get_http_client", lambda: DummyClient(payload))
 
     result = asyncio.run(search_company_by_ticker("apple"))
 
     symbols = {company["symbol"] for company in result}
     assert symbols == {"AAPL", "BHP"}
+
+
+def test_search_without_matches_is_404_on_first_and_repeat_lookups(monkeypatch):
+    monkeypatch.setattr(company_search_router, "negative_cache", NegativeCache(InMemoryBackend(), ttl=60, local_max_entries=10))
+    monkeypatch.setattr(http_client, "get_http_client", lambda: DummyClient([{"symbol": "XYZ", "exchange": "NYSE"}]))
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(search_company_by_ticker("xyz corp"))
+        assert exc_info.value.status_code == 404
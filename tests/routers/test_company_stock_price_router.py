@@ -0,0 +1,59 @@
+import asyncio
+
+from fastapi import Request
+
+from app.core.rate_limit import RateLimiter
+from app.core.redis_backends import InMemoryBackend
+from app.core.response_headers import ResponseHeadersMiddleware
+from app.core.quota import QuotaEngine
+from app.dependencies import quota_dependency, rate_limiter_dependency, redis_dependency
+from app.routers import company_stock_price_router as router_module
+
+
+def _serve(request, ticker):
+    """Run the route the way the app does: dependencies, endpoint, then the ASGI middleware stack."""
+    async def endpoint_app(scope, receive, send):
+        await rate_limiter_dependency.get_rate_limiter("market_data")(request)
+        await quota_dependency.quota(cost=1)(request)
+        response = await router_module.get_latest_stock_price(ticker)
+        raw_headers = [(name.lower().encode(), value.encode()) for name, value in response.headers.items()]
+        await send({"type": "http.response.start", "status": response.status_code, "headers": raw_headers})
+        await send({"type": "http.response.body", "body": response.body})
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(ResponseHeadersMiddleware(endpoint_app)(request.scope, None, send))
+    return {name.decode(): value.decode() for name, value in messages[0]["headers"]}
+
+
+def test_rate_limit_and_quota_headers_reach_cached_stock_price_responses(monkeypatch):
+    backend = InMemoryBackend()
+    monkeypatch.setattr(redis_dependency, "redis", backend)
+    monkeypatch.setattr(redis_dependency.cache_versions, "redis", backend)
+    monkeypatch.setattr(redis_dependency.settings, "CACHE_L1_ENABLED", False)
+    monkeypatch.setitem(
+        rate_limiter_dependency.rate_limiters,
+        "market_data",
+        RateLimiter(backend, max_requests=10, window=10, prefix="rl:market"),
+    )
+    monkeypatch.setattr(quota_dependency, "quota_engine", QuotaEngine(backend, {"anonymous": {"budget": 50, "window": 60}}))
+    calls = []
+
+    async def fake_quote(ticker):
+        calls.append(ticker)
+        return {"symbol": ticker, "price": 187.5}
+
+    monkeypatch.setattr(router_module, "get_latest_company_stock_price_service", fake_quote)
+
+    miss = _serve(Request("10.0.0.9"), "AAPL")
+    hit = _serve(Request("10.0.0.9"), "AAPL")
+
+    assert calls == ["AAPL"]
+    assert miss["ratelimit-remaining"] == "9"
+    assert hit["ratelimit-remaining"] == "8"
+    assert hit["ratelimit-limit"] == "10"
+    assert miss["x-quota-remaining"] == "49"
+    assert hit["x-quota-remaining"] == "48"
@@ -0,0 +1,154 @@
+import asyncio
+import sys
+import types
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+fake_user_module = types.ModuleType("app.models.user")
+fake_user_module.User = type("User", (), {})
+sys.modules.setdefault("app.models.user", fake_user_module)
+
+from app.core.principal import Principal, PrincipalCache
+from app.core.redis_backends import InMemoryBackend
+from app.core.security import create_refresh_token
+from app.services import auth_service
+
+
+EMAIL = "ada@example.com"
+
+
+class CountingBackend(InMemoryBackend):
+    """In-memory Redis that counts round trips: every direct command and every batch exec."""
+
+    def __init__(self):
+        super().__init__()
+        self.round_trips = []
+
+    async def get(self, key):
+        self.round_trips.append("get")
+        return await super().get(key)
+
+    async def mget(self, *keys):
+        self.round_trips.append("mget")
+        return await super().mget(*keys)
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        self.round_trips.append("set")
+        return await super().set(key, value, ex=ex, px=px, nx=nx)
+
+    async def eval(self, script, keys=None, args=None):
+        self.round_trips.append("eval")
+        return await super().eval(script, keys=keys, args=args)
+
+    def _counted(self, batch):
+        exec_batch = batch.exec
+
+        async def exec():
+            self.round_trips.append("batch")
+            return await exec_batch()
+        batch.exec = exec
+        return batch
+
+    def pipeline(self):
+        return self._counted(super().pipeline())
+
+    def multi(self):
+        return self._counted(super().multi())
+
+
+class NoDatabase:
+    async def execute(self, *args, **kwargs):
+        raise AssertionError("the database must not be queried")
+
+
+def _principal(is_active=True, email=EMAIL):
+    return Principal(
+        id=7,
+        email=email,
+        full_name="Ada",
+        is_active=is_active,
+        is_superuser=False,
+        created_at=datetime(2025, 1, 2, tzinfo=timezone.utc),
+    )
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = CountingBackend()
+    monkeypatch.setattr(auth_service, "redis", backend)
+    monkeypatch.setattr(auth_service, "redis_batch", lambda transaction=False: backend.multi() if transaction else backend.pipeline())
+    return backend
+
+
+def test_refresh_is_served_from_the_version_stamped_snapshot_without_a_db_query(backend):
+    refresh_token = create_refresh_token(EMAIL)
+    backend._set(f"refresh_token_user:{refresh_token}", EMAIL)
+    backend._set(f"user:{EMAIL}", _principal().to_json("3"))
+    backend._set(f"user_version:{EMAIL}", "3")
+
+    token = asyncio.run(auth_service.refresh_access_token(refresh_token, NoDatabase()))
+
+    assert token.access_token and token.refresh_token
+    # One MGET to validate and load the user, one batch to store the new tokens
+    assert backend.round_trips == ["mget", "batch"]
+    assert backend._get(f"refresh_token_user:{token.refresh_token}") == EMAIL
+
+
+def test_refresh_reloads_the_user_when_the_snapshot_version_is_stale(backend, monkeypatch):
+    refresh_token = create_refresh_token(EMAIL)
+    backend._set(f"refresh_token_user:{refresh_token}", EMAIL)
+    # Written before a password change bumped the version to 4
+    backend._set(f"user:{EMAIL}", _principal().to_json("3"))
+    backend._set(f"user_version:{EMAIL}", "4")
+    loaded = []
+
+    async def fake_get_user_by_email(db, email):
+        loaded.append(email)
+        return _principal(is_active=False)
+
+    monkeypatch.setattr(auth_service, "get_user_by_email", fake_get_user_by_email)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(auth_service.refresh_access_token(refresh_token, NoDatabase()))
+
+    assert exc_info.value.status_code == 401
+    assert loaded == [EMAIL]
+    assert Principal.from_json(backend._get(f"user:{EMAIL}"), "4").is_active is False
+
+
+def test_login_stores_both_tokens_in_one_round_trip(backend):
+    token = asyncio.run(auth_service.create_access_and_refresh_token(EMAIL, 7))
+
+    assert backend.round_trips == ["batch"]
+    assert backend._get("access_token:7") == token.access_token
+    assert backend._get("refresh_token:7") == token.refresh_token
+    assert backend._get(f"refresh_token_user:{token.refresh_token}") == EMAIL
+
+
+def test_logout_revokes_and_clears_tokens_in_one_round_trip(backend):
+    token = asyncio.run(auth_service.create_access_and_refresh_token(EMAIL, 7))
+    backend._set(f"user:{EMAIL}", _principal().to_json())
+    backend.round_trips.clear()
+
+    asyncio.run(auth_service.blacklist_tokens(7, EMAIL, token.access_token))
+
+    assert backend.round_trips == ["batch"]
+    jti = auth_service.verify_access_token(token.access_token)["jti"]
+    assert backend._get(auth_service.revocation_store.key(jti)) == "1"
+    assert backend._mget("access_token:7", "refresh_token:7", f"user:{EMAIL}") == [None, None, None]
+    assert backend._get(f"user_version:{EMAIL}") == "1"
+
+
+def test_logout_keeps_other_users_cached_principals(backend, monkeypatch):
+    cache = PrincipalCache(backend, max_entries=10, max_ttl=60, sync_interval=60)
+    monkeypatch.setattr(auth_service, "principal_cache", cache)
+    token = asyncio.run(auth_service.create_access_and_refresh_token(EMAIL, 7))
+    cache.set(token.access_token, _principal(), expires_at=None, version="0")
+    cache.set("bob-token", _principal(email="bob@example.com"), expires_at=None, version="0")
+
+    asyncio.run(auth_service.blacklist_tokens(7, EMAIL, token.access_token))
+
+    assert asyncio.run(cache.get(token.access_token)) is None
+    assert asyncio.run(cache.get("bob-token")) == _principal(email="bob@example.com")
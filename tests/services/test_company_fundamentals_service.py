@@ -1,6 +1,7 @@
 import asyncio
 import sys
 import types
+from datetime import date
 
 fake_model_module = types.ModuleType("app.models.company_fundamentals_model")
 fake_model_module.CompanyFundamentalsModel = type("CompanyFundamentalsModel", (), {})
@@ -41,3 +42,159 @@ def test_process_company_fundamentals_merges_statement_sources(monkeypatch):
     assert result[0]["symbol"] == "AAPL"
     assert result[0]["free_cash_flow"] == 20
     assert result[0]["price_to_earings_ratio"] == 25
+
+
+class FakeSession:
+    def __init__(self):
+        self.committed = False
+        self.rolled_back = False
+
+    async def commit(self):
+        self.committed = True
+
+    async def rollback(self):
+        self.rolled_back = True
+
+
+def test_upsert_many_company_fundamentals_upserts_all_symbols_in_one_commit(monkeypatch):
+    calls = []
+
+    async def fake_bulk_upsert(db, model, rows, key_columns):
+        calls.append((rows, key_columns))
+        return len(rows)
+
+    monkeypatch.setattr(svc, "bulk_upsert", fake_bulk_upsert)
+    db = FakeSession()
+
+    result = asyncio.run(svc.upsert_many_company_fundamentals({
+        "AAPL": [{"symbol": "AAPL", "fiscal_year": "2024", "revenue": 110, "revenue_yoy_pct": 10.0}],
+        "MSFT": [{"symbol": "MSFT", "fiscal_year": "2024"}, {"symbol": "MSFT", "fiscal_year": None}],
+    }, db))
+
+    rows, key_columns = calls[0]
+    assert len(calls) == 1
+    assert key_columns == ("company_symbol", "fiscal_year")
+    assert [(row["company_symbol"], row["fiscal_year"]) for row in rows] == [("AAPL", "2024"), ("MSFT", "2024")]
+    assert rows[0]["revenue_yoy_change"] == 10.0
+    assert result["upserted"] == 2
+    assert db.committed
+
+
+def test_upsert_company_fundamentals_rolls_back_on_failure(monkeypatch):
+    async def failing_bulk_upsert(db, model, rows, key_columns):
+        raise ValueError("deadlock")
+
+    monkeypatch.setattr(svc, "bulk_upsert", failing_bulk_upsert)
+    db = FakeSession()
+
+    try:
+        asyncio.run(svc.upsert_company_fundamentals("AAPL", [{"symbol": "AAPL", "fiscal_year": "2024"}], db))
+        assert False, "expected RuntimeError"
+    except RuntimeError as e:
+        assert "AAPL" in str(e)
+
+    assert db.rolled_back
+    assert not db.committed
+
+
+class FakeColumn:
+    def __init__(self, name):
+        self.name = name
+
+    def __eq__(self, other):
+        return (self.name, other)
+
+    def desc(self):
+        return (self.name, "desc")
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class FakeReadSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+
+    async def execute(self, statement, params=None):
+        self.executed.append(params)
+        return FakeResult(self.rows)
+
+
+def _use_fake_read_path(monkeypatch, today):
+    class FakeStatement:
+        def __init__(self, *columns):
+            self.columns = columns
+
+        def where(self, *clauses):
+            return self
+
+        def order_by(self, *clauses):
+            return self
+
+    fake_model = type("FakeFundamentalsModel", (), {
+        name: FakeColumn(name) for name in (
+            "company_symbol", "fiscal_year", "date", "revenue", "revenue_yoy_change", "gross_profit",
+            "gross_profit_yoy_change", "net_income", "net_income_yoy_change", "free_cash_flow",
+            "free_cash_flow_yoy_change", "eps", "price_to_earings_ratio", "price_to_book_ratio",
+            "price_to_sales_ratio", "reporting_currency",
+        )
+    })
+    monkeypatch.setattr(svc, "CompanyFundamentalsModel", fake_model)
+    monkeypatch.setattr(svc, "select", FakeStatement)
+    monkeypatch.setattr(svc, "bindparam", lambda name: name)
+    monkeypatch.setattr(svc, "_fundamentals_read", None)
+    monkeypatch.setattr(svc, "fundamentals_freshness", svc.FreshnessIndex(max_age_days=365, max_entries=10, ttl=60, today=lambda: today))
+
+
+def _stored_row(symbol, fiscal_year, fiscal_date):
+    return (fiscal_year, fiscal_date, symbol, 100.0, 5.0, 50.0, 4.0, 20.0, 3.0, 10.0, 2.0, 6.1, 30.0, 40.0, 8.0, "USD")
+
+
+def test_get_or_fetch_reads_fresh_fundamentals_in_one_query(monkeypatch):
+    _use_fake_read_path(monkeypatch, today=date(2026, 6, 1))
+
+    async def unexpected_fetch(symbol):
+        raise AssertionError("fresh data must not be refetched")
+
+    monkeypatch.setattr(svc, "process_company_fundamentals", unexpected_fetch)
+    db = FakeReadSession([_stored_row("AAPL", "2025", date(2025, 9, 27)), _stored_row("AAPL", "2024", date(2024, 9, 28))])
+
+    result = asyncio.run(svc.get_or_fetch_company_fundamentals("AAPL", db))
+
+    assert db.executed == [{"company_symbol": "AAPL"}]
+    assert result[0]["fiscal_year"] == "2025"
+    assert result[0]["symbol"] == "AAPL"
+    assert result[0]["reporting_currency"] == "USD"
+    assert asyncio.run(svc.is_data_fresh("AAPL", db)) is True
+    assert len(db.executed) == 1
+
+
+def test_get_or_fetch_skips_the_read_for_symbols_known_to_be_stale(monkeypatch):
+    _use_fake_read_path(monkeypatch, today=date(2026, 6, 1))
+    svc.fundamentals_freshness.record("AAPL", date(2024, 9, 28))
+    fetched = [{"symbol": "AAPL", "fiscal_year": "2025", "date": date(2025, 9, 27)}]
+    upserts = []
+
+    async def fake_fetch(symbol):
+        return fetched
+
+    async def fake_upsert(symbol, data, db):
+        upserts.append(symbol)
+        svc.fundamentals_freshness.record(symbol, svc.latest_fiscal_date(data))
+
+    monkeypatch.setattr(svc, "process_company_fundamentals", fake_fetch)
+    monkeypatch.setattr(svc, "upsert_company_fundamentals", fake_upsert)
+    db = FakeReadSession([])
+
+    result = asyncio.run(svc.get_or_fetch_company_fundamentals("AAPL", db))
+
+    assert result == fetched
+    assert db.executed == []
+    assert upserts == ["AAPL"]
+    assert svc.fundamentals_freshness.is_fresh("AAPL") is True
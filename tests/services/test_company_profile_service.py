@@ -0,0 +1,82 @@
+import asyncio
+
+import httpx
+
+from app.core import http_client
+from app.services.company_profile_service import fetch_company_profile
+
+
+PROFILE = {
+    "companyName": "Apple Inc.",
+    "website": "https://www.apple.com",
+    "description": "Consumer electronics",
+    "industry": "Consumer Electronics",
+    "sector": "Technology",
+    "country": "US",
+    "ceo": "Tim Cook",
+    "exchangeFullName": "NASDAQ Global Select",
+    "symbol": "AAPL",
+    "marketCap": 3_000_000_000_000,
+    "currency": "USD",
+    "cik": "0000320193",
+    "isin": "US0378331005",
+    "ipoDate": "1980-12-12",
+}
+
+
+class DummyResponse:
+    def __init__(self, payload, status_code=200):
+        self._payload = payload
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise httpx.HTTPStatusError(self)
+
+    def json(self):
+        return self._payload
+
+
+class EndpointClient:
+    """Answers each FMP endpoint with its own canned response."""
+
+    def __init__(self, responses):
+        self.responses = responses
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    async def get(self, url, params=None, **kwargs):
+        return self.responses[url.rstrip("/").rsplit("/", 1)[-1]]
+
+
+def _fetch(monkeypatch, revenue_response):
+    client = EndpointClient({
+        "profile": DummyResponse([PROFILE]),
+        "revenue-geographic-segmentation": revenue_response,
+    })
+    monkeypatch.setattr(http_client, "get_http_client", lambda: client)
+    return asyncio.run(fetch_company_profile("AAPL"))
+
+
+def test_profile_is_returned_when_the_revenue_branch_fails(monkeypatch):
+    profile = _fetch(monkeypatch, DummyResponse({}, status_code=502))
+
+    assert profile.company_name == "Apple Inc."
+    assert profile.revenue_by_regions == {}
+
+
+def test_profile_without_segmentation_data_has_empty_revenue_by_regions(monkeypatch):
+    profile = _fetch(monkeypatch, DummyResponse([]))
+
+    assert profile.symbol == "AAPL"
+    assert profile.revenue_by_regions == {}
+
+
+def test_profile_includes_revenue_by_regions_when_available(monkeypatch):
+    profile = _fetch(monkeypatch, DummyResponse([{"data": {"Americas": 100.0}}]))
+
+    assert profile.revenue_by_regions == {"Americas": 100.0}
@@ -1,8 +1,14 @@
 import asyncio
+import json
 
 import httpx
 
-from app.services.company_latest_stock_price_service import get_latest_company_stock_price_service
+from app.core import http_client
+from app.services import company_latest_stock_price_service
+from app.services.company_latest_stock_price_service import (
+    get_latest_company_stock_price_service,
+    get_latest_company_stock_prices_service,
+)
 from app.services.stock_target_price_service import fetch_stock_target_price
 
 
@@ -31,21 +37,150 @@ class DummyClient:
     async def __aexit__(self, exc_type, exc, tb):
         return False
 
-    async def get(self, url, params=None):
+    async def get(self, url, params=None, **kwargs):
         return DummyResponse(self.payload, should_raise=self.should_raise)
 
 
-def test_get_latest_company_stock_price_service_returns_payload(monkeypatch):
-    monkeypatch.setattr(httpx, "AsyncClient", lambda: DummyClient([{"symbol": "AAPL", "price": 190.1}]))
+def test_fetch_stock_target_price_returns_first_record(monkeypatch):
+    monkeypatch.setattr(http_client, "get_http_client", lambda: DummyClient([{"targetHigh": 250, "targetLow": 180}]))
 
-    result = asyncio.run(get_latest_company_stock_price_service("AAPL"))
+    result = asyncio.run(fetch_stock_target_price("AAPL"))
 
-    assert result[0]["symbol"] == "AAPL"
+    assert result["targetHigh"] == 250
 
 
-def test_fetch_stock_target_price_returns_first_record(monkeypatch):
-    monkeypatch.setattr(httpx, "AsyncClient", lambda: DummyClient([{"targetHigh": 250, "targetLow": 180}]))
+def test_fetch_stock_target_price_unknown_ticker_is_404_on_first_and_repeat_lookups(monkeypatch):
+    import pytest
+    from fastapi import HTTPException
+    from app.core.negative_cache import NegativeCache
+    from app.core.redis_backends import InMemoryBackend
+    from app.services import stock_target_price_service
 
-    result = asyncio.run(fetch_stock_target_price("AAPL"))
+    monkeypatch.setattr(stock_target_price_service, "negative_cache", NegativeCache(InMemoryBackend(), ttl=60, local_max_entries=10))
+    monkeypatch.setattr(http_client, "get_http_client", lambda: DummyClient([]))
 
-    assert result["targetHigh"] == 250
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(fetch_stock_target_price("ZZZZ"))
+        assert exc_info.value.status_code == 404
+
+
+class FakePipeline:
+    def __init__(self, store):
+        self.store = store
+        self.commands = []
+
+    def set(self, key, value, ex=None):
+        self.commands.append((key, value))
+        return self
+
+    async def exec(self):
+        for key, value in self.commands:
+            self.store[key] = value
+        return [True] * len(self.commands)
+
+
+class FakeRedis:
+    def __init__(self, store):
+        self.store = store
+        self.mget_calls = 0
+
+    async def mget(self, *keys):
+        self.mget_calls += 1
+        return [self.store.get(key) for key in keys]
+
+    def pipeline(self):
+        return FakePipeline(self.store)
+
+
+class RecordingClient(DummyClient):
+    def __init__(self, payload):
+        super().__init__(payload)
+        self.calls = []
+
+    async def get(self, url, params=None, **kwargs):
+        self.calls.append(params)
+        return await super().get(url, params=params)
+
+
+def test_get_latest_company_stock_prices_service_only_fetches_cache_misses(monkeypatch):
+    store = {"quote:AAPL": json.dumps({"symbol": "AAPL", "price": 190.1})}
+    fake_redis = FakeRedis(store)
+    client = RecordingClient([{"symbol": "MSFT", "price": 410.5}, {"symbol": "BHP.AX", "price": 45.2}])
+    monkeypatch.setattr(company_latest_stock_price_service, "redis", fake_redis)
+    monkeypatch.setattr(http_client, "get_http_client", lambda: client)
+
+    result = asyncio.run(get_latest_company_stock_prices_service(["aapl", "MSFT", "BHP.AX", "MSFT"]))
+
+    assert {symbol: quote["price"] for symbol, quote in result.items()} == {
+        "AAPL": 190.1,
+        "MSFT": 410.5,
+        "BHP.AX": 45.2,
+    }
+    assert fake_redis.mget_calls == 1
+    assert len(client.calls) == 1
+    assert client.calls[0]["symbols"] == "MSFT,BHP.AX"
+    assert "quote:MSFT" in store and "quote:BHP.AX" in store
+
+
+def test_get_latest_company_stock_prices_service_negatively_caches_unknown_symbols(monkeypatch):
+    from app.core.negative_cache import NegativeCache
+
+    store = {}
+    fake_redis = FakeRedis(store)
+    client = RecordingClient([{"symbol": "MSFT", "price": 410.5}])
+    monkeypatch.setattr(company_latest_stock_price_service, "redis", fake_redis)
+    monkeypatch.setattr(
+        company_latest_stock_price_service,
+        "negative_cache",
+        NegativeCache(fake_redis, ttl=60, local_max_entries=10),
+    )
+    monkeypatch.setattr(http_client, "get_http_client", lambda: client)
+
+    first = asyncio.run(get_latest_company_stock_prices_service(["MSFT", "ZZZZ"]))
+    store.pop("quote:MSFT")
+    second = asyncio.run(get_latest_company_stock_prices_service(["MSFT", "ZZZZ"]))
+
+    assert set(first) == set(second) == {"MSFT"}
+    assert store["neg:quote:ZZZZ"] == "1"
+    assert [call["symbols"] for call in client.calls] == ["MSFT,ZZZZ", "MSFT"]
+
+
+def _use_fake_quote_cache(monkeypatch, store):
+    from app.core.negative_cache import NegativeCache
+
+    fake_redis = FakeRedis(store)
+    monkeypatch.setattr(company_latest_stock_price_service, "redis", fake_redis)
+    monkeypatch.setattr(
+        company_latest_stock_price_service,
+        "negative_cache",
+        NegativeCache(fake_redis, ttl=60, local_max_entries=10),
+    )
+
+
+def test_get_latest_company_stock_price_service_shares_quote_entries_with_batch_lookups(monkeypatch):
+    store = {}
+    _use_fake_quote_cache(monkeypatch, store)
+    client = RecordingClient([{"symbol": "AAPL", "price": 190.1}])
+    monkeypatch.setattr(http_client, "get_http_client", lambda: client)
+
+    result = asyncio.run(get_latest_company_stock_price_service("aapl"))
+    batch = asyncio.run(get_latest_company_stock_prices_service(["AAPL"]))
+
+    assert result == [{"symbol": "AAPL", "price": 190.1}]
+    assert json.loads(store["quote:AAPL"]) == {"symbol": "AAPL", "price": 190.1}
+    assert batch == {"AAPL": {"symbol": "AAPL", "price": 190.1}}
+    assert len(client.calls) == 1
+
+
+def test_get_latest_company_stock_price_service_unknown_ticker_is_404_on_first_and_repeat_lookups(monkeypatch):
+    import pytest
+    from fastapi import HTTPException
+
+    _use_fake_quote_cache(monkeypatch, {})
+    monkeypatch.setattr(http_client, "get_http_client", lambda: DummyClient([]))
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(get_latest_company_stock_price_service("ZZZZ"))
+        assert exc_info.value.status_code == 404